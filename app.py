@@ -1,28 +1,64 @@
 import os
+import math
+import atexit
 import random
-import json
-import csv
 from typing import List, Dict, Any
 
 from flask import Flask, render_template, request
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
+
+from config import Config
+from logic.packet_parsers import PACKET_EXTENSIONS
+from logic.packet_jobs import PacketJobPool
+from logic.packet_pool import PacketPool
+from logic.packet_catalog import PacketCatalog
+from ui.admin_routes import admin_bp
+from utils.validate_packets import validate_file
+from logic.parse_cache import load_packet_cached
+from logic.corpus import open_corpus, find_format_dir, FORMATS
+from logic.question_model import Question, TriviaQuestion
+from logic.answer_matcher import compile_questions, judge, CORRECT, PROMPT
+from logic.game_state import GameState, RoomRegistry, room_code
+from logic.session_index import Session
+from logic.room_journal import open_journals
+from logic.scheduler import get_scheduler
+from logic.clue_stream import ClueStream
+from logic.state_store import get_store
+from logic.room_router import RoomRouter
+from logic.room_roster import room_rosters
+from logic.room_languages import room_languages
+from ui.response_cache import response_cache
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'quizbowl-secret'
-socketio = SocketIO(app, async_mode="threading")
-
-# --- Game State (in-memory) ---
-players: Dict[str, str] = {}           # {username: sid}
-scores: Dict[str, int] = {}            # {username: score}
-moderator: str | None = None           # username
-buzzed_player: str | None = None
-lockout_until: float = 0               # epoch seconds
-# Packet/session
-setup: Dict[str, Any] = {}             # setup params + loaded packet
-packet_questions: List[Dict[str, Any]] = []  # normalized questions list
-current_index: int = -1
-current_clues: List[str] = []          # for pyramidal reveal
-revealed_index: int = -1
+# Shared state and pub/sub (Config.STATE_STORE_URL): with Redis, emits reach sockets on every worker
+store = get_store()
+socketio = SocketIO(app, async_mode="threading", client_manager=store.client_manager("flask-socketio"))
+app.register_blueprint(admin_bp)
+
+# --- Game State (in-memory, one GameState per room code) ---
+# Every room event is journaled (Config.JOURNAL_DIR); a room that survived a restart is rebuilt on first use
+journals = open_journals()
+if journals is not None:
+    atexit.register(journals.close_all)
+rooms = RoomRegistry(emit=lambda code, event, payload: socketio.emit(event, payload, to=code),
+                     journals=journals, on_restore=lambda state, image: restore_room(state, image))
+app.extensions["room_registry"] = rooms
+# Buzz windows, score flushes and countdowns for every room share one timer heap
+scheduler = get_scheduler()
+# Each room runs on the one worker holding its lease; other workers forward its events there
+router = RoomRouter(store, ttl=Config.ROOM_OWNER_TTL_SECONDS)
+app.extensions["room_router"] = router
+# Cached team rosters drop on membership commits in any worker, not just this one
+room_rosters.bind(store)
+# Cached leaderboard/records responses go stale on a stat write in any worker
+response_cache.bind(store)
+# Per-room language maps follow /language/set changes made on any worker
+room_languages.bind(store)
+# Compiled question corpus (python -m utils.build_corpus); None falls back to parsing files
+corpus = open_corpus()
+# Packet loads run here so parsing never blocks buzz/reveal handlers
+packet_jobs = PacketJobPool(max_in_flight=Config.PACKET_LOAD_MAX_IN_FLIGHT)
 
 # --- Frontend route ---
 @app.route("/")
@@ -32,379 +68,527 @@ def index():
 # --- Helpers: packet loading ---
 
 def packets_dir_for_format(fmt: str) -> str:
-    return os.path.join(os.path.dirname(__file__), "packets", fmt)
+    # Same lookup as the corpus builder, so e.g. packets/froshmore serves "Froshmore"
+    root = os.path.join(os.path.dirname(__file__), "packets")
+    return find_format_dir(root, fmt) or os.path.join(root, fmt)
 
 def choose_random_file(folder: str) -> str | None:
     if not os.path.isdir(folder):
         return None
-    files = [f for f in os.listdir(folder) if f.lower().endswith((".json", ".csv", ".docx", ".pdf"))]
+    files = [f for f in os.listdir(folder) if f.lower().endswith(PACKET_EXTENSIONS)]
     if not files:
         return None
     return os.path.join(folder, random.choice(files))
 
-def parse_json_packet(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def parse_csv_packet(path: str, fmt: str) -> Dict[str, Any]:
-    # CSV schemas vary. Supported simple schemas:
-    # Pyramidal: id, clue1, clue2, clue3, clue4, answer
-    # Trivia: id, text, answer
-    questions = []
-    with open(path, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if fmt == "Trivia":
-                q = {
-                    "id": row.get("id") or f"t{len(questions)+1}",
-                    "text": row.get("text", "").strip(),
-                    "answer": row.get("answer", "").strip()
-                }
-            else:
-                clues = []
-                # Collect any columns named clue1..clue10 or generic "clue" columns
-                for k in row.keys():
-                    lk = k.lower()
-                    if lk.startswith("clue"):
-                        val = (row.get(k) or "").strip()
-                        if val:
-                            clues.append(val)
-                # Fallback: single text column split by ;; into clues
-                if not clues and row.get("text"):
-                    clues = [c.strip() for c in row["text"].split(";;") if c.strip()]
-                q = {
-                    "id": row.get("id") or f"q{len(questions)+1}",
-                    "clues": clues,
-                    "answer": (row.get("answer") or "").strip()
-                }
-            questions.append(q)
-    return {"format": fmt, "questions": questions}
-
-def parse_docx_packet(path: str, fmt: str) -> Dict[str, Any]:
-    # DOCX expectations:
-    # - Pyramidal: Questions separated by blank lines; clues per question separated by line breaks.
-    # - Trivia: Each line "Question ?| Answer" or "Q: ... A: ..." or split by '||'
-    try:
-        import docx  # python-docx
-    except ImportError:
-        return {"format": fmt, "questions": []}
-
-    doc = docx.Document(path)
-    lines = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-    questions = []
+def corpus_is_fresh(fmt: str) -> bool:
+    """The compiled corpus serves fmt only until the catalog sees newer packet files."""
+    return bool(corpus) and corpus.has_format(fmt) and catalog.last_change(fmt) <= corpus.mtime
 
-    if fmt == "Trivia":
-        for ln in lines:
-            text, ans = None, ""
-            if "||" in ln:
-                parts = ln.split("||")
-                text = parts[0].strip()
-                ans = parts[1].strip() if len(parts) > 1 else ""
-            elif "| Answer:" in ln:
-                parts = ln.split("| Answer:")
-                text = parts[0].strip()
-                ans = parts[1].strip() if len(parts) > 1 else ""
-            elif " A: " in ln and " Q: " in ln:
-                # Q: ... A: ...
-                qpart = ln.split(" Q: ")
-                if len(qpart) > 1:
-                    ap = qpart[-1].split(" A: ")
-                    text = ap[0].strip()
-                    ans = ap[1].strip() if len(ap) > 1 else ""
-            else:
-                # Fallback: treat whole line as question without answer
-                text = ln
-            if text:
-                questions.append({"id": f"t{len(questions)+1}", "text": text, "answer": ans})
-    else:
-        # Group lines into questions by blank-line separators in original structure.
-        # Since we removed blanks, we infer new question when a line starts with "Q" or a delimiter.
-        bucket: List[str] = []
-        for ln in lines:
-            if ln.lower().startswith(("q:", "question:", "new question", "###")) and bucket:
-                questions.append({"id": f"q{len(questions)+1}", "clues": bucket[:], "answer": ""})
-                bucket = []
-            else:
-                bucket.append(ln)
-        if bucket:
-            questions.append({"id": f"q{len(questions)+1}", "clues": bucket[:], "answer": ""})
-
-    return {"format": fmt, "questions": questions}
-
-def parse_pdf_packet(path: str, fmt: str) -> Dict[str, Any]:
-    # PDF text extraction best with pdfplumber; fallback to PyPDF2 if not installed.
-    text = ""
-    try:
-        import pdfplumber
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                t = page.extract_text() or ""
-                text += t + "\n"
-    except Exception:
-        try:
-            import PyPDF2
-            with open(path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    t = page.extract_text() or ""
-                    text += t + "\n"
-        except Exception:
-            return {"format": fmt, "questions": []}
-
-    # Split text into lines and build questions similarly to DOCX
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    if fmt == "Trivia":
-        questions = []
-        for ln in lines:
-            text_q, ans = None, ""
-            if "||" in ln:
-                parts = ln.split("||")
-                text_q = parts[0].strip()
-                ans = parts[1].strip() if len(parts) > 1 else ""
-            elif " A: " in ln:
-                parts = ln.split(" A: ")
-                text_q = parts[0].strip()
-                ans = parts[1].strip() if len(parts) > 1 else ""
-            else:
-                text_q = ln
-            questions.append({"id": f"t{len(questions)+1}", "text": text_q, "answer": ans})
-        return {"format": fmt, "questions": questions}
-    else:
-        # Heuristic: split into questions by lines that look like "Question" headers
-        questions = []
-        bucket: List[str] = []
-        for ln in lines:
-            if ln.lower().startswith(("q:", "question", "###")) and bucket:
-                questions.append({"id": f"q{len(questions)+1}", "clues": bucket[:], "answer": ""})
-                bucket = []
-            else:
-                bucket.append(ln)
-        if bucket:
-            questions.append({"id": f"q{len(questions)+1}", "clues": bucket[:], "answer": ""})
-        return {"format": fmt, "questions": questions}
-
-def normalize_packet(packet: Dict[str, Any], fmt: str) -> List[Dict[str, Any]]:
-    """Return a unified list of question dicts:
-       - Pyramidal: {id, clues[], answer}
-       - Trivia: {id, text, answer}
-    """
-    if not packet or "questions" not in packet:
-        return []
-    questions = packet["questions"]
-    normalized: List[Dict[str, Any]] = []
-    for q in questions:
-        if fmt == "Trivia":
-            normalized.append({
-                "id": q.get("id") or f"t{len(normalized)+1}",
-                "text": q.get("text") or "",
-                "answer": q.get("answer") or ""
-            })
-        else:
-            clues = q.get("clues") or []
-            # If a single string exists, split by delimiters
-            if isinstance(clues, str):
-                clues = [c.strip() for c in clues.split(";;") if c.strip()]
-            normalized.append({
-                "id": q.get("id") or f"q{len(normalized)+1}",
-                "clues": clues,
-                "answer": q.get("answer") or ""
-            })
-    return normalized
-
-def load_random_packet_for_format(fmt: str) -> List[Dict[str, Any]]:
-    folder = packets_dir_for_format(fmt)
-    path = choose_random_file(folder)
+def load_random_packet_for_format(fmt: str, progress=None) -> List[Question]:
+    if corpus_is_fresh(fmt):
+        return corpus.random_packet(fmt)
+    path = catalog.choose(fmt) or choose_random_file(packets_dir_for_format(fmt))
     if not path:
         return []
-    ext = os.path.splitext(path)[1].lower()
-    if ext == ".json":
-        pkt = parse_json_packet(path)
-    elif ext == ".csv":
-        pkt = parse_csv_packet(path, fmt)
-    elif ext == ".docx":
-        pkt = parse_docx_packet(path, fmt)
-    elif ext == ".pdf":
-        pkt = parse_pdf_packet(path, fmt)
-    else:
-        pkt = {"format": fmt, "questions": []}
-    return normalize_packet(pkt, fmt)
+    return load_packet_cached(path, fmt, progress)
+
+# Snapshot of packet files per format, rescanned incrementally so new packets need no restart
+catalog = PacketCatalog(packets_dir_for_format, FORMATS, load_packet_cached, validate=validate_file)
+app.extensions["packet_catalog"] = catalog
+
+# Ready packets per format, prefetched at startup and refilled as setups consume them
+packet_pool = PacketPool(load_random_packet_for_format, FORMATS,
+                         depth=Config.PACKET_POOL_DEPTH, max_bytes=Config.PACKET_POOL_MAX_BYTES)
+packet_pool.start()
+catalog.on_change(packet_pool.invalidate)
+catalog.start(Config.PACKET_CATALOG_RESCAN_SECONDS)
 
-def ai_trivia_sample() -> List[Dict[str, Any]]:
+def ai_trivia_sample() -> List[Question]:
     # Replace with live generation later. This mixes well with packet lists.
     return [
-        {"id": "ai1", "text": "Which ocean is the largest?", "answer": "Pacific Ocean"},
-        {"id": "ai2", "text": "Who painted the Mona Lisa?", "answer": "Leonardo da Vinci"},
-        {"id": "ai3", "text": "What year did the Titanic sink?", "answer": "1912"},
-        {"id": "ai4", "text": "Which metal has the chemical symbol Fe?", "answer": "Iron"},
-        {"id": "ai5", "text": "What is the tallest mountain in Africa?", "answer": "Mount Kilimanjaro"},
+        TriviaQuestion("ai1", "Which ocean is the largest?", "Pacific Ocean", format="Trivia"),
+        TriviaQuestion("ai2", "Who painted the Mona Lisa?", "Leonardo da Vinci", format="Trivia"),
+        TriviaQuestion("ai3", "What year did the Titanic sink?", "1912", format="Trivia"),
+        TriviaQuestion("ai4", "Which metal has the chemical symbol Fe?", "Iron", format="Trivia"),
+        TriviaQuestion("ai5", "What is the tallest mountain in Africa?", "Mount Kilimanjaro", format="Trivia"),
     ]
 
 # --- Game orchestration ---
 
-def set_question_from_index(fmt: str, index: int):
-    """Prepare current question for display."""
-    global current_index, current_clues, revealed_index
-    current_index = index
+def set_question_from_index(state: GameState, index: int):
+    """Prepare current question for display. Call with state.lock held."""
+    fmt = state.format
+    state.current_index = index
+    state.arbiter.clear()
+    state.stop_reader()
+    state.record("next_question", {"index": index})
+    q = state.packet_questions[index]
+    # socketio.emit (not flask_socketio.emit) so this also works from packet load workers
     if fmt == "Trivia":
         # flat question
-        q = packet_questions[current_index]
-        emit("new_question", {"question": q.get("text", "")}, broadcast=True)
-        emit("reveal_state", {"revealed": 0, "total": 1}, broadcast=True)
+        state.stream = None
+        socketio.emit("new_question", {"question": q.text, "qid": q.id, "seq": 0}, to=state.code)
+        socketio.emit("reveal_state", {"revealed": 0, "total": 1}, to=state.code)
     else:
-        # pyramidal
-        q = packet_questions[current_index]
-        current_clues = q.get("clues", [])[:]
-        revealed_index = -1
-        emit("new_question", {"question": ""}, broadcast=True)
-        emit("reveal_state", {"revealed": revealed_index, "total": len(current_clues)}, broadcast=True)
-
-def next_index() -> int:
-    if not packet_questions:
-        return -1
-    if current_index + 1 < len(packet_questions):
-        return current_index + 1
-    return 0  # loop around
+        # pyramidal: clients start empty and append clue_append segments in seq order
+        state.stream = ClueStream(q.id, q.clues)
+        socketio.emit("new_question", {"question": "", "qid": q.id, "seq": 0}, to=state.code)
+        socketio.emit("reveal_state", {"revealed": -1, "total": state.stream.total_clues}, to=state.code)
+
+def publish_segment(state: GameState, segment):
+    """Send one append-only reveal segment to the room. Call with state.lock held."""
+    state.record("reveal", {"qid": segment["qid"], "seq": segment["seq"], "word": segment["word"]})
+    socketio.emit("clue_append", segment, to=state.code)
+    socketio.emit("reveal_state", {"revealed": segment["clue"], "total": state.stream.total_clues,
+                                   "word": segment["word"]}, to=state.code)
+
+READER_RATE_RANGE = (0.5, 20.0)  # words per second a moderator may ask for
+
+def reader_rate(value) -> float:
+    """Client-sent words_per_second, clamped; anything unparseable means the configured default."""
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        rate = Config.READER_WORDS_PER_SECOND
+    if not math.isfinite(rate):
+        rate = Config.READER_WORDS_PER_SECOND
+    return min(max(rate, READER_RATE_RANGE[0]), READER_RATE_RANGE[1])
+
+def reader_tick(state: GameState, stream: ClueStream):
+    with state.lock:
+        if state.reader is None or state.stream is not stream:
+            return  # reader stopped or question changed since this tick was queued
+        segment = state.stream.advance(1)
+        if segment is not None:
+            publish_segment(state, segment)
+        if state.stream.finished:
+            state.stop_reader()
+            socketio.emit("reader_done", {"qid": state.stream.qid}, to=state.code)
+
+def state_for(data) -> GameState:
+    """Room of the event: the code sent by the client, else the room this connection joined."""
+    code = (data or {}).get("code") or rooms.room_of(request.sid)
+    return rooms.get_or_create(room_code(code))
+
+# --- Room event routing (one owning worker per room) ---
+
+room_handlers: Dict[str, Any] = {}
+
+def room_event(event: str):
+    """Like @socketio.on, but the handler runs on the worker that owns the event's room."""
+    def register(handler):
+        room_handlers[event] = handler
+        socketio.on_event(event, lambda data=None: route_room_event(event, dict(data or {}), request.sid))
+        return handler
+    return register
+
+def route_room_event(event: str, data: Dict[str, Any], sid: str):
+    previous = router.room_of(sid)
+    code = room_code(data.get("code") or previous)
+    data["code"] = code
+    if event in ("join", "resume", "setup_complete") and code != previous:
+        if previous and event == "join":
+            # The socket lives here, so it leaves the old room here; its owner drops the player
+            leave_room(previous, sid=sid, namespace="/")
+            route_room_event("leave", {"code": previous}, sid)
+        router.remember(sid, code)
+    owner = router.owner(code)
+    if owner == router.worker_id:
+        room_handlers[event](data)
+    else:
+        router.forward(owner, event, data, sid)
 
-# --- Socket events: setup and join ---
+def run_forwarded(event: str, data: Dict[str, Any], sid: str, transit: float):
+    # Replay another worker's socket event as if that socket were connected here
+    handler = room_handlers.get(event)
+    if handler is None:
+        return
+    owner = router.owner(room_code(data.get("code")))
+    if owner != router.worker_id:
+        # Sent on a cached owner that has since released the room: pass it on
+        router.forward(owner, event, data, sid)
+        return
+    with app.test_request_context("/"):
+        request.sid = sid
+        request.namespace = "/"
+        request.transit = transit
+        handler(data)
 
-@socketio.on("setup_complete")
-def handle_setup(data):
-    global setup, packet_questions
-    setup = data or {}
-    fmt = setup.get("format") or "NAQT"
+router.listen(run_forwarded)
+# A lost lease means another worker may already run the room: stop running it here
+router.on_lost(rooms.evict)
 
-    # Load a random packet for selected format
-    packet_questions = load_random_packet_for_format(fmt)
+def archive_unclaimed_journals():
+    archived = journals.archive_unclaimed(Config.RECONNECT_GRACE_SECONDS, in_use=router.held)
+    if archived:
+        print(f"Archived {len(archived)} journal(s) of rooms nobody returned to")
 
-    # Trivia AI-only option: if no packet found or Trivia selected, inject AI questions
-    if fmt == "Trivia":
-        if not packet_questions:
-            packet_questions = ai_trivia_sample()
-        # Optional: If you want mixed mode, you could also append AI to existing packet_questions.
+if journals is not None:
+    # Rooms players come back to are reopened within the reconnect grace; the rest are archived
+    scheduler.call_later(Config.RECONNECT_GRACE_SECONDS, archive_unclaimed_journals)
 
-    # Reset index
-    set_question_from_index(fmt, 0 if packet_questions else -1)
+def transit_time() -> float:
+    """Seconds the current event spent being forwarded from another worker (0 when local)."""
+    return getattr(request, "transit", 0.0)
+
+# --- Socket events: setup and join ---
+
+@room_event("setup_complete")
+def handle_setup(data):
+    setup_data = data or {}
+    fmt = setup_data.get("format") or "NAQT"
+    sid = request.sid
+    state = state_for(setup_data)
+    join_room(state.code)
+    if rooms.room_of(sid) != state.code:
+        rooms.bind(sid, state.code)
+
+    def on_progress(stats):
+        socketio.emit("setup_progress", dict(stats, format=fmt), to=sid)
+
+    def on_done(questions):
+        # Trivia AI-only option: if no packet found or Trivia selected, inject AI questions
+        if fmt == "Trivia":
+            if not questions:
+                questions = ai_trivia_sample()
+            # Optional: If you want mixed mode, you could also append AI to existing packet_questions.
+        # Parse every answer line now so judging during play is a lookup
+        compile_questions(questions)
+        with state.lock:
+            state.setup = setup_data
+            state.packet_questions = questions
+            state.current_index = -1
+            state.record("setup", {"setup": setup_data, "questions": [q.to_dict() for q in questions]})
+
+            # Reset index
+            if state.packet_questions:
+                set_question_from_index(state, 0)
+
+        socketio.emit("setup_ack", {"status": "ok", "room": state.code, "message": f"Setup complete. Loaded format: {fmt}. Questions: {len(questions)}"}, to=sid)
+
+    def on_error(exc):
+        socketio.emit("setup_ack", {"status": "error", "message": f"Could not load a {fmt} packet: {exc}"}, to=sid)
+
+    load_key = state.code
+    # Warm pool hit: constant-time setup regardless of the source file type
+    questions = packet_pool.take(fmt)
+    if questions is not None:
+        packet_jobs.cancel(load_key)
+        on_done(questions)
+        return
 
-    emit("setup_ack", {"status": "ok", "message": f"Setup complete. Loaded format: {fmt}. Questions: {len(packet_questions)}"}, room=request.sid)
+    # Cold: load a random packet for selected format in the background; progress streams to the requester
+    emit("setup_progress", {"format": fmt, "status": "queued"}, room=sid)
+    packet_jobs.submit(load_key,
+                       lambda progress: load_random_packet_for_format(fmt, progress),
+                       on_progress=on_progress, on_done=on_done, on_error=on_error)
 
-@socketio.on("join")
+@room_event("join")
 def handle_join(data):
-    global moderator
     username = data.get("username")
     role = data.get("role", "player")
     if not username:
         emit("error", {"message": "Username required."}, room=request.sid)
         return
-    players[username] = request.sid
-    scores.setdefault(username, 0)
-    if role == "moderator" and moderator is None:
-        moderator = username
-    emit("player_list", {"players": list(players.keys()), "moderator": moderator}, broadcast=True)
-    emit("score_update", scores, broadcast=True)
+    state = state_for(data)
+    with state.lock:
+        if username in state.sessions:
+            # The seat is taken (or held for a reconnecting player); only its token reclaims it
+            session = state.sessions.resume(username, data.get("token"), request.sid)
+            if session is None:
+                emit("error", {"message": "That username is already in this room."}, room=request.sid)
+                return
+        else:
+            session = state.sessions.attach(username, request.sid, role, data.get("team") or None)
+            if role == "moderator" and state.moderator is None:
+                state.moderator = username
+            state.record("join", {"username": username, "role": role, "team": session.team,
+                                  "token": session.token, "moderator": state.moderator == username})
+        player_list = state.player_list()
+        question = state.stream.snapshot() if state.stream else None
+    join_room(state.code)
+    rooms.bind(request.sid, state.code, username)
+    state.scoreboard.ensure(username)
+    emit("session", {"code": state.code, "username": username, "token": session.token}, room=request.sid)
+    emit("player_list", player_list, to=state.code)
+    # The joiner starts from a full table; everyone else just gets the new row as a delta
+    emit("score_snapshot", state.scoreboard.snapshot(), room=request.sid)
+    if question:
+        emit("question_text", question, room=request.sid)
+
+def question_catch_up(state: GameState, qid, seq):
+    """(event, payload) bringing a client that last saw (qid, seq) up to date, or None.
+    Call with state.lock held."""
+    stream = state.stream
+    if stream is None:
+        question = state.current_question()
+        if question is None or qid == question.id:
+            return None
+        return "new_question", {"question": question.text, "qid": question.id, "seq": 0}
+    if qid != stream.qid or not isinstance(seq, int):
+        return "question_text", stream.snapshot()
+    segment = stream.since(seq)
+    return ("clue_append", segment) if segment else None
+
+@room_event("resume")
+def handle_resume(data):
+    # Reconnect handshake: the client says what it last saw and gets only what it missed
+    username = data.get("username")
+    state = state_for(data)
+    with state.lock:
+        session = state.sessions.resume(username, data.get("token"), request.sid)
+        if session is None:
+            resumed = None
+        else:
+            resumed = {"code": state.code, "username": username, "role": session.role, "team": session.team,
+                       "moderator": state.moderator == username,
+                       "buzz": {"holder": state.arbiter.holder(),
+                                "lockout": round(state.arbiter.lockout_remaining(), 1)}}
+            player_list = state.player_list()
+            question = question_catch_up(state, data.get("qid"), data.get("seq"))
+    if resumed is None:
+        # Grace period over (or unknown seat): the client falls back to a fresh join
+        emit("resume_failed", {"code": state.code}, room=request.sid)
+        release_if_empty(state)
+        return
+    join_room(state.code)
+    rooms.bind(request.sid, state.code, username)
+    emit("player_list", player_list, to=state.code)
+    scores = state.scoreboard.catch_up(data.get("score_version"))
+    if scores:
+        emit(scores[0], scores[1], room=request.sid)
+    if question:
+        emit(question[0], question[1], room=request.sid)
+    emit("resumed", resumed, room=request.sid)
+
+@room_event("score_sync")
+def handle_score_sync(data):
+    # Sent by clients that missed a delta (base != the version they hold)
+    emit("score_snapshot", state_for(data).scoreboard.snapshot(), room=request.sid)
 
 # --- Profiles (basic in-memory) ---
 
-@socketio.on("save_profile")
+@room_event("save_profile")
 def handle_save_profile(data):
     # In-memory placeholder; wire to persistent storage later
     # This event can be expanded to include more fields
-    emit("profiles_list", {"profiles": list(players.keys())}, room=request.sid)
+    state = state_for(data)
+    with state.lock:
+        profiles = state.sessions.usernames()
+    emit("profiles_list", {"profiles": profiles}, room=request.sid)
 
 @socketio.on("load_profile")
 def handle_load_profile(data):
     # Placeholder: no persistent profiles yet
     emit("error", {"message": "Profile persistence not yet implemented."}, room=request.sid)
 
-# --- Buzz and lockout ---
-
-@socketio.on("buzz")
+# --- Buzz arbitration and latency ---
+
+@room_event("ping_request")
+def handle_ping_request(data):
+    # Server-initiated round trip: the client echoes latency_ping back as latency_pong
+    state = state_for(data)
+    emit("latency_ping", state.arbiter.ping(request.sid), room=request.sid)
+
+@room_event("latency_pong")
+def handle_latency_pong(data):
+    state = state_for(data)
+    rtt = state.arbiter.pong(request.sid, (data or {}).get("id"), transit=transit_time())
+    if rtt is not None:
+        emit("latency", {"rtt_ms": round(rtt * 1000, 1)}, room=request.sid)
+
+def close_buzz_window(state: GameState, window: int):
+    with state.lock:
+        # A timer from a window that was cleared meanwhile resolves nothing
+        decision = state.arbiter.resolve(window)
+        if decision is None:
+            return
+        state.record("buzz", {"winner": decision["winner"], "position": decision["position"],
+                              "decision": decision["decision"]})
+    socketio.emit("buzzed", {"player": decision["winner"], "lockout": state.arbiter.lockout,
+                             "decision": decision["decision"], "word": decision["position"]}, to=state.code)
+
+def player_of(state: GameState) -> str | None:
+    """Username of the player on this connection; events never trust a client-sent name."""
+    with state.lock:
+        session = state.sessions.for_sid(request.sid)
+    return session.username if session else None
+
+@room_event("buzz")
 def handle_buzz(data):
-    import time
-    global buzzed_player, lockout_until
-    username = data.get("username")
-    now = time.time()
-    if now < lockout_until:
-        emit("lockout_active", {"remaining": round(lockout_until - now, 1)}, room=players.get(username))
+    state = state_for(data)
+    username = player_of(state)
+    if username is None:
+        emit("error", {"message": "Join the room before buzzing."}, room=request.sid)
         return
-    if buzzed_player is None:
-        buzzed_player = username
-        lockout_until = now + 5
-        emit("buzzed", {"player": username, "lockout": 5}, broadcast=True)
-
-@socketio.on("answer")
+    stream = state.stream
+    outcome = state.arbiter.buzz(username, request.sid, position=stream.position if stream else None,
+                                 transit=transit_time())
+    if outcome["status"] == "locked":
+        emit("lockout_active", {"remaining": round(outcome["remaining"], 1)}, room=request.sid)
+    elif outcome["status"] == "opened":
+        # The reader stops at the first buzz, like a human moderator; "start_reader" resumes
+        with state.lock:
+            state.stop_reader()
+        # Collect buzzes for one window, then award the earliest latency-compensated one
+        scheduler.call_later(outcome["closes_in"], close_buzz_window, state, outcome["window"])
+
+@room_event("answer")
 def handle_answer(data):
-    global buzzed_player, lockout_until
-    username = data.get("username")
+    state = state_for(data)
+    username = player_of(state)
     correct = data.get("correct", False)
-    if buzzed_player != username:
-        emit("error", {"message": "You are not the buzzed player."}, room=players.get(username))
-        return
-    if correct:
-        scores[username] = scores.get(username, 0) + 10
-        emit("score_update", scores, broadcast=True)
-        emit("answer_result", {"player": username, "result": "correct"}, broadcast=True)
-    else:
-        scores[username] = scores.get(username, 0) - 5
-        emit("score_update", scores, broadcast=True)
-        emit("answer_result", {"player": username, "result": "wrong"}, broadcast=True)
-    buzzed_player = None
-    lockout_until = 0
+    with state.lock:
+        if username is None or state.arbiter.holder() != username:
+            emit("error", {"message": "You are not the buzzed player."}, room=request.sid)
+            return
+        # Typed responses are auto-judged; the moderator's correct/wrong buttons still work
+        response = data.get("response")
+        question = state.current_question()
+        if response is not None and question is not None:
+            verdict = judge(question, response)
+            if verdict == PROMPT:
+                emit("answer_prompt", {"player": username, "response": response}, room=request.sid)
+                return
+            if verdict is not None:
+                correct = verdict == CORRECT
+        points = 10 if correct else -5
+        state.record("answer", {"username": username, "correct": correct, "points": points})
+        state.scoreboard.add(username, points)
+        state.arbiter.clear()
+    emit("answer_result", {"player": username, "result": "correct" if correct else "wrong"}, to=state.code)
 
 # --- Question flow (moderator) ---
 
-@socketio.on("next_question")
+@room_event("next_question")
 def handle_next_question(data):
-    username = data.get("username")
-    if username != moderator:
-        emit("error", {"message": "Only the moderator can change questions."}, room=players.get(username))
-        return
-    fmt = setup.get("format") or "NAQT"
-    idx = next_index()
-    if idx == -1:
-        emit("error", {"message": "No questions loaded."}, room=players.get(username))
-        return
-    set_question_from_index(fmt, idx)
+    state = state_for(data)
+    username = player_of(state)
+    with state.lock:
+        if username is None or username != state.moderator:
+            emit("error", {"message": "Only the moderator can change questions."}, room=request.sid)
+            return
+        idx = state.next_index()
+        if idx == -1:
+            emit("error", {"message": "No questions loaded."}, room=request.sid)
+            return
+        set_question_from_index(state, idx)
+
+def moderator_stream(state: GameState, username: str, action: str):
+    """The current pyramidal stream if username (from player_of) may drive it, else emit why not
+    and return None. Call with state.lock held."""
+    if username is None or username != state.moderator:
+        emit("error", {"message": f"Only the moderator can {action}."}, room=request.sid)
+        return None
+    if state.format == "Trivia":
+        emit("error", {"message": "Trivia mode is not pyramidal."}, room=request.sid)
+        return None
+    if state.stream is None:
+        emit("error", {"message": "No question selected."}, room=request.sid)
+        return None
+    return state.stream
 
-@socketio.on("reveal_next_clue")
+@room_event("reveal_next_clue")
 def handle_reveal_next_clue(data):
-    username = data.get("username")
-    if username != moderator:
-        emit("error", {"message": "Only the moderator can reveal clues."}, room=players.get(username))
-        return
-    fmt = setup.get("format") or "NAQT"
-    if fmt == "Trivia":
-        emit("error", {"message": "Trivia mode is not pyramidal."}, room=players.get(username))
-        return
-    global revealed_index
-    if current_index < 0 or current_index >= len(packet_questions):
-        emit("error", {"message": "No question selected."}, room=players.get(username))
-        return
-    q = packet_questions[current_index]
-    clues = q.get("clues", [])
-    if revealed_index + 1 < len(clues):
-        revealed_index += 1
-        current_text = "\n".join(clues[:revealed_index+1])
-        emit("new_question", {"question": current_text}, broadcast=True)
-        emit("reveal_state", {"revealed": revealed_index, "total": len(clues)}, broadcast=True)
-    else:
-        emit("error", {"message": "All clues revealed."}, room=players.get(username))
+    state = state_for(data)
+    username = player_of(state)
+    with state.lock:
+        stream = moderator_stream(state, username, "reveal clues")
+        if stream is None:
+            return
+        segment = stream.next_clue()
+        if segment is None:
+            emit("error", {"message": "All clues revealed."}, room=request.sid)
+            return
+        publish_segment(state, segment)
+
+@room_event("start_reader")
+def handle_start_reader(data):
+    # Server-paced reading: one word per tick; resumes from the current word after a buzz
+    state = state_for(data)
+    username = player_of(state)
+    with state.lock:
+        stream = moderator_stream(state, username, "start the reader")
+        if stream is None or stream.finished:
+            return
+        state.stop_reader()
+        rate = reader_rate(data.get("words_per_second") or Config.READER_WORDS_PER_SECOND)
+        state.reader = scheduler.call_every(1.0 / rate, reader_tick, state, stream, first=0)
+
+@room_event("stop_reader")
+def handle_stop_reader(data):
+    state = state_for(data)
+    username = player_of(state)
+    with state.lock:
+        if moderator_stream(state, username, "stop the reader") is not None:
+            state.stop_reader()
+
+@room_event("reveal_sync")
+def handle_reveal_sync(data):
+    # Sent by clients that saw a clue_append seq gap (or joined mid-question)
+    state = state_for(data)
+    with state.lock:
+        snapshot = state.stream.snapshot() if state.stream else None
+    if snapshot:
+        emit("question_text", snapshot, room=request.sid)
 
 # --- Disconnect cleanup ---
 
+def release_if_empty(state: GameState):
+    if rooms.discard_if_empty(state):
+        router.release(state.code)
+
+def drop_player(state: GameState, session: Session):
+    """Remove a player for good (score row and moderator role too). Call with state.lock held."""
+    state.sessions.remove(session.username)
+    state.scoreboard.remove(session.username)
+    if session.username == state.moderator:
+        state.moderator = None
+    state.record("leave", {"username": session.username})
+
+def restore_room(state: GameState, image):
+    # Rebuilt from its journal after a restart: players hold their seats for the grace period
+    # and get everything back through the usual "resume" handshake
+    state.restore(image, lambda session: expire_session(state, session))
+    compile_questions(state.packet_questions)
+
+def expire_session(state: GameState, session: Session):
+    with state.lock:
+        if not session.away or state.sessions.get(session.username) is not session:
+            return  # resumed after this timer was queued
+        drop_player(state, session)
+        player_list = state.player_list()
+    socketio.emit("player_list", player_list, to=state.code)
+    release_if_empty(state)
+
+def leave_current_room(sid: str, disconnected: bool = False):
+    """A connection left its room: a dropped connection keeps its seat for the grace period,
+    an explicit leave (or room switch) frees it now."""
+    state, _ = rooms.unbind(sid)
+    if state is None:
+        return
+    state.arbiter.forget(sid)
+    with state.lock:
+        if disconnected:
+            session = state.sessions.detach(sid, lambda s: expire_session(state, s))
+        else:
+            session = state.sessions.for_sid(sid)
+            if session is not None:
+                drop_player(state, session)
+        player_list = state.player_list()
+    if session is not None:
+        socketio.emit("player_list", player_list, to=state.code)
+    release_if_empty(state)
+
+@room_event("leave")
+def handle_leave(data):
+    leave_current_room(request.sid, disconnected=bool(data.get("disconnected")))
+
 @socketio.on("disconnect")
 def handle_disconnect():
-    global moderator
-    leaving_user = None
-    for username, sid in list(players.items()):
-        if sid == request.sid:
-            leaving_user = username
-            del players[username]
-            scores.pop(username, None)
-            break
-    if leaving_user and leaving_user == moderator:
-        moderator = None
-    emit("player_list", {"players": list(players.keys()), "moderator": moderator}, broadcast=True)
-    emit("score_update", scores, broadcast=True)
+    code = router.forget(request.sid)
+    if code:
+        route_room_event("leave", {"code": code, "disconnected": True}, request.sid)
 
 # --- Run app ---
 if __name__ == "__main__":
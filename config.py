@@ -8,4 +8,55 @@ class Config:
     MAX_CONTENT_LENGTH = 4 * 1024 * 1024  # 4MB
     ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
     JWT_ISSUER = "quizbowl_challenge"
-    JWT_EXP_SECONDS = 60 * 60 * 24 * 30  # 30 days
\ No newline at end of file
+    JWT_EXP_SECONDS = 60 * 60 * 24 * 30  # 30 days
+    # On-disk cache of parsed PDF/DOCX packets (see logic/parse_cache.py)
+    PACKET_CACHE_DIR = os.environ.get("PACKET_CACHE_DIR", os.path.join(os.path.abspath(os.path.dirname(__file__)), ".cache", "packets"))
+    PACKET_CACHE_MAX_BYTES = int(os.environ.get("PACKET_CACHE_MAX_BYTES", 64 * 1024 * 1024))  # 64MB
+    # Concurrent background packet parses (see logic/packet_jobs.py); extra loads queue
+    PACKET_LOAD_MAX_IN_FLIGHT = int(os.environ.get("PACKET_LOAD_MAX_IN_FLIGHT", 2))
+    # Warm packet pool (see logic/packet_pool.py): ready packets per format and total memory budget
+    PACKET_POOL_DEPTH = int(os.environ.get("PACKET_POOL_DEPTH", 2))
+    PACKET_POOL_MAX_BYTES = int(os.environ.get("PACKET_POOL_MAX_BYTES", 32 * 1024 * 1024))  # 32MB
+    # Packet catalog rescan interval in seconds (see logic/packet_catalog.py); 0 disables the timer
+    PACKET_CATALOG_RESCAN_SECONDS = float(os.environ.get("PACKET_CATALOG_RESCAN_SECONDS", 30))
+    # Shared secret for /admin endpoints (X-Admin-Token header); admin endpoints are disabled when unset
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+    # Buzz arbitration (see logic/buzz_arbiter.py): collection window and lockout in seconds
+    BUZZ_WINDOW_SECONDS = float(os.environ.get("BUZZ_WINDOW_SECONDS", 0.15))
+    BUZZ_LOCKOUT_SECONDS = float(os.environ.get("BUZZ_LOCKOUT_SECONDS", 5))
+    BUZZ_AUDIT_SIZE = int(os.environ.get("BUZZ_AUDIT_SIZE", 500))
+    # Score updates within this many seconds are sent as one delta (see logic/scoreboard.py)
+    SCOREBOARD_COALESCE_SECONDS = float(os.environ.get("SCOREBOARD_COALESCE_SECONDS", 0.05))
+    # Worker threads running timer callbacks for all rooms (see logic/scheduler.py)
+    SCHEDULER_WORKERS = int(os.environ.get("SCHEDULER_WORKERS", 4))
+    # How often loaded rules schemas are checked for changes (see logic/rules_registry.py); 0 disables
+    RULES_RELOAD_SECONDS = float(os.environ.get("RULES_RELOAD_SECONDS", 5))
+    # Server-paced reader mode: words streamed per second during pyramidal tossups
+    READER_WORDS_PER_SECOND = float(os.environ.get("READER_WORDS_PER_SECOND", 3))
+    # Shared state and pub/sub for multi-worker deployments (see logic/state_store.py):
+    # memory:// keeps everything in-process; redis://host:6379/0 shares rooms across workers
+    STATE_STORE_URL = os.environ.get("STATE_STORE_URL", "memory://")
+    # Room ownership lease (see logic/room_router.py); renewed every third of the TTL
+    ROOM_OWNER_TTL_SECONDS = float(os.environ.get("ROOM_OWNER_TTL_SECONDS", 15))
+    # Seconds a dropped player keeps score, team and moderator role while reconnecting (see logic/session_index.py)
+    RECONNECT_GRACE_SECONDS = float(os.environ.get("RECONNECT_GRACE_SECONDS", 30))
+    # Per-room event journals for crash recovery and replay (see logic/room_journal.py); empty disables.
+    # Keep on persistent storage: a journal only survives restarts its directory survives.
+    JOURNAL_DIR = os.environ.get("JOURNAL_DIR", os.path.join(os.path.abspath(os.path.dirname(__file__)), "journals"))
+    JOURNAL_FSYNC_SECONDS = float(os.environ.get("JOURNAL_FSYNC_SECONDS", 0.2))
+    JOURNAL_FSYNC_BYTES = int(os.environ.get("JOURNAL_FSYNC_BYTES", 64 * 1024))
+    JOURNAL_SNAPSHOT_EVERY = int(os.environ.get("JOURNAL_SNAPSHOT_EVERY", 500))  # records between snapshots
+    # Write-behind gameplay stats (see logic/stat_buffer.py): flush interval, open-batch size,
+    # sealed batches allowed to wait for the writer, and how long a full buffer makes scoring wait
+    STAT_FLUSH_SECONDS = float(os.environ.get("STAT_FLUSH_SECONDS", 2))
+    STAT_BUFFER_MAX_KEYS = int(os.environ.get("STAT_BUFFER_MAX_KEYS", 500))
+    STAT_BUFFER_MAX_BATCHES = int(os.environ.get("STAT_BUFFER_MAX_BATCHES", 4))
+    STAT_BUFFER_BLOCK_SECONDS = float(os.environ.get("STAT_BUFFER_BLOCK_SECONDS", 1))
+    # Failed writes of one batch before it is set aside in the dead-letter file (JSON lines; empty
+    # only logs it). Replay with python -m utils.replay_stat_dead_letters
+    STAT_BATCH_MAX_RETRIES = int(os.environ.get("STAT_BATCH_MAX_RETRIES", 5))
+    STAT_DEAD_LETTER_PATH = os.environ.get("STAT_DEAD_LETTER_PATH", os.path.join(os.path.abspath(os.path.dirname(__file__)), "stat_dead_letter.jsonl"))
+    # Cached leaderboard/records responses (see ui/response_cache.py): entries kept, and a ceiling on
+    # how long one is served for changes that don't go through a stat write (renames, new rooms)
+    RESPONSE_CACHE_ENTRIES = int(os.environ.get("RESPONSE_CACHE_ENTRIES", 512))
+    RESPONSE_CACHE_MAX_AGE_SECONDS = float(os.environ.get("RESPONSE_CACHE_MAX_AGE_SECONDS", 60))
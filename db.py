@@ -1,3 +1,16 @@
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+def standalone_app(database_uri=None):
+    """Flask app bound to db alone, for command-line tools (python -m utils.*)."""
+    from flask import Flask
+    from config import Config
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if database_uri:
+        app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    db.init_app(app)
+    return app
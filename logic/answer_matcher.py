@@ -0,0 +1,202 @@
+"""
+Precompiled answer-line matcher for automatic judging.
+- An answer line is parsed once into an AnswerMatcher: the primary answer plus the
+  bracketed/parenthesized directives quizbowl writers use:
+    "Battle of Waterloo [accept Waterloo; prompt on Belgium; do not accept Wavre]"
+- Every alternate is normalized up front (accents, case, punctuation, leading articles),
+  so judging is a set lookup plus, at most, a few bounded edit-distance checks.
+- Typos are tolerated with a length-scaled edit budget; "do not accept" always wins.
+- Matchers are cached per question id (and answer text, so an edited packet recompiles).
+
+Usage:
+    from logic.answer_matcher import judge, compile_questions
+    compile_questions(packet_questions)          # at packet load time
+    judge(question, "waterlo")                   # "correct" | "prompt" | "incorrect"
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple
+
+CORRECT = "correct"
+PROMPT = "prompt"
+INCORRECT = "incorrect"
+
+_PREFIX = re.compile(r"^\s*(?:bonus\s+)?answer\s*:\s*", re.IGNORECASE)
+_BRACKETS = re.compile(r"[\[(]([^\])]*)[\])]")
+_DIRECTIVE = re.compile(
+    r"^\s*(do\s+not\s+accept(?:\s+or\s+prompt\s+on)?|don'?t\s+accept|reject|"
+    r"(?:also\s+)?accept|prompt(?:\s+on)?)\b[\s:]*(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_OR = re.compile(r"\s*(?:,\s*)?\bor\b\s*|\s*/\s*", re.IGNORECASE)
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+_ARTICLES = ("the ", "a ", "an ")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse spaces and drop a leading article."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = text.replace("&", " and ")
+    text = _SPACE.sub(" ", _PUNCT.sub(" ", text)).strip()
+    for article in _ARTICLES:
+        if text.startswith(article):
+            return text[len(article):]
+    return text
+
+
+def _alternates(text: str) -> List[str]:
+    return [a for a in (normalize(part) for part in _OR.split(text)) if a]
+
+
+def parse_answer_line(line: str) -> Tuple[List[str], List[str], List[str]]:
+    """Split an answer line into normalized (accept, prompt, reject) lists; the primary comes first."""
+    line = _PREFIX.sub("", line or "")
+    accept, prompt, reject = [], [], []
+    for directive_text in _BRACKETS.findall(line):
+        for clause in directive_text.split(";"):
+            m = _DIRECTIVE.match(clause)
+            if not m:
+                accept.extend(_alternates(clause))
+                continue
+            verb = m.group(1).lower()
+            target = reject if verb.startswith(("do", "don", "reject")) else prompt if verb.startswith("prompt") else accept
+            target.extend(_alternates(m.group(2)))
+    primary = _BRACKETS.sub(" ", line)
+    return _alternates(primary) + accept, prompt, reject
+
+
+def edit_budget(length: int) -> int:
+    """Typos allowed for an answer of `length` characters."""
+    if length <= 4:
+        return 0
+    if length <= 8:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance between a and b, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, start=1):
+        # Only cells within `limit` of the diagonal can stay under the budget
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(lo, hi + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ca != b[j - 1]))
+        if min(current[lo - 1:hi + 1]) > limit:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+
+class AnswerMatcher:
+    __slots__ = ("primary", "accept", "prompt", "reject", "_fuzzy")
+
+    def __init__(self, answer_line: str):
+        accept, prompt, reject = parse_answer_line(answer_line)
+        self.primary: str = accept[0] if accept else ""
+        self.accept: FrozenSet[str] = frozenset(accept)
+        self.prompt: FrozenSet[str] = frozenset(prompt)
+        self.reject: FrozenSet[str] = frozenset(reject)
+        # (alternate, verdict, budget) for alternates long enough to allow a typo
+        self._fuzzy: Tuple[Tuple[str, str, int], ...] = tuple(
+            (alt, verdict, edit_budget(len(alt)))
+            for alts, verdict in ((accept, CORRECT), (prompt, PROMPT))
+            for alt in alts
+            if edit_budget(len(alt))
+        )
+
+    def judge(self, response: str) -> str:
+        given = normalize(response)
+        if not given or given in self.reject:
+            return INCORRECT
+        if given in self.accept:
+            return CORRECT
+        if given in self.prompt:
+            return PROMPT
+        for alt, verdict, budget in self._fuzzy:
+            if bounded_levenshtein(given, alt, budget) <= budget:
+                # A near-miss on a rejected alternate is still a rejection
+                if any(bounded_levenshtein(given, r, edit_budget(len(r))) <= edit_budget(len(r))
+                       for r in self.reject):
+                    return INCORRECT
+                return verdict
+        return INCORRECT
+
+    def __repr__(self):
+        return f"AnswerMatcher(primary={self.primary!r}, accept={len(self.accept)}, prompt={len(self.prompt)})"
+
+
+class MatcherCache:
+    """Bounded LRU of compiled matchers keyed by (question id, answer line)."""
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._matchers: "OrderedDict[Tuple[str, str], AnswerMatcher]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question_id: str, answer_line: str) -> AnswerMatcher:
+        key = (question_id, answer_line)
+        with self._lock:
+            matcher = self._matchers.get(key)
+            if matcher is not None:
+                self._matchers.move_to_end(key)
+                self.hits += 1
+                return matcher
+            self.misses += 1
+        matcher = AnswerMatcher(answer_line)
+        with self._lock:
+            self._matchers[key] = matcher
+            while len(self._matchers) > self.max_entries:
+                self._matchers.popitem(last=False)
+        return matcher
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._matchers), "hits": self.hits, "misses": self.misses}
+
+
+_cache = MatcherCache()
+
+
+def matcher_for(question: Any) -> Optional[AnswerMatcher]:
+    """Compiled matcher for a Question (or anything with id/answer); None when it has no answer."""
+    answer = getattr(question, "answer", "") or ""
+    if not answer:
+        return None
+    return _cache.get(str(getattr(question, "id", "")), answer)
+
+
+def matcher_for_answer(answer_line: str) -> AnswerMatcher:
+    """Matcher for a bare answer line (no question id), e.g. StatsManager.check_answer."""
+    return _cache.get("", answer_line or "")
+
+
+def compile_questions(questions: Iterable[Any]) -> int:
+    """Precompile matchers for a packet; returns how many questions have one."""
+    return sum(1 for q in questions if matcher_for(q) is not None)
+
+
+def judge(question: Any, response: str) -> Optional[str]:
+    """"correct" / "prompt" / "incorrect", or None when the question cannot be auto-judged."""
+    matcher = matcher_for(question)
+    return matcher.judge(response) if matcher else None
+
+
+def matcher_stats():
+    return _cache.stats()
@@ -0,0 +1,180 @@
+"""
+Latency-fair buzz arbitration, one arbiter per room.
+- Every buzz is stamped with the server's monotonic clock on arrival.
+- Each connection's round-trip time is tracked from ping/pong samples; a buzz is credited
+  with half the connection's RTT (the one-way delay), capped at the collection window.
+- The first buzz opens a short collection window; when it closes the earliest compensated
+  buzz wins, ties going to whichever arrived first. Later buzzes hit the lockout.
+- Each window is numbered; resolve(window) ignores a timer left over from a window that was
+  already cleared, so it can never close a newer one early.
+- Every decision (all candidates, their RTTs and compensated times) is kept in a bounded
+  audit log.
+- State is guarded by the arbiter's own lock, so rooms never contend with each other.
+
+Usage:
+    from logic.buzz_arbiter import BuzzArbiter
+    arbiter = BuzzArbiter(window=0.15, lockout=5)
+    arbiter.record_rtt(sid, 0.080)
+    outcome = arbiter.buzz("alice", sid, position=17)   # {"status": "opened" | "queued" | "locked", ...}
+    decision = arbiter.resolve(outcome["window"])  # after `window` seconds: {"winner": "alice", ...}
+    arbiter.clear()                          # once the winner has answered
+"""
+
+import time
+import itertools
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+class RttTracker:
+    """Recent RTT samples per connection; the minimum is the least jitter-prone estimate."""
+
+    def __init__(self, samples: int = 8):
+        self._samples: Dict[str, Deque[float]] = {}
+        self._size = samples
+
+    def record(self, sid: str, rtt: float):
+        if rtt < 0:
+            return
+        self._samples.setdefault(sid, deque(maxlen=self._size)).append(rtt)
+
+    def estimate(self, sid: str) -> Optional[float]:
+        samples = self._samples.get(sid)
+        return min(samples) if samples else None
+
+    def forget(self, sid: str):
+        self._samples.pop(sid, None)
+
+
+class BuzzArbiter:
+    def __init__(self, window: float = 0.15, lockout: float = 5, rtt_samples: int = 8,
+                 audit_size: int = 500, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.lockout = lockout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rtt = RttTracker(rtt_samples)
+        self._pings: Dict[str, Dict[int, float]] = {}    # sid -> {ping id: sent_at}
+        self._ping_ids = itertools.count(1)
+        self._candidates: List[Dict[str, Any]] = []
+        self._window_closes: Optional[float] = None
+        self._window_id = 0                              # number of the open (or last) window
+        self._holder: Optional[str] = None
+        self._locked_until: float = 0.0
+        self._decisions = itertools.count(1)
+        self._audit: Deque[Dict[str, Any]] = deque(maxlen=audit_size)
+
+    # ---------- Latency ----------
+
+    def ping(self, sid: str) -> Dict[str, Any]:
+        """Payload for a latency_ping; the client echoes it back in latency_pong."""
+        with self._lock:
+            ping_id = next(self._ping_ids)
+            pending = self._pings.setdefault(sid, {})
+            pending[ping_id] = self._clock()
+            # Unanswered pings are dropped so a silent client cannot grow this map
+            while len(pending) > 4:
+                pending.pop(next(iter(pending)))
+        return {"id": ping_id}
+
+    def pong(self, sid: str, ping_id: int, transit: float = 0.0) -> Optional[float]:
+        """Record the RTT for an echoed ping; returns the sample or None if unknown.
+        transit: time the pong spent being forwarded between workers before reaching us."""
+        with self._lock:
+            sent_at = self._pings.get(sid, {}).pop(ping_id, None)
+            if sent_at is None:
+                return None
+            rtt = self._clock() - max(0.0, transit) - sent_at
+            self._rtt.record(sid, rtt)
+            return rtt
+
+    def record_rtt(self, sid: str, rtt: float):
+        with self._lock:
+            self._rtt.record(sid, rtt)
+
+    def forget(self, sid: str):
+        with self._lock:
+            self._rtt.forget(sid)
+            self._pings.pop(sid, None)
+
+    def _one_way(self, sid: str) -> float:
+        rtt = self._rtt.estimate(sid)
+        # Compensation never exceeds the window, or a buzz could beat an already-closed decision
+        return min(rtt / 2, self.window) if rtt is not None else 0.0
+
+    # ---------- Arbitration ----------
+
+    def buzz(self, player: str, sid: str, position: Optional[int] = None, transit: float = 0.0) -> Dict[str, Any]:
+        """position: how far into the question the buzz came (e.g. words revealed), kept for audit.
+        transit: time the buzz spent being forwarded between workers; it counts as arrival delay."""
+        now = self._clock() - min(max(0.0, transit), self.window)
+        with self._lock:
+            if self._holder is not None or now < self._locked_until:
+                return {"status": "locked", "remaining": max(0.0, self._locked_until - now)}
+            if any(c["player"] == player for c in self._candidates):
+                return {"status": "queued"}
+            one_way = self._one_way(sid)
+            self._candidates.append({
+                "player": player,
+                "received": now,
+                "rtt": self._rtt.estimate(sid),
+                "compensated": now - one_way,
+                "position": position,
+                "order": len(self._candidates)
+            })
+            if self._window_closes is None:
+                self._window_closes = now + self.window
+                self._window_id += 1
+                return {"status": "opened", "closes_in": self.window, "window": self._window_id}
+            return {"status": "queued"}
+
+    def resolve(self, window: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Close the collection window and pick the winner; None when no window is open,
+        or when `window` (the number buzz() returned on opening) is no longer the open one."""
+        with self._lock:
+            if self._window_closes is None or (window is not None and window != self._window_id):
+                return None
+            candidates, self._candidates = self._candidates, []
+            opened_at = self._window_closes - self.window
+            self._window_closes = None
+            winner = min(candidates, key=lambda c: (c["compensated"], c["order"]))
+            now = self._clock()
+            self._holder = winner["player"]
+            self._locked_until = now + self.lockout
+            decision = {
+                "decision": next(self._decisions),
+                "winner": winner["player"],
+                "position": winner["position"],
+                "opened_at": opened_at,
+                "resolved_at": now,
+                "candidates": [
+                    {"player": c["player"], "received": round(c["received"] - opened_at, 6),
+                     "rtt": c["rtt"], "compensated": round(c["compensated"] - opened_at, 6),
+                     "position": c["position"]}
+                    for c in candidates
+                ]
+            }
+            self._audit.append(decision)
+            return decision
+
+    def holder(self) -> Optional[str]:
+        with self._lock:
+            return self._holder
+
+    def lockout_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._locked_until - self._clock())
+
+    def clear(self):
+        """Release the buzz once the holder has answered (or the question changes)."""
+        with self._lock:
+            self._holder = None
+            self._locked_until = 0.0
+            self._candidates = []
+            self._window_closes = None
+
+    def audit_log(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            decisions = list(self._audit)
+        return decisions[-limit:] if limit else decisions
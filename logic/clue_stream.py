@@ -0,0 +1,89 @@
+"""
+Append-only clue stream for pyramidal reveals.
+- A tossup is split once into words; clue boundaries are remembered as word offsets.
+- Every reveal sends only the words added since the last one, tagged with a sequence number
+  ("clue_append"); the client appends in order and asks for a resync if it sees a gap.
+- The stream position (words revealed so far) is the buzz point recorded with each buzz,
+  whether clues are revealed by the moderator or read out word by word by the server.
+
+Wire format:
+    clue_append   {"qid": "q3", "seq": 4, "text": " Napoleon", "word": 17, "clue": 1}
+                  (a catch-up segment spanning several seqs also carries "base": <seq it applies on>)
+    question_text {"qid": "q3", "seq": 4, "text": "<everything revealed so far>"}
+
+Usage:
+    from logic.clue_stream import ClueStream
+    stream = ClueStream("q3", question.clues)
+    segment = stream.next_clue()        # whole next clue (moderator reveal)
+    segment = stream.advance(1)         # one more word (reader mode)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class ClueStream:
+    __slots__ = ("qid", "words", "clue_ends", "position", "seq", "_marks")
+
+    def __init__(self, qid: str, clues: Iterable[str]):
+        self.qid = qid
+        # Each word carries its leading separator: "" first, "\n" at a clue start, " " otherwise
+        self.words: List[str] = []
+        self.clue_ends: List[int] = []
+        for clue in clues:
+            for i, word in enumerate(clue.split()):
+                sep = "" if not self.words else ("\n" if i == 0 else " ")
+                self.words.append(sep + word)
+            self.clue_ends.append(len(self.words))
+        self.position = 0   # words revealed so far
+        self.seq = 0        # last sequence number sent
+        self._marks = [0]   # position after each seq
+
+    @property
+    def total_clues(self) -> int:
+        return len(self.clue_ends)
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.words)
+
+    def revealed_clue(self) -> int:
+        """Index of the last clue fully revealed (-1 when none)."""
+        return sum(1 for end in self.clue_ends if end <= self.position) - 1
+
+    def _advance_to(self, target: int) -> Optional[Dict[str, Any]]:
+        target = min(target, len(self.words))
+        if target <= self.position:
+            return None
+        text = "".join(self.words[self.position:target])
+        self.position = target
+        self.seq += 1
+        self._marks.append(target)
+        return {"qid": self.qid, "seq": self.seq, "text": text, "word": self.position,
+                "clue": self.revealed_clue()}
+
+    def advance(self, words: int = 1) -> Optional[Dict[str, Any]]:
+        """Reveal the next `words` words; None once everything is revealed."""
+        return self._advance_to(self.position + words)
+
+    def next_clue(self) -> Optional[Dict[str, Any]]:
+        """Reveal up to the end of the current clue (or the whole next clue)."""
+        for end in self.clue_ends:
+            if end > self.position:
+                return self._advance_to(end)
+        return None
+
+    def replay(self, marks: Iterable[int]):
+        """Re-apply recorded reveal positions (seq 1, 2, ...) after a restart."""
+        for word in list(marks)[1:]:
+            self._advance_to(word)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"qid": self.qid, "seq": self.seq, "text": "".join(self.words[:self.position])}
+
+    def since(self, seq: int) -> Optional[Dict[str, Any]]:
+        """One segment covering everything after `seq` (None when nothing is missing)."""
+        if not 0 <= seq < self.seq:
+            return None
+        return {"qid": self.qid, "seq": self.seq, "base": seq,
+                "text": "".join(self.words[self._marks[seq]:self.position]),
+                "word": self.position, "clue": self.revealed_clue()}
@@ -0,0 +1,206 @@
+"""
+Precompiled question corpus.
+- A build step parses every packet under packets/ once and writes a single binary file.
+- The server memory-maps that file; picking a packet is an index lookup with no parsing.
+- The mapping is read-only, so every worker process shares the same page-cache pages.
+
+File layout (little-endian):
+    header   : magic(8s) version(I) entries_offset(Q) directory_offset(Q) directory_length(Q)
+    records  : compact UTF-8 JSON, one Question.to_dict() per record
+    entries  : fixed-width (record_offset Q, record_length I) per question
+    directory: JSON {"formats": {fmt: [{"name", "start", "count", "ids"}]}}
+
+Usage:
+    python -m utils.build_corpus            # writes packets/corpus.bin
+    from logic.corpus import open_corpus
+    corpus = open_corpus()
+    questions = corpus.random_packet("NAQT") if corpus else []
+"""
+
+import os
+import json
+import mmap
+import random
+import struct
+from typing import Any, Dict, List, Optional
+
+from logic.packet_parsers import PACKET_EXTENSIONS
+from logic.parse_cache import load_packet_cached
+from logic.question_model import Question, question_from_dict
+
+PACKETS_ROOT = os.path.normpath(os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "packets"))
+CORPUS_PATH = os.path.join(PACKETS_ROOT, "corpus.bin")
+FORMATS = ["NAQT", "OSSAA", "Froshmore", "Trivia"]
+
+MAGIC = b"QBCORPUS"
+VERSION = 2
+HEADER = struct.Struct("<8sIQQQ")
+ENTRY = struct.Struct("<QI")
+
+
+def find_format_dir(root: str, fmt: str) -> Optional[str]:
+    """Locate packets/<fmt>, falling back to the shallowest case-insensitive match."""
+    exact = os.path.join(root, fmt)
+    if os.path.isdir(exact):
+        return exact
+    best = None
+    for dirpath, dirnames, _ in os.walk(root):
+        for d in dirnames:
+            if d.lower() == fmt.lower():
+                candidate = os.path.join(dirpath, d)
+                if best is None or candidate.count(os.sep) < best.count(os.sep):
+                    best = candidate
+    return best
+
+
+def build_corpus(packets_root: str = PACKETS_ROOT, out_path: str = CORPUS_PATH,
+                 formats: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Parse every packet for each format and write the binary corpus.
+    Returns {format: question_count}. The file is replaced atomically so running
+    servers keep their existing mapping until they reopen it.
+    """
+    formats = formats or FORMATS
+    directory: Dict[str, List[Dict[str, Any]]] = {}
+    entries: List[tuple] = []
+    counts: Dict[str, int] = {}
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)  # placeholder, rewritten once offsets are known
+        for fmt in formats:
+            folder = find_format_dir(packets_root, fmt)
+            packets = []
+            counts[fmt] = 0
+            if folder:
+                for fname in sorted(os.listdir(folder)):
+                    if not fname.lower().endswith(PACKET_EXTENSIONS):
+                        continue
+                    path = os.path.join(folder, fname)
+                    try:
+                        questions = load_packet_cached(path, fmt)
+                    except Exception as e:
+                        print(f"Skipping {path}: {e}")
+                        continue
+                    if not questions:
+                        continue
+                    start = len(entries)
+                    for q in questions:
+                        blob = json.dumps(q.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                        entries.append((f.tell(), len(blob)))
+                        f.write(blob)
+                    packets.append({
+                        "name": fname,
+                        "start": start,
+                        "count": len(questions),
+                        "ids": [q.id for q in questions]
+                    })
+                    counts[fmt] += len(questions)
+            directory[fmt.lower()] = packets
+
+        entries_offset = f.tell()
+        for offset, length in entries:
+            f.write(ENTRY.pack(offset, length))
+
+        directory_blob = json.dumps({"formats": directory}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        directory_offset = f.tell()
+        f.write(directory_blob)
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, entries_offset, directory_offset, len(directory_blob)))
+
+    os.replace(tmp_path, out_path)
+    return counts
+
+
+class QuestionCorpus:
+    """Read-only, memory-mapped view over a compiled corpus file."""
+
+    def __init__(self, path: str = CORPUS_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        # Freshness is judged against the file this instance mapped, not whatever is at path now:
+        # build_corpus replaces the file, and the old mapping keeps serving the old contents
+        self.mtime = os.fstat(self._file.fileno()).st_mtime
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, version, entries_offset, directory_offset, directory_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a v{VERSION} question corpus: {path}")
+        self._entries_offset = entries_offset
+        directory = json.loads(self._mm[directory_offset:directory_offset + directory_length])
+        self._packets: Dict[str, List[Dict[str, Any]]] = directory.get("formats", {})
+        # (format, packet name) -> {question id: entry number}, built on first lookup
+        self._id_index: Dict[tuple, Dict[str, int]] = {}
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    # ---------- Index ----------
+
+    def formats(self) -> List[str]:
+        return [fmt for fmt, packets in self._packets.items() if packets]
+
+    def has_format(self, fmt: str) -> bool:
+        return bool(self._packets.get(fmt.lower()))
+
+    def packet_names(self, fmt: str) -> List[str]:
+        return [p["name"] for p in self._packets.get(fmt.lower(), [])]
+
+    def question_count(self, fmt: str) -> int:
+        return sum(p["count"] for p in self._packets.get(fmt.lower(), []))
+
+    def _packet(self, fmt: str, name: str) -> Optional[Dict[str, Any]]:
+        for p in self._packets.get(fmt.lower(), []):
+            if p["name"] == name:
+                return p
+        return None
+
+    # ---------- Records ----------
+
+    def _read_entry(self, entry_no: int, fmt: str) -> Question:
+        offset, length = ENTRY.unpack_from(self._mm, self._entries_offset + entry_no * ENTRY.size)
+        return question_from_dict(json.loads(self._mm[offset:offset + length]), fmt)
+
+    def load_packet(self, fmt: str, name: str) -> List[Question]:
+        p = self._packet(fmt, name)
+        if not p:
+            return []
+        return [self._read_entry(i, fmt) for i in range(p["start"], p["start"] + p["count"])]
+
+    def random_packet(self, fmt: str) -> List[Question]:
+        packets = self._packets.get(fmt.lower())
+        if not packets:
+            return []
+        p = random.choice(packets)
+        return [self._read_entry(i, fmt) for i in range(p["start"], p["start"] + p["count"])]
+
+    def get_question(self, fmt: str, name: str, question_id: str) -> Optional[Question]:
+        key = (fmt.lower(), name)
+        ids = self._id_index.get(key)
+        if ids is None:
+            p = self._packet(fmt, name)
+            if not p:
+                return None
+            ids = {qid: p["start"] + i for i, qid in enumerate(p["ids"])}
+            self._id_index[key] = ids
+        entry_no = ids.get(str(question_id))
+        return self._read_entry(entry_no, fmt) if entry_no is not None else None
+
+
+def open_corpus(path: str = CORPUS_PATH) -> Optional[QuestionCorpus]:
+    """Open the compiled corpus if it exists; None lets callers fall back to parsing files."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        return QuestionCorpus(path)
+    except Exception as e:
+        print(f"Ignoring unreadable corpus {path}: {e}")
+        return None
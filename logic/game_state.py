@@ -0,0 +1,198 @@
+"""
+Per-room game state and the in-process room registry.
+- GameState holds everything one match needs (player sessions, scoreboard, moderator, buzz
+  arbiter, loaded packet, question cursor) behind its own lock, so rooms never contend with
+  each other.
+- RoomRegistry maps Room.code -> GameState and sid -> (code, username) so every Socket.IO
+  event can be routed to its room and broadcasts stay scoped to that room's members.
+- Rooms are created on first use and dropped when their last player leaves.
+- With a JournalStore, every room event is journaled and a room whose journal survived a
+  restart is rebuilt from it on first use (players come back as away, within the grace period).
+
+Usage:
+    from logic.game_state import RoomRegistry, room_code
+    rooms = RoomRegistry()
+    state = rooms.get_or_create(room_code(data.get("code")))
+    with state.lock:
+        state.sessions.attach(username, sid)
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from logic.question_model import Question, question_from_dict
+from logic.buzz_arbiter import BuzzArbiter
+from logic.scoreboard import Scoreboard
+from logic.clue_stream import ClueStream
+from logic.scheduler import TimerHandle
+from logic.session_index import Session, SessionIndex
+from logic.room_journal import JournalStore, RoomJournal
+
+# emit(room code, event, payload): how room-scoped events leave the process
+RoomEmit = Callable[[str, str, Dict[str, Any]], None]
+
+# Clients that do not send a room code share this room (single-game behaviour of old builds)
+DEFAULT_ROOM = "LOBBY"
+CODE_LENGTH = 8  # models.Room.code is String(8)
+
+
+def room_code(value: Optional[str]) -> str:
+    """Normalized room code; anything but letters and digits means the default room
+    (codes name journal files, so they must never carry path characters)."""
+    code = str(value or "").strip().upper()[:CODE_LENGTH]
+    return code if code.isascii() and code.isalnum() else DEFAULT_ROOM
+
+
+class GameState:
+    def __init__(self, code: str, emit: Optional[RoomEmit] = None):
+        self.code = code
+        self.lock = threading.RLock()
+        # username <-> sid; dropped connections keep their seat for the reconnect grace period
+        self.sessions = SessionIndex(grace=Config.RECONNECT_GRACE_SECONDS)
+        # {username: score}, published to the room as versioned deltas
+        self.scoreboard = Scoreboard(lambda event, payload: self._publish_scores(emit, event, payload),
+                                     window=Config.SCOREBOARD_COALESCE_SECONDS)
+        self.moderator: Optional[str] = None       # username
+        # Buzzes are arbitrated outside self.lock, so a burst of buzzes never waits on answers/reveals
+        self.arbiter = BuzzArbiter(window=Config.BUZZ_WINDOW_SECONDS, lockout=Config.BUZZ_LOCKOUT_SECONDS,
+                                   audit_size=Config.BUZZ_AUDIT_SIZE)
+        # Packet/session
+        self.setup: Dict[str, Any] = {}            # setup params
+        self.packet_questions: List[Question] = []
+        self.current_index: int = -1
+        self.stream: Optional[ClueStream] = None   # pyramidal reveal of the current question
+        self.reader: Optional[TimerHandle] = None  # server-paced word reader, when running
+        self.journal: Optional[RoomJournal] = None
+
+    def record(self, kind: str, payload: Dict[str, Any]):
+        """Journal a room event (no-op without a journal). Call in the order events happen."""
+        if self.journal is not None:
+            self.journal.append(kind, payload)
+
+    def _publish_scores(self, emit: Optional[RoomEmit], event: str, payload: Dict[str, Any]):
+        if event == "score_delta":
+            self.record("score", {"version": payload["version"], "changes": payload["changes"],
+                                  "removed": payload["removed"]})
+        if emit:
+            emit(self.code, event, payload)
+
+    def restore(self, image: Dict[str, Any], on_expire: Callable[[Session], None]):
+        """Rebuild from a recovered journal image (see logic/room_journal.py) without journaling."""
+        self.setup = image["setup"]
+        self.packet_questions = [question_from_dict(d, self.format) for d in image["questions"]]
+        self.current_index = image["index"]
+        question = self.current_question()
+        if question is not None and self.format != "Trivia":
+            self.stream = ClueStream(question.id, question.clues)
+            self.stream.replay(image["marks"])
+        self.moderator = image["moderator"]
+        self.scoreboard.load(image["scores"], image["score_version"])
+        for username, player in image["players"].items():
+            self.sessions.restore(username, player["token"], player["role"], player["team"], on_expire)
+
+    @property
+    def format(self) -> str:
+        return self.setup.get("format") or "NAQT"
+
+    def current_question(self) -> Optional[Question]:
+        if 0 <= self.current_index < len(self.packet_questions):
+            return self.packet_questions[self.current_index]
+        return None
+
+    def next_index(self) -> int:
+        if not self.packet_questions:
+            return -1
+        if self.current_index + 1 < len(self.packet_questions):
+            return self.current_index + 1
+        return 0  # loop around
+
+    def stop_reader(self):
+        if self.reader is not None:
+            self.reader.cancel()
+            self.reader = None
+
+    def player_list(self) -> Dict[str, Any]:
+        return {"players": self.sessions.usernames(), "moderator": self.moderator,
+                "away": self.sessions.away()}
+
+
+class RoomRegistry:
+    def __init__(self, emit: Optional[RoomEmit] = None, journals: Optional[JournalStore] = None,
+                 on_restore: Optional[Callable[[GameState, Dict[str, Any]], None]] = None):
+        self._emit = emit
+        self._journals = journals
+        self._on_restore = on_restore   # on_restore(state, image) rebuilds a recovered room
+        self._lock = threading.Lock()
+        self._rooms: Dict[str, GameState] = {}
+        self._members: Dict[str, Tuple[str, Optional[str]]] = {}  # sid -> (code, username)
+
+    def get(self, code: str) -> Optional[GameState]:
+        with self._lock:
+            return self._rooms.get(code)
+
+    def get_or_create(self, code: str) -> GameState:
+        image = None
+        with self._lock:
+            state = self._rooms.get(code)
+            if state is None:
+                state = self._rooms[code] = GameState(code, self._emit)
+                if self._journals is not None:
+                    state.journal, image = self._journals.open(code)
+                    if image is not None and self._on_restore is not None:
+                        state.lock.acquire()  # held until restored: other callers wait on the room only
+                    else:
+                        image = None
+        if image is not None:
+            # Restoring (and compiling the packet's answer lines) runs outside the registry lock
+            try:
+                self._on_restore(state, image)
+            finally:
+                state.lock.release()
+        return state
+
+    def bind(self, sid: str, code: str, username: Optional[str] = None):
+        """Remember which room (and username, once joined) a connection belongs to."""
+        with self._lock:
+            self._members[sid] = (code, username)
+
+    def room_of(self, sid: str) -> Optional[str]:
+        with self._lock:
+            member = self._members.get(sid)
+            return member[0] if member else None
+
+    def unbind(self, sid: str) -> Tuple[Optional[GameState], Optional[str]]:
+        """Forget a connection; returns its room state (if any) and username."""
+        with self._lock:
+            code, username = self._members.pop(sid, (None, None))
+            return (self._rooms.get(code) if code else None), username
+
+    def discard_if_empty(self, state: GameState) -> bool:
+        """Drop the room once nobody is in it; True when it was dropped."""
+        with self._lock, state.lock:
+            if not len(state.sessions) and self._rooms.get(state.code) is state and \
+                    not any(code == state.code for code, _ in self._members.values()):
+                del self._rooms[state.code]
+                if self._journals is not None:
+                    state.scoreboard.flush()   # journal the last removals before archiving
+                    self._journals.close(state.code)
+                return True
+            return False
+
+    def evict(self, code: str) -> Optional[GameState]:
+        """Stop running a room here without archiving it (its lease moved to another worker):
+        the journal is closed in place, since the new owner recovers the room from it."""
+        with self._lock:
+            state = self._rooms.pop(code, None)
+        if state is None:
+            return None
+        with state.lock:
+            state.stop_reader()
+            state.journal = None
+        if self._journals is not None:
+            self._journals.close(code, archive=False)
+        return state
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"rooms": len(self._rooms), "connections": len(self._members)}
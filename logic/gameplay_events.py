@@ -2,53 +2,103 @@
 Real-time gameplay events (buzzing, scoring, timers, tiebreakers), strictly driven by rules schemas.
 Internationalization supported via Translator; language per-player, no conflicts across room.
 
+Lifecycle hooks for the app integration to call from its Socket.IO handlers:
+- join_game(room_id, user_id) when a player's socket joins the room (room + language sub-room)
+- leave_game(room_id) on leave, disconnect_game() on disconnect
+- end_match(room_id) when a match ends: final score delta, then the scoreboard is dropped
+- close_game(room_id) when the room closes, to drop its per-room caches
+
 Socket events expected in app integration:
 - "tossup" -> display question
 - "buzz_lock" -> lock others
-- "score_update" -> adjust scores
+- "buzz_result" -> per-answer outcome {user_id, points, result}
+- "score_delta" / "score_snapshot" -> versioned scoreboard (logic/scoreboard.py), same channel as app.py rooms
 - "timer", "timer_end" -> countdown display
 - "tiebreaker" -> sudden-death notification
+
+Stats are written behind play (logic/stat_buffer.py): scoring only buffers the award, and each
+tossup/bonus cycle's deltas are handed to the writer when the next cycle starts (end_cycle).
 """
 
 import time
-import threading
-from flask_socketio import emit
-from db import db
-from models import Room, Match, User, Team, TeamMember, RoomParticipant
-from stats_manager import record_team_points, record_individual_points
+from flask import current_app, request
+from flask_socketio import emit, join_room, leave_room
+from config import Config
 from logic.game_rules_engine import RulesEngine
 from logic.i18n import Translator
+from logic.scoreboard import Scoreboard
+from logic.scheduler import get_scheduler
+from logic.room_languages import room_languages
+from logic.stat_buffer import get_stat_buffer
+from logic.room_roster import room_rosters
 
 # Active buzz state per room
 active_buzzes = {}  # {room_id: {"buzzed": user_id, "timestamp": float}}
 
-# Timer threads per room
-timers = {}  # {room_id: threading.Thread}
+# Running countdown per room
+timers = {}  # {room_id: TimerHandle}
+
+# Versioned scoreboards per room, keyed by user id
+scoreboards = {}  # {room_id: Scoreboard}
+
+def scoreboard_for(room_id: int) -> Scoreboard:
+    board = scoreboards.get(room_id)
+    if board is None:
+        # Captured now: deltas are flushed from a timer thread with no request context
+        socketio = current_app.extensions["socketio"]
+        board = scoreboards.setdefault(room_id, Scoreboard(
+            lambda event, payload: socketio.emit(event, payload, to=str(room_id)),
+            window=Config.SCOREBOARD_COALESCE_SECONDS))
+    return board
 
 def _room_language_map(room_id: int):
     """
-    Build a map of user_id -> language for all human participants in the room.
-    Each client can render in their own language; server sends language-neutral events + localized labels.
+    Map of user_id -> language for all human participants in the room, served from the
+    room language cache (logic/room_languages.py); /language/set keeps it current.
     """
-    lang_map = {}
-    participants = RoomParticipant.query.filter_by(room_id=room_id).all()
-    user_ids = [p.user_id for p in participants if p.user_id and not p.is_bot]
-    users = User.query.filter(User.id.in_(user_ids)).all()
-    for u in users:
-        lang_map[u.id] = u.language or "en"
-    return lang_map
+    return room_languages.language_map(room_id)
+
+def join_game(room_id: int, user_id: int):
+    """Join the player's socket to the room and to its language sub-room."""
+    join_room(str(room_id))
+    room_languages.register(room_id, user_id, request.sid)
+
+def leave_game(room_id: int):
+    leave_room(str(room_id))
+    room_languages.unregister(request.sid)
+
+def disconnect_game():
+    room_languages.unregister(request.sid)
+
+def end_match(room_id: int):
+    """Publish the match's last score changes and drop its scoreboard; the next match starts at zero."""
+    end_cycle(room_id)
+    board = scoreboards.pop(room_id, None)
+    if board is not None:
+        board.flush()
+
+def close_game(room_id: int):
+    """Drop everything kept in memory for a room that has closed."""
+    stop_timer(room_id)
+    end_match(room_id)
+    active_buzzes.pop(room_id, None)
+    room_languages.close(room_id)
+    room_rosters.invalidate(room_id)
+
+def end_cycle(room_id: int):
+    """Close the current tossup/bonus cycle: buffered stats go to the writer (never waits on it)."""
+    get_stat_buffer().flush()
 
 def start_tossup(room_id: int, question_text: str, format_name: str):
     """Broadcast a tossup question to the room and reset buzz state."""
+    end_cycle(room_id)
     re = RulesEngine(format_name)
     active_buzzes[room_id] = {"buzzed": None, "timestamp": None}
     # Send a neutral event; clients pull localized labels per their own preference
     emit("tossup", {"text": question_text, "format": format_name}, room=str(room_id))
-    # Optionally send a label event per user (clients can ignore if they localize on the client)
-    lang_map = _room_language_map(room_id)
-    for uid, lang in lang_map.items():
-        tr = Translator(lang)
-        emit("label", {"user_id": uid, "label": tr.t("tossup_start")}, room=str(room_id))
+    # One label per language group, sent to that language's sub-room (clients can ignore it)
+    for lang, sub_room in room_languages.groups(room_id):
+        emit("label", {"language": lang, "label": Translator(lang).t("tossup_start")}, room=sub_room)
 
 def buzz_in(room_id: int, user_id: int):
     """Handle buzzing in: first buzz locks others out."""
@@ -70,46 +120,62 @@ def resolve_buzz(room_id: int, correct: bool, format_name: str, scope_id: int, r
     if not buzz or not buzz["buzzed"]:
         return
     user_id = buzz["buzzed"]
-    user = User.query.get(user_id)
-    if not user:
-        return
+    # Team resolution from the room's cached roster (logic/room_roster.py), not a query
+    team_id = room_rosters.team_of(room_id, user_id)
 
     re = RulesEngine(format_name)
-    # Determine points per rules
+    # Determine points per rules; stats are buffered, so nothing here waits on the database
     if correct:
         # Tossup points (account for power)
         pts = re.points_for_tossup(state=state)
-        record_individual_points(scope_id, user_id, format_name, round_number, pts, categories)
-        # Team resolution
-        team = Team.query.join(TeamMember, TeamMember.team_id == Team.id).filter(TeamMember.user_id == user_id).first()
-        if team:
-            record_team_points(scope_id, team.id, format_name, round_number, pts, categories)
-        emit("score_update", {"user_id": user_id, "points": pts, "result": "correct"}, room=str(room_id))
+        get_stat_buffer().add(scope_id, user_id, format_name, round_number, pts, categories, team_id=team_id)
+        scoreboard_for(room_id).add(str(user_id), pts)
+        emit("buzz_result", {"user_id": user_id, "points": pts, "result": "correct"}, room=str(room_id))
     else:
         penalty = re.neg_penalty()
-        record_individual_points(scope_id, user_id, format_name, round_number, penalty)
-        team = Team.query.join(TeamMember, TeamMember.team_id == Team.id).filter(TeamMember.user_id == user_id).first()
-        if team:
-            record_team_points(scope_id, team.id, format_name, round_number, penalty)
-        emit("score_update", {"user_id": user_id, "points": penalty, "result": "incorrect"}, room=str(room_id))
+        get_stat_buffer().add(scope_id, user_id, format_name, round_number, penalty, team_id=team_id)
+        scoreboard_for(room_id).add(str(user_id), penalty)
+        emit("buzz_result", {"user_id": user_id, "points": penalty, "result": "incorrect"}, room=str(room_id))
 
     # Reset buzz state
     active_buzzes[room_id] = {"buzzed": None, "timestamp": None}
 
 def start_timer(room_id: int, format_name: str, event_name: str):
-    """Start a countdown timer based on the format rules schema."""
+    """Start a countdown timer based on the format rules schema, replacing any running one.
+    A zero-length timer ends at once (timer_end, no handle)."""
     re = RulesEngine(format_name)
     duration = re.timer_seconds(event_name)
+    stop_timer(room_id)
+    # Captured now: ticks run on scheduler workers with no request context
+    socketio = current_app.extensions["socketio"]
+    room = str(room_id)
+    if duration <= 0:
+        socketio.emit("timer_end", {"event": event_name}, to=room)
+        return None
+    socketio.emit("timer", {"event": event_name, "remaining": duration}, to=room)
+    remaining = duration  # counted here, not read from handle.runs, which the dispatcher updates
+
+    def tick():
+        nonlocal remaining
+        if handle.cancelled:
+            return  # queued before stop_timer / a newer countdown replaced this one
+        remaining -= 1
+        if remaining > 0:
+            socketio.emit("timer", {"event": event_name, "remaining": remaining}, to=room)
+        else:
+            socketio.emit("timer_end", {"event": event_name}, to=room)
+            if timers.get(room_id) is handle:
+                timers.pop(room_id, None)
 
-    def countdown():
-        for remaining in range(duration, 0, -1):
-            emit("timer", {"event": event_name, "remaining": remaining}, room=str(room_id))
-            time.sleep(1)
-        emit("timer_end", {"event": event_name}, room=str(room_id))
+    handle = get_scheduler().call_every(1.0, tick, count=duration)
+    timers[room_id] = handle
+    return handle
 
-    t = threading.Thread(target=countdown)
-    timers[room_id] = t
-    t.start()
+def stop_timer(room_id: int):
+    """Cancel the room's running countdown, if any."""
+    handle = timers.pop(room_id, None)
+    if handle:
+        handle.cancel()
 
 def check_tiebreaker(room_id: int, format_name: str, end_of_round: bool, round_number: int):
     """
@@ -118,6 +184,7 @@ def check_tiebreaker(room_id: int, format_name: str, end_of_round: bool, round_n
     """
     if not end_of_round:
         return
+    end_cycle(room_id)
     re = RulesEngine(format_name)
     message = re.tiebreaker_message()
     emit("tiebreaker", {"message": message}, room=str(room_id))
\ No newline at end of file
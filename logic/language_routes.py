@@ -1,13 +1,15 @@
 """
 Language selection endpoints.
 - Users can set a default language in profile.
-- Users can change language at any time during gameplay.
+- Users can change language at any time during gameplay; cached room language maps and
+  per-language sub-rooms are updated on the spot.
 """
 
 from flask import Blueprint, request, jsonify
 from db import db
 from models import User
 from logic.i18n import SUPPORTED_LANGS
+from logic.room_languages import room_languages
 
 language_bp = Blueprint("language_bp", __name__)
 
@@ -26,4 +28,6 @@ def set_language():
         return jsonify({"ok": False, "error": "User not found"}), 404
     user.language = lang
     db.session.commit()
+    # Cached room maps and live language sub-rooms follow the change immediately
+    room_languages.set_user_language(user.id, lang)
     return jsonify({"ok": True, "language": user.language})
\ No newline at end of file
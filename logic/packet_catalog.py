@@ -0,0 +1,160 @@
+"""
+Packet catalog with incremental hot reindexing.
+- Keeps a snapshot of every packet file per format: mtime, size, content hash, question count.
+- rescan() only stats files; a file is re-hashed when its mtime/size moved and re-parsed
+  only when its hash actually changed.
+- Rescans run on a cheap background timer or on demand (admin endpoint), so new packets
+  can be dropped into packets/<format> under load without a redeploy.
+
+Usage:
+    from logic.packet_catalog import PacketCatalog
+    catalog = PacketCatalog(folder_for=lambda fmt: f"packets/{fmt}", formats=["NAQT"], load=load_fn)
+    catalog.rescan()
+    path = catalog.choose("NAQT")
+    catalog.counts()  # {"NAQT": {"packets": 3, "questions": 60, "failing": 0}}
+"""
+
+import os
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from logic.packet_parsers import PACKET_EXTENSIONS
+from logic.parse_cache import file_digest
+from logic.question_model import Question
+
+
+class PacketCatalog:
+    def __init__(self, folder_for: Callable[[str], str], formats: List[str],
+                 load: Callable[[str, str], List[Question]],
+                 validate: Optional[Callable[[str, str], Dict[str, Any]]] = None):
+        self._folder_for = folder_for
+        self.formats = list(formats)
+        self._load = load
+        # validate(path, fmt) -> utils.validate_packets.validate_file result, run on changed files only
+        self._validate = validate
+        self._lock = threading.Lock()          # guards the snapshot
+        self._scan_lock = threading.Lock()     # serializes rescans
+        # fmt -> {path: {"mtime", "size", "sha256", "questions"}}
+        self._files: Dict[str, Dict[str, Dict[str, Any]]] = {fmt: {} for fmt in self.formats}
+        self._last_change: Dict[str, float] = {fmt: 0.0 for fmt in self.formats}
+        self._listeners: List[Callable[[str], None]] = []
+        self._timer: Optional[threading.Thread] = None
+        self.last_scan: Optional[Dict[str, Any]] = None
+
+    def on_change(self, fn: Callable[[str], None]):
+        """Register fn(fmt), called after a rescan finds added, changed or removed files."""
+        self._listeners.append(fn)
+
+    # ---------- Scanning ----------
+
+    def rescan(self) -> Dict[str, Any]:
+        with self._scan_lock:
+            started = time.perf_counter()
+            first = self.last_scan is None
+            summary = {"added": [], "changed": [], "removed": [], "unchanged": 0}
+            for fmt in self.formats:
+                with self._lock:
+                    previous = dict(self._files[fmt])
+                current: Dict[str, Dict[str, Any]] = {}
+                folder = self._folder_for(fmt)
+                entries = []
+                if os.path.isdir(folder):
+                    with os.scandir(folder) as it:
+                        entries = list(it)
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.lower().endswith(PACKET_EXTENSIONS):
+                        continue
+                    st = entry.stat()
+                    old = previous.get(entry.path)
+                    if old and old["mtime"] == st.st_mtime and old["size"] == st.st_size:
+                        current[entry.path] = old
+                        summary["unchanged"] += 1
+                        continue
+                    sha256 = file_digest(entry.path)
+                    if old and old["sha256"] == sha256:
+                        current[entry.path] = dict(old, mtime=st.st_mtime, size=st.st_size)
+                        summary["unchanged"] += 1
+                        continue
+                    try:
+                        questions = len(self._load(entry.path, fmt))
+                    except Exception as e:
+                        print(f"Catalog could not parse {entry.path}: {e}")
+                        questions = 0
+                    current[entry.path] = {"mtime": st.st_mtime, "size": st.st_size,
+                                           "sha256": sha256, "questions": questions,
+                                           "validation": self._validation_for(entry.path, fmt)}
+                    summary["changed" if old else "added"].append(entry.path)
+                removed = [p for p in previous if p not in current]
+                summary["removed"].extend(removed)
+                changed = removed or any(p not in previous or previous[p]["sha256"] != current[p]["sha256"]
+                                         for p in current)
+                with self._lock:
+                    self._files[fmt] = current
+                    if changed:
+                        # First scan: date the format by its newest file, so a corpus built
+                        # after those files is still considered fresh
+                        self._last_change[fmt] = (max((f["mtime"] for f in current.values()), default=0.0)
+                                                  if first else time.time())
+                if changed and not first:
+                    for fn in self._listeners:
+                        fn(fmt)
+            summary["seconds"] = round(time.perf_counter() - started, 4)
+            self.last_scan = summary
+            return summary
+
+    def _validation_for(self, path: str, fmt: str) -> Optional[Dict[str, Any]]:
+        if not self._validate:
+            return None
+        result = self._validate(path, fmt)
+        return {"status": result["status"], "errors": result["errors"], "counts": result["counts"]}
+
+    def start(self, interval: float):
+        """Rescan every `interval` seconds on a daemon thread (first scan runs immediately)."""
+        if self._timer is not None or interval <= 0:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.rescan()
+                except Exception as e:
+                    print(f"Packet catalog rescan failed: {e}")
+                time.sleep(interval)
+
+        self._timer = threading.Thread(target=loop, name="packet-catalog", daemon=True)
+        self._timer.start()
+
+    # ---------- Lookups ----------
+
+    def choose(self, fmt: str) -> Optional[str]:
+        with self._lock:
+            paths = [p for p, info in self._files.get(fmt, {}).items() if info["questions"]]
+        return random.choice(paths) if paths else None
+
+    def last_change(self, fmt: str) -> float:
+        with self._lock:
+            return self._last_change.get(fmt, 0.0)
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                fmt: {
+                    "packets": len(files),
+                    "questions": sum(f["questions"] for f in files.values()),
+                    "failing": sum(1 for f in files.values()
+                                   if (f.get("validation") or {}).get("status") in ("FAIL", "ERROR"))
+                }
+                for fmt, files in self._files.items()
+            }
+
+    def validation_report(self) -> Dict[str, Dict[str, Any]]:
+        """{path: validation result} for every file whose last validation did not pass."""
+        with self._lock:
+            return {
+                path: info["validation"]
+                for files in self._files.values()
+                for path, info in files.items()
+                if info.get("validation") and info["validation"]["status"] in ("FAIL", "ERROR")
+            }
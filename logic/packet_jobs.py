@@ -0,0 +1,67 @@
+"""
+Background packet loading.
+- Packet loads run on a bounded worker pool instead of the Socket.IO handler thread.
+- Loads for different keys (rooms) run concurrently; at most max_in_flight parse at once,
+  the rest wait in the pool queue.
+- A newer load for the same key supersedes an older one; the stale result is dropped.
+
+Usage:
+    from logic.packet_jobs import PacketJobPool
+    jobs = PacketJobPool(max_in_flight=2)
+    jobs.submit("room-1", lambda progress: load(fmt, progress),
+                on_progress=lambda stats: ..., on_done=lambda questions: ..., on_error=lambda exc: ...)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from logic.question_model import Question
+
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+class PacketJobPool:
+    def __init__(self, max_in_flight: int = 2):
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="packet-load")
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+
+    def _is_current(self, key: str, generation: int) -> bool:
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def cancel(self, key: str):
+        """Drop the result of any queued or running load for key."""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def submit(self, key: str, load: Callable[[ProgressFn], List[Question]],
+               on_progress: Optional[ProgressFn] = None,
+               on_done: Optional[Callable[[List[Question]], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None):
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+        def progress(stats: Dict[str, Any]):
+            if on_progress and self._is_current(key, generation):
+                on_progress(stats)
+
+        def run():
+            if not self._is_current(key, generation):
+                return  # superseded while queued
+            try:
+                questions = load(progress)
+            except Exception as e:
+                if on_error and self._is_current(key, generation):
+                    on_error(e)
+                return
+            if on_done and self._is_current(key, generation):
+                on_done(questions)
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,224 @@
+"""
+Packet parsers shared by the live server and the offline build tools.
+- JSON / CSV / DOCX / PDF packets are parsed into a raw {"format", "questions"} dict.
+- normalize_packet() turns any raw packet into typed questions (logic/question_model.py).
+- PDFs stream page by page: pages -> lines -> question records, each yielded once complete.
+
+Usage:
+    from logic.packet_parsers import parse_packet_file, normalize_packet, iter_packet_questions
+    questions = normalize_packet(parse_packet_file(path, "NAQT"), "NAQT")
+    for q in iter_packet_questions(path, "NAQT"):  # first question arrives before the last page is read
+        ...
+"""
+
+import os
+import json
+import csv
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from logic.question_model import Question, question_from_dict, questions_from_packet
+
+PACKET_EXTENSIONS = (".json", ".csv", ".docx", ".pdf")
+# Bump whenever parser output changes so cached parses (logic/parse_cache.py) are rebuilt
+PARSER_VERSION = 2
+
+def parse_json_packet(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def parse_csv_packet(path: str, fmt: str) -> Dict[str, Any]:
+    # CSV schemas vary. Supported simple schemas:
+    # Pyramidal: id, clue1, clue2, clue3, clue4, answer
+    # Trivia: id, text, answer
+    questions = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if fmt == "Trivia":
+                q = {
+                    "id": row.get("id") or f"t{len(questions)+1}",
+                    "text": row.get("text", "").strip(),
+                    "answer": row.get("answer", "").strip()
+                }
+            else:
+                clues = []
+                # Collect any columns named clue1..clue10 or generic "clue" columns
+                for k in row.keys():
+                    lk = k.lower()
+                    if lk.startswith("clue"):
+                        val = (row.get(k) or "").strip()
+                        if val:
+                            clues.append(val)
+                # Fallback: single text column split by ;; into clues
+                if not clues and row.get("text"):
+                    clues = [c.strip() for c in row["text"].split(";;") if c.strip()]
+                q = {
+                    "id": row.get("id") or f"q{len(questions)+1}",
+                    "clues": clues,
+                    "answer": (row.get("answer") or "").strip()
+                }
+            questions.append(q)
+    return {"format": fmt, "questions": questions}
+
+def parse_docx_packet(path: str, fmt: str) -> Dict[str, Any]:
+    # DOCX expectations:
+    # - Pyramidal: Questions separated by blank lines; clues per question separated by line breaks.
+    # - Trivia: Each line "Question ?| Answer" or "Q: ... A: ..." or split by '||'
+    try:
+        import docx  # python-docx
+    except ImportError:
+        return {"format": fmt, "questions": []}
+
+    doc = docx.Document(path)
+    lines = (p.text.strip() for p in doc.paragraphs if p.text.strip())
+    questions = []
+
+    if fmt == "Trivia":
+        for ln in lines:
+            text, ans = None, ""
+            if "||" in ln:
+                parts = ln.split("||")
+                text = parts[0].strip()
+                ans = parts[1].strip() if len(parts) > 1 else ""
+            elif "| Answer:" in ln:
+                parts = ln.split("| Answer:")
+                text = parts[0].strip()
+                ans = parts[1].strip() if len(parts) > 1 else ""
+            elif " A: " in ln and " Q: " in ln:
+                # Q: ... A: ...
+                qpart = ln.split(" Q: ")
+                if len(qpart) > 1:
+                    ap = qpart[-1].split(" A: ")
+                    text = ap[0].strip()
+                    ans = ap[1].strip() if len(ap) > 1 else ""
+            else:
+                # Fallback: treat whole line as question without answer
+                text = ln
+            if text:
+                questions.append({"id": f"t{len(questions)+1}", "text": text, "answer": ans})
+    else:
+        # Group lines into questions by blank-line separators in original structure.
+        # Since we removed blanks, we infer new question when a line starts with "Q" or a delimiter.
+        questions = list(iter_pyramidal_questions(lines, DOCX_QUESTION_HEADERS))
+
+    return {"format": fmt, "questions": questions}
+
+# --- Streaming pipeline: pages -> lines -> question records ---
+
+DOCX_QUESTION_HEADERS: Tuple[str, ...] = ("q:", "question:", "new question", "###")
+PDF_QUESTION_HEADERS: Tuple[str, ...] = ("q:", "question", "###")
+
+PageCallback = Optional[Callable[[int, int], None]]
+
+def iter_pdf_pages(path: str, on_page: PageCallback = None) -> Iterator[str]:
+    """Yield page text one page at a time.
+    pdfplumber is preferred; if it fails, PyPDF2 resumes from the first page not yet yielded.
+    on_page(pages_done, pages_total) is called after each page is extracted."""
+    done = 0
+    try:
+        import pdfplumber
+        with pdfplumber.open(path) as pdf:
+            total = len(pdf.pages)
+            for page in pdf.pages:
+                text = page.extract_text() or ""
+                page.flush_cache()  # drop layout objects so memory stays flat on long packets
+                done += 1
+                if on_page:
+                    on_page(done, total)
+                yield text
+        return
+    except Exception:
+        pass
+    try:
+        import PyPDF2
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            total = len(reader.pages)
+            for page in reader.pages[done:]:
+                text = page.extract_text() or ""
+                done += 1
+                if on_page:
+                    on_page(done, total)
+                yield text
+    except Exception:
+        return
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Split text chunks (pages, paragraphs) into stripped, non-empty lines."""
+    for chunk in chunks:
+        for ln in chunk.splitlines():
+            ln = ln.strip()
+            if ln:
+                yield ln
+
+def iter_pyramidal_questions(lines: Iterable[str], headers: Tuple[str, ...]) -> Iterator[Dict[str, Any]]:
+    """Bucket lines into clue lists; a header line closes the current question and yields it."""
+    count = 0
+    bucket: List[str] = []
+    for ln in lines:
+        if ln.lower().startswith(headers) and bucket:
+            count += 1
+            yield {"id": f"q{count}", "clues": bucket, "answer": ""}
+            bucket = []
+        else:
+            bucket.append(ln)
+    if bucket:
+        yield {"id": f"q{count+1}", "clues": bucket, "answer": ""}
+
+def iter_trivia_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    count = 0
+    for ln in lines:
+        text_q, ans = None, ""
+        if "||" in ln:
+            parts = ln.split("||")
+            text_q = parts[0].strip()
+            ans = parts[1].strip() if len(parts) > 1 else ""
+        elif " A: " in ln:
+            parts = ln.split(" A: ")
+            text_q = parts[0].strip()
+            ans = parts[1].strip() if len(parts) > 1 else ""
+        else:
+            text_q = ln
+        count += 1
+        yield {"id": f"t{count}", "text": text_q, "answer": ans}
+
+def iter_pdf_questions(path: str, fmt: str, on_page: PageCallback = None) -> Iterator[Dict[str, Any]]:
+    lines = iter_lines(iter_pdf_pages(path, on_page))
+    if fmt == "Trivia":
+        return iter_trivia_lines(lines)
+    # Heuristic: split into questions by lines that look like "Question" headers
+    return iter_pyramidal_questions(lines, PDF_QUESTION_HEADERS)
+
+def parse_pdf_packet(path: str, fmt: str) -> Dict[str, Any]:
+    return {"format": fmt, "questions": list(iter_pdf_questions(path, fmt))}
+
+def iter_packet_questions(path: str, fmt: str, on_page: PageCallback = None) -> Iterator[Question]:
+    """Yield normalized questions as soon as each is complete (streams PDFs; other formats parse whole)."""
+    if path.lower().endswith(".pdf"):
+        for q in iter_pdf_questions(path, fmt, on_page):
+            yield normalize_question(q, fmt, q["id"])
+    else:
+        yield from normalize_packet(parse_packet_file(path, fmt), fmt)
+
+def parse_packet_file(path: str, fmt: str) -> Dict[str, Any]:
+    """Dispatch to the parser matching the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        return parse_json_packet(path)
+    elif ext == ".csv":
+        return parse_csv_packet(path, fmt)
+    elif ext == ".docx":
+        return parse_docx_packet(path, fmt)
+    elif ext == ".pdf":
+        return parse_pdf_packet(path, fmt)
+    return {"format": fmt, "questions": []}
+
+def normalize_question(q: Dict[str, Any], fmt: str, default_id: str) -> Question:
+    return question_from_dict(q, fmt, default_id)
+
+def normalize_packet(packet: Dict[str, Any], fmt: str) -> List[Question]:
+    """Return a unified list of typed questions:
+       - Pyramidal: Tossup(id, clues, answer); converted bonuses/sixty-second rounds keep their type
+       - Trivia: TriviaQuestion(id, text, answer)
+    """
+    return questions_from_packet(packet, fmt)
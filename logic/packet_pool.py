@@ -0,0 +1,131 @@
+"""
+Warm per-format packet pool.
+- Keeps up to `depth` ready, normalized packets per format in memory.
+- A background thread refills a format as soon as one of its packets is taken.
+- Total memory is capped by an approximate byte budget; the oldest packet of the
+  fullest format is evicted first.
+
+Usage:
+    from logic.packet_pool import PacketPool
+    pool = PacketPool(load=lambda fmt: [...], formats=["NAQT", "Trivia"], depth=2)
+    pool.start()
+    questions = pool.take("NAQT")  # None when the pool is cold; caller loads directly
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from logic.question_model import Question
+
+Packet = List[Question]
+
+
+def estimate_packet_bytes(questions: Packet) -> int:
+    return len(json.dumps([q.to_dict() for q in questions], ensure_ascii=False, separators=(",", ":")))
+
+
+class PacketPool:
+    def __init__(self, load: Callable[[str], Packet], formats: List[str],
+                 depth: int = 2, max_bytes: int = 32 * 1024 * 1024):
+        self._load = load
+        self.formats = list(formats)
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self._cond = threading.Condition()
+        self._ready: Dict[str, Deque[Tuple[Packet, int]]] = {fmt: deque() for fmt in self.formats}
+        self._pending: Deque[str] = deque()
+        self._generations: Dict[str, int] = {fmt: 0 for fmt in self.formats}  # bumped by invalidate()
+        self._total_bytes = 0
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            for fmt in self.formats:
+                self._request_locked(fmt)
+            self._thread = threading.Thread(target=self._run, name="packet-pool", daemon=True)
+            self._thread.start()
+
+    def take(self, fmt: str) -> Optional[Packet]:
+        with self._cond:
+            ready = self._ready.get(fmt)
+            if ready is None:
+                return None
+            if not ready:
+                self.misses += 1
+                self._request_locked(fmt)
+                return None
+            questions, size = ready.popleft()
+            self._total_bytes -= size
+            self.hits += 1
+            self._request_locked(fmt)
+            return questions
+
+    def invalidate(self, fmt: str):
+        """Drop ready packets for fmt (e.g. its files changed) and start refilling."""
+        with self._cond:
+            ready = self._ready.get(fmt)
+            if ready is None:
+                return
+            self._total_bytes -= sum(size for _, size in ready)
+            ready.clear()
+            self._generations[fmt] += 1
+            self._request_locked(fmt)
+
+    def _request_locked(self, fmt: str):
+        if fmt not in self._pending and len(self._ready[fmt]) < self.depth:
+            self._pending.append(fmt)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                fmt = self._pending.popleft()
+                generation = self._generations[fmt]
+            try:
+                questions = self._load(fmt)
+            except Exception as e:
+                print(f"Packet pool could not load {fmt}: {e}")
+                continue
+            if not questions:
+                continue  # nothing to prefetch for this format; retried on the next take()
+            size = estimate_packet_bytes(questions)
+            with self._cond:
+                if self._generations[fmt] != generation:
+                    # Invalidated while loading: the packet may come from the old files
+                    self._request_locked(fmt)
+                    continue
+                self._ready[fmt].append((questions, size))
+                self._total_bytes += size
+                self._evict_locked()
+                # Keep filling only while there is room, so a small budget cannot load/evict forever
+                if self._total_bytes + size <= self.max_bytes:
+                    self._request_locked(fmt)
+
+    def _evict_locked(self):
+        while self._total_bytes > self.max_bytes:
+            fullest = max(self._ready.values(), key=len)
+            if not fullest:
+                return
+            _, size = fullest.popleft()
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "ready": {fmt: len(q) for fmt, q in self._ready.items()},
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,204 @@
+"""
+Persistent, content-addressed cache for parsed packets.
+- Keyed by sha256(file bytes) + parser version + format, so renames and copies still hit.
+- Stores the normalized questions as compact JSON (Question.to_dict), one file per entry.
+- Size-bounded LRU: entries are touched on every hit and the least recently used are evicted.
+- Hit/miss/eviction counters are exposed through stats().
+
+Usage:
+    from logic.parse_cache import load_packet_cached
+    questions = load_packet_cached(path, "NAQT")
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from logic.packet_parsers import PARSER_VERSION, parse_packet_file, normalize_packet, iter_packet_questions
+from logic.question_model import Question, question_from_dict
+
+# Only slow formats are worth a disk entry; JSON/CSV parse faster than a cache read-through
+CACHED_EXTENSIONS = (".pdf", ".docx")
+# Paths whose (mtime, size) -> digest memo is kept; least recently used paths drop out first
+MAX_DIGEST_MEMOS = 4096
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> [size_bytes, last_used]; rebuilt from disk so the LRU order survives restarts
+        self._entries: Dict[str, List[float]] = {}
+        self._total_bytes = 0
+        # path -> (mtime, size, digest), so unchanged files are not re-hashed on every load; one
+        # entry per path (a new version replaces the old one), at most MAX_DIGEST_MEMOS paths
+        self._digests: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+        os.makedirs(cache_dir, exist_ok=True)
+        for fname in os.listdir(cache_dir):
+            if fname.endswith(".json"):
+                st = os.stat(os.path.join(cache_dir, fname))
+                self._entries[fname[:-5]] = [st.st_size, st.st_mtime]
+                self._total_bytes += st.st_size
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def key_for(self, path: str, fmt: str) -> str:
+        st = os.stat(path)
+        abspath = os.path.abspath(path)
+        with self._lock:
+            memo = self._digests.get(abspath)
+            if memo is not None and memo[:2] == (st.st_mtime, st.st_size):
+                self._digests.move_to_end(abspath)
+                digest = memo[2]
+            else:
+                digest = None
+        if digest is None:
+            digest = file_digest(path)
+            with self._lock:
+                self._digests[abspath] = (st.st_mtime, st.st_size, digest)
+                self._digests.move_to_end(abspath)
+                while len(self._digests) > MAX_DIGEST_MEMOS:
+                    self._digests.popitem(last=False)
+        return f"{digest}-v{PARSER_VERSION}-{fmt.lower()}"
+
+    def get(self, key: str, fmt: Optional[str] = None) -> Optional[List[Question]]:
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                questions = [question_from_dict(d, fmt) for d in json.load(f)]
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+                self._forget(key)
+            return None
+        with self._lock:
+            self.hits += 1
+            now = time.time()
+            if key in self._entries:
+                self._entries[key][1] = now
+            try:
+                os.utime(entry_path, (now, now))
+            except OSError:
+                pass
+        return questions
+
+    def put(self, key: str, questions: List[Question]):
+        blob = json.dumps([q.to_dict() for q in questions], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(blob) > self.max_bytes:
+            return
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, entry_path)
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = [len(blob), time.time()]
+            self._total_bytes += len(blob)
+            self._evict()
+
+    def get_or_parse(self, path: str, fmt: str,
+                     parse: Optional[Callable[[str, str], List[Question]]] = None) -> List[Question]:
+        parse = parse or (lambda p, f: normalize_packet(parse_packet_file(p, f), f))
+        key = self.key_for(path, fmt)
+        questions = self.get(key, fmt)
+        if questions is not None:
+            return questions
+        questions = parse(path, fmt)
+        if questions:
+            self.put(key, questions)
+        return questions
+
+    def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._total_bytes -= entry[0]
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda kv: kv[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._forget(key)
+            self.evictions += 1
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    global _cache
+    if _cache is None:
+        _cache = ParseCache(Config.PACKET_CACHE_DIR, Config.PACKET_CACHE_MAX_BYTES)
+    return _cache
+
+
+def parse_with_progress(path: str, fmt: str, progress: Callable[[Dict[str, Any]], None]) -> List[Question]:
+    """Stream-parse a packet, reporting bytes/pages/questions after every page and once at the end."""
+    size = os.path.getsize(path)
+    stats = {"bytes": 0, "bytes_total": size, "pages": 0, "pages_total": 0, "questions": 0}
+    questions: List[Question] = []
+
+    def on_page(done: int, total: int):
+        stats.update(pages=done, pages_total=total, questions=len(questions),
+                     bytes=size * done // total if total else size)
+        progress(dict(stats))
+
+    for q in iter_packet_questions(path, fmt, on_page):
+        questions.append(q)
+    stats.update(bytes=size, questions=len(questions))
+    progress(dict(stats))
+    return questions
+
+
+def load_packet_cached(path: str, fmt: str,
+                       progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Question]:
+    """Parse + normalize a packet file, going through the disk cache for PDF/DOCX.
+    progress, if given, receives {bytes, bytes_total, pages, pages_total, questions} updates."""
+    parse = (lambda p, f: parse_with_progress(p, f, progress)) if progress else None
+    if path.lower().endswith(CACHED_EXTENSIONS):
+        cache = get_parse_cache()
+        hits = cache.hits
+        questions = cache.get_or_parse(path, fmt, parse)
+        if progress and cache.hits > hits:
+            size = os.path.getsize(path)
+            progress({"bytes": size, "bytes_total": size, "pages": 0, "pages_total": 0,
+                      "questions": len(questions), "cached": True})
+        return questions
+    if parse:
+        return parse(path, fmt)
+    return normalize_packet(parse_packet_file(path, fmt), fmt)
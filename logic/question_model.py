@@ -0,0 +1,196 @@
+"""
+Typed question model shared by the packet loader, the converter and the game loop.
+- Tossup (pyramidal clues, hard -> easy), Bonus (parts), SixtySecond and TriviaQuestion.
+- Built on __slots__ with tuples and interned category/format strings, so a whole corpus
+  held in memory costs a fraction of the equivalent dicts.
+- question_from_dict() accepts every shape used in this repo:
+    * normalize_packet:          {"id", "clues": [str] | "a;;b", "answer"}
+    * convert_to_json tossup:    {"id", "type": "tossup", "difficulty": {"hard", "medium", "easy"}, "answer"}
+    * convert_to_json bonus:     {"id", "type": "bonus", "parts": [{"text", "answer"}]}
+    * convert_to_json sixty:     {"text", "answer"} inside a packet of type "sixty_second"
+    * trivia packets:            {"id", "category", "text", "answer"}
+    * packets.DEFAULT_QUESTIONS: {"id", "answer", "clues": [{"difficulty", "text"}]}
+- to_dict() is the compact wire/cache form; it round-trips through question_from_dict(d, fmt)
+  (the format is left out of every record and supplied by the reader);
+  to_packet_dict() is the on-disk shape written by utils/convert_to_json.py.
+
+Usage:
+    from logic.question_model import question_from_dict, questions_from_packet, Tossup
+    q = question_from_dict({"id": "q1", "clues": ["hard", "easy"], "answer": "Waterloo"})
+    isinstance(q, Tossup), q.clues, q.to_dict()
+"""
+
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else None
+
+
+class Question:
+    __slots__ = ("id", "answer", "category", "format")
+    kind = "question"
+
+    def __init__(self, id: str, answer: str = "", category: Optional[str] = None, format: Optional[str] = None):
+        self.id = id
+        self.answer = answer
+        self.category = _intern(category)
+        self.format = _intern(format)
+
+    def _base_dict(self) -> Dict[str, Any]:
+        d = {"id": self.id, "type": self.kind, "answer": self.answer}
+        if self.category:
+            d["category"] = self.category
+        return d
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._base_dict()
+
+    def to_packet_dict(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r}, answer={self.answer!r})"
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+
+class Tossup(Question):
+    __slots__ = ("clues",)
+    kind = "tossup"
+
+    def __init__(self, id: str, clues: Iterable[str], answer: str = "", category: Optional[str] = None,
+                 format: Optional[str] = None):
+        super().__init__(id, answer, category, format)
+        self.clues: Tuple[str, ...] = tuple(clues)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.clues)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["clues"] = list(self.clues)
+        return d
+
+    def to_packet_dict(self) -> Dict[str, Any]:
+        # Converter layout: exactly three difficulty levels, padded like safe_split does
+        hard, medium, easy = (list(self.clues[:3]) + ["MISSING"] * 3)[:3]
+        return {"id": self.id, "type": "tossup",
+                "difficulty": {"hard": hard, "medium": medium, "easy": easy}, "answer": self.answer}
+
+
+class BonusPart:
+    __slots__ = ("text", "answer")
+
+    def __init__(self, text: str, answer: str = ""):
+        self.text = text
+        self.answer = answer
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"text": self.text, "answer": self.answer}
+
+
+class Bonus(Question):
+    __slots__ = ("parts",)
+    kind = "bonus"
+
+    def __init__(self, id: str, parts: Iterable[BonusPart], category: Optional[str] = None,
+                 format: Optional[str] = None):
+        super().__init__(id, "", category, format)
+        self.parts: Tuple[BonusPart, ...] = tuple(parts)
+
+    @property
+    def clues(self) -> Tuple[str, ...]:
+        return tuple(p.text for p in self.parts)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.clues)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        del d["answer"]
+        d["parts"] = [p.to_dict() for p in self.parts]
+        return d
+
+    def to_packet_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": "bonus", "parts": [p.to_dict() for p in self.parts]}
+
+
+class SixtySecond(Question):
+    __slots__ = ("text",)
+    kind = "sixty_second"
+
+    def __init__(self, id: str, text: str, answer: str = "", category: Optional[str] = None,
+                 format: Optional[str] = None):
+        super().__init__(id, answer, category, format)
+        self.text = text
+
+    @property
+    def clues(self) -> Tuple[str, ...]:
+        return (self.text,)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = self._base_dict()
+        d["text"] = self.text
+        return d
+
+    def to_packet_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "answer": self.answer}
+
+
+class TriviaQuestion(SixtySecond):
+    __slots__ = ()
+    kind = "trivia"
+
+
+KINDS = {cls.kind: cls for cls in (Tossup, Bonus, SixtySecond, TriviaQuestion)}
+
+
+def _clue_texts(clues: Any) -> List[str]:
+    if isinstance(clues, str):
+        return [c.strip() for c in clues.split(";;") if c.strip()]
+    texts = []
+    for c in clues or []:
+        text = c.get("text", "") if isinstance(c, dict) else c
+        if text:
+            texts.append(text)
+    return texts
+
+
+def question_from_dict(d: Dict[str, Any], fmt: Optional[str] = None, default_id: str = "",
+                       packet_type: Optional[str] = None) -> Question:
+    """Build the typed question for any dict shape listed in the module docstring."""
+    qid = str(d.get("id") or default_id)
+    kind = d.get("type") or packet_type
+    category = d.get("category")
+    fmt = d.get("format") or fmt
+    answer = d.get("answer") or ""
+
+    if kind == "bonus" or "parts" in d:
+        parts = [BonusPart(p.get("text") or "", p.get("answer") or "") for p in d.get("parts") or []]
+        return Bonus(qid, parts, category, fmt)
+    if "difficulty" in d:
+        diff = d.get("difficulty") or {}
+        return Tossup(qid, [diff.get(level) or "" for level in ("hard", "medium", "easy")], answer, category, fmt)
+    if kind == "tossup" or "clues" in d:
+        return Tossup(qid, _clue_texts(d.get("clues")), answer, category, fmt)
+    text = d.get("text") or ""
+    if kind == "sixty_second" or (kind != "trivia" and (fmt or "").upper() == "OSSAA"):
+        return SixtySecond(qid, text, answer, category, fmt)
+    if kind == "trivia" or fmt == "Trivia" or "text" in d:
+        return TriviaQuestion(qid, text, answer, category, fmt)
+    return Tossup(qid, [], answer, category, fmt)
+
+
+def questions_from_packet(packet: Dict[str, Any], fmt: Optional[str] = None) -> List[Question]:
+    """Convert a whole packet dict ({"type"?, "questions": [...]}) into typed questions."""
+    if not packet or "questions" not in packet:
+        return []
+    prefix = "t" if fmt == "Trivia" else "q"
+    packet_type = packet.get("type")
+    return [question_from_dict(q, fmt, f"{prefix}{i}", packet_type)
+            for i, q in enumerate(packet["questions"], start=1)]
@@ -0,0 +1,306 @@
+"""
+Append-only per-room event journal with snapshots and crash recovery.
+- Every game event of a room (setup, join, leave, buzz, answer, reveal, next question, score
+  delta) is appended to journals/<code>.journal as one length-prefixed binary record:
+      <I payload length> <I crc32> <d unix time> <B event code> <payload: compact JSON>
+  The CRC covers time, code and payload; reading stops at the first torn or corrupt record,
+  which is exactly the tail a crash can leave behind.
+- Writes go to the OS buffer immediately and are fsync'ed in batches: every
+  JOURNAL_FSYNC_SECONDS on the store's own fsync thread (never on the shared scheduler, whose
+  workers close buzz windows), or sooner once JOURNAL_FSYNC_BYTES are pending.
+- Each journal keeps a live "image" of the room (apply_event over its records). Every
+  JOURNAL_SNAPSHOT_EVERY records the image is written to <code>.snapshot with the journal
+  offset it covers, so recovery is snapshot + journal tail instead of the whole match.
+- When a room empties its journal moves to journals/archive/ for offline replay
+  (python -m utils.replay_journal). Journals of rooms nobody came back to after a restart
+  are archived by archive_unclaimed(), which the app runs once the reconnect grace is over.
+
+Usage:
+    from logic.room_journal import JournalStore
+    journals = JournalStore("journals")
+    journal, image = journals.open("ABCD1234")    # image: recovered room state, or None
+    journal.append("buzz", {"winner": "alice", "position": 17})
+    journals.close("ABCD1234")                     # archive once the room is gone
+    journals.archive_unclaimed(older_than=30)      # after startup: rooms nobody reopened
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+
+HEADER = struct.Struct("<IIdB")
+EVENT_CODES = {"setup": 1, "join": 2, "leave": 3, "buzz": 4, "answer": 5, "reveal": 6,
+               "next_question": 7, "score": 8}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+
+
+# ---------- Record format ----------
+
+def encode_record(kind: str, payload: Dict[str, Any], ts: Optional[float] = None) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    code = EVENT_CODES[kind]
+    ts = time.time() if ts is None else ts
+    crc = zlib.crc32(struct.pack("<dB", ts, code) + body)
+    return HEADER.pack(len(body), crc, ts, code) + body
+
+
+def read_records(path: str, offset: int = 0) -> Iterator[Tuple[int, float, str, Dict[str, Any]]]:
+    """Yield (end offset, time, event, payload) from offset up to the first bad record."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    pos = 0
+    while pos + HEADER.size <= len(data):
+        length, crc, ts, code = HEADER.unpack_from(data, pos)
+        start, end = pos + HEADER.size, pos + HEADER.size + length
+        if end > len(data):
+            break
+        body = data[start:end]
+        if zlib.crc32(struct.pack("<dB", ts, code) + body) != crc or code not in EVENT_NAMES:
+            break
+        pos = end
+        yield offset + pos, ts, EVENT_NAMES[code], json.loads(body)
+
+
+# ---------- Room image ----------
+
+def new_image(code: str) -> Dict[str, Any]:
+    return {"code": code, "setup": {}, "questions": [], "index": -1, "marks": [0],
+            "moderator": None, "players": {}, "scores": {}, "score_version": 0, "stats": {}}
+
+
+def _player_stats(image: Dict[str, Any], username: str) -> Dict[str, int]:
+    return image["stats"].setdefault(username, {"buzzes": 0, "correct": 0, "incorrect": 0, "points": 0})
+
+
+def apply_event(image: Dict[str, Any], kind: str, payload: Dict[str, Any]):
+    """Fold one journaled event into a room image (used for recovery and offline replay)."""
+    if kind == "setup":
+        image["setup"] = payload.get("setup") or {}
+        image["questions"] = payload.get("questions") or []
+        image["index"], image["marks"] = -1, [0]
+    elif kind == "join":
+        username = payload["username"]
+        image["players"][username] = {"token": payload.get("token"), "role": payload.get("role", "player"),
+                                      "team": payload.get("team")}
+        if payload.get("moderator"):
+            image["moderator"] = username
+        _player_stats(image, username)
+    elif kind == "leave":
+        username = payload["username"]
+        image["players"].pop(username, None)
+        if image["moderator"] == username:
+            image["moderator"] = None
+    elif kind == "buzz":
+        _player_stats(image, payload["winner"])["buzzes"] += 1
+    elif kind == "answer":
+        stats = _player_stats(image, payload["username"])
+        stats["correct" if payload.get("correct") else "incorrect"] += 1
+        stats["points"] += payload.get("points", 0)
+    elif kind == "reveal":
+        image["marks"].append(payload["word"])
+    elif kind == "next_question":
+        image["index"], image["marks"] = payload["index"], [0]
+    elif kind == "score":
+        image["scores"].update(payload.get("changes") or {})
+        for username in payload.get("removed") or ():
+            image["scores"].pop(username, None)
+        image["score_version"] = payload.get("version", image["score_version"])
+
+
+# ---------- Journals ----------
+
+class RoomJournal:
+    def __init__(self, directory: str, code: str, snapshot_every: int = 500, fsync_bytes: int = 64 * 1024):
+        self.code = code
+        self.path = os.path.join(directory, f"{code}.journal")
+        self.snapshot_path = os.path.join(directory, f"{code}.snapshot")
+        root = os.path.realpath(directory)
+        for path in (self.path, self.snapshot_path):
+            if os.path.dirname(os.path.realpath(path)) != root:
+                raise ValueError(f"Room code {code!r} does not name a file inside {directory}")
+        self.snapshot_every = snapshot_every
+        self.fsync_bytes = fsync_bytes
+        self._lock = threading.Lock()
+        self.image, offset, self.recovered = self._recover()
+        self._file = open(self.path, "ab")
+        self._offset = offset
+        self._unsynced = 0
+        self._since_snapshot = 0
+
+    def _recover(self) -> Tuple[Dict[str, Any], int, bool]:
+        image, offset = new_image(self.code), 0
+        if os.path.isfile(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    snap = json.load(f)
+                image, offset = snap["image"], snap["offset"]
+            except (OSError, ValueError, KeyError):
+                image, offset = new_image(self.code), 0
+        if not os.path.isfile(self.path):
+            return image, 0, offset > 0
+        size = os.path.getsize(self.path)
+        offset = min(offset, size)
+        end, records = offset, 0
+        for end, _, kind, payload in read_records(self.path, offset):
+            apply_event(image, kind, payload)
+            records += 1
+        if end < size:
+            # Torn tail from a crash mid-write: cut it so new records follow good ones
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+            print(f"Journal {self.path}: dropped {size - end} bytes of torn tail")
+        return image, end, bool(records) or end > 0
+
+    def append(self, kind: str, payload: Dict[str, Any]):
+        record = encode_record(kind, payload)
+        with self._lock:
+            if self._file.closed:
+                return  # room already archived
+            self._file.write(record)
+            self._offset += len(record)
+            self._unsynced += len(record)
+            self._since_snapshot += 1
+            apply_event(self.image, kind, payload)
+            if self._unsynced >= self.fsync_bytes:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def sync(self):
+        """fsync pending records; writes a snapshot once enough records have accumulated."""
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._unsynced:
+                self._sync_locked()
+            if self._since_snapshot < self.snapshot_every:
+                return
+            self._since_snapshot = 0
+            blob = json.dumps({"offset": self._offset, "image": self.image}, ensure_ascii=False,
+                              separators=(",", ":"))
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+    def close(self, archive_dir: Optional[str] = None):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync_locked()
+            self._file.close()
+        if archive_dir is None:
+            return
+        archive_files(self.code, self.path, self.snapshot_path, archive_dir)
+
+
+def archive_files(code: str, path: str, snapshot_path: str, archive_dir: str):
+    """Move a closed journal to the archive and drop its snapshot."""
+    os.makedirs(archive_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    os.replace(path, os.path.join(archive_dir, f"{code}-{stamp}.journal"))
+    if os.path.isfile(snapshot_path):
+        os.remove(snapshot_path)
+
+
+class JournalStore:
+    def __init__(self, directory: str, fsync_interval: float = 0.2, snapshot_every: int = 500,
+                 fsync_bytes: int = 64 * 1024):
+        self.directory = directory
+        self.archive_dir = os.path.join(directory, "archive")
+        self.snapshot_every = snapshot_every
+        self.fsync_bytes = fsync_bytes
+        self._lock = threading.Lock()
+        self._journals: Dict[str, RoomJournal] = {}
+        os.makedirs(directory, exist_ok=True)
+        self._stop = threading.Event()
+        self._syncer = None
+        if fsync_interval > 0:
+            # One thread, one pass at a time: a slow fsync delays the next pass, nothing else
+            self._syncer = threading.Thread(target=self._sync_loop, args=(fsync_interval,),
+                                            name="journal-fsync", daemon=True)
+            self._syncer.start()
+
+    def open(self, code: str) -> Tuple[RoomJournal, Optional[Dict[str, Any]]]:
+        """Journal for a room; also returns the recovered image when the room had one."""
+        with self._lock:
+            journal = self._journals.get(code)
+            if journal is None:
+                journal = self._journals[code] = RoomJournal(self.directory, code, self.snapshot_every,
+                                                             self.fsync_bytes)
+                return journal, (journal.image if journal.recovered else None)
+            return journal, None
+
+    def close(self, code: str, archive: bool = True):
+        with self._lock:
+            journal = self._journals.pop(code, None)
+        if journal is not None:
+            journal.close(self.archive_dir if archive else None)
+
+    def _sync_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.sync_all()
+
+    def sync_all(self):
+        with self._lock:
+            journals = list(self._journals.values())
+        for journal in journals:
+            try:
+                journal.sync()
+            except OSError as e:
+                print(f"Journal sync failed for room {journal.code}: {e}")
+
+    def archive_unclaimed(self, older_than: float, in_use: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """Archive journals no room has reopened and nothing wrote to for older_than seconds
+        (skipping rooms in_use(code) says another worker runs). Returns the archived codes."""
+        cutoff = time.time() - older_than
+        archived = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".journal"):
+                continue
+            code = name[:-len(".journal")]
+            if not (code.isascii() and code.isalnum()):
+                continue  # not a room journal (room codes are letters and digits only)
+            path = os.path.join(self.directory, name)
+            with self._lock:
+                if code in self._journals:
+                    continue
+                try:
+                    if os.path.getmtime(path) > cutoff or (in_use is not None and in_use(code)):
+                        continue
+                    archive_files(code, path, os.path.join(self.directory, f"{code}.snapshot"),
+                                  self.archive_dir)
+                except OSError as e:
+                    print(f"Archiving stale journal {name} failed: {e}")
+                    continue
+            archived.append(code)
+        return archived
+
+    def close_all(self):
+        """Flush and close every journal, keeping them in place for recovery."""
+        self._stop.set()
+        with self._lock:
+            journals, self._journals = list(self._journals.values()), {}
+        for journal in journals:
+            journal.close()
+
+
+def open_journals() -> Optional[JournalStore]:
+    """Journal store from Config; None when journaling is disabled (JOURNAL_DIR empty)."""
+    if not Config.JOURNAL_DIR:
+        return None
+    return JournalStore(Config.JOURNAL_DIR, fsync_interval=Config.JOURNAL_FSYNC_SECONDS,
+                        snapshot_every=Config.JOURNAL_SNAPSHOT_EVERY, fsync_bytes=Config.JOURNAL_FSYNC_BYTES)
@@ -0,0 +1,163 @@
+"""
+Cached per-room language map and per-language sub-rooms.
+- The user_id -> language map of a room is built from the database once and then served
+  from memory; /language/set updates it in place instead of every tossup re-querying.
+- Each connection also joins "<room_id>:lang:<code>", so a localized label is emitted once
+  per language group instead of once per player to the whole room.
+- A room's map is dropped when its participants change (a RoomParticipant commit seen by
+  logic/room_roster.py, or its last connection leaving) and rebuilt on next use from the
+  participants plus the connections still registered. close() forgets the room entirely.
+- Language changes are published on the state store's "languages" channel, so every worker
+  updates its maps and moves its own connections, not just the one that served /language/set.
+
+Usage:
+    from logic.room_languages import room_languages
+    room_languages.register(room_id, user_id, request.sid)   # when a player's socket joins the room
+    room_languages.unregister(request.sid)                   # on leave / disconnect
+    for lang, sub_room in room_languages.groups(room_id):
+        emit("label", {"language": lang, "label": ...}, room=sub_room)
+    room_languages.set_user_language(user_id, "fr")          # from /language/set
+    room_languages.close(room_id)                            # when the room closes
+    room_languages.bind(store)                               # at startup, to share changes
+"""
+
+import json
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from flask_socketio import join_room, leave_room
+
+from models import User, RoomParticipant
+from logic.room_roster import room_rosters
+
+CHANNEL = "languages"
+
+def language_room(room_id: int, lang: str) -> str:
+    return f"{room_id}:lang:{lang}"
+
+
+class RoomLanguageCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._maps: Dict[int, Dict[int, str]] = {}          # room_id -> {user_id: lang}
+        self._sids: Dict[int, Set[Tuple[int, str]]] = {}    # user_id -> {(room_id, sid)}
+        self._users: Dict[str, Tuple[int, int]] = {}        # sid -> (room_id, user_id)
+        self._joined: Dict[str, str] = {}                   # sid -> language sub-room it is in
+        self._store = None
+
+    def _load(self, room_id: int) -> Dict[int, str]:
+        participants = RoomParticipant.query.filter_by(room_id=room_id).all()
+        user_ids = {p.user_id for p in participants if p.user_id and not p.is_bot}
+        with self._lock:
+            user_ids.update(uid for rid, uid in self._users.values() if rid == room_id)
+        users = User.query.filter(User.id.in_(user_ids)).all() if user_ids else []
+        return {u.id: u.language or "en" for u in users}
+
+    def language_map(self, room_id: int) -> Dict[int, str]:
+        """user_id -> language for all human participants (DB hit only on a cold room)."""
+        with self._lock:
+            cached = self._maps.get(room_id)
+        if cached is None:
+            cached = self._load(room_id)
+            with self._lock:
+                cached = self._maps.setdefault(room_id, cached)
+        return dict(cached)
+
+    def groups(self, room_id: int) -> List[Tuple[str, str]]:
+        """[(language, sub-room name)] for every language spoken in the room."""
+        langs = sorted(set(self.language_map(room_id).values()))
+        return [(lang, language_room(room_id, lang)) for lang in langs]
+
+    def register(self, room_id: int, user_id: int, sid: str):
+        """Put a connection in its language sub-room (call from a Socket.IO handler)."""
+        if sid in self._users:
+            self.unregister(sid)  # a connection plays in one room at a time
+        lang = self.language_map(room_id).get(user_id)
+        if lang is None:
+            # Joined after the map was cached: add just this user
+            user = User.query.get(user_id)
+            lang = (user.language if user else None) or "en"
+        with self._lock:
+            self._maps.setdefault(room_id, {})[user_id] = lang
+            self._sids.setdefault(user_id, set()).add((room_id, sid))
+            self._users[sid] = (room_id, user_id)
+            self._joined[sid] = lang
+        join_room(language_room(room_id, lang), sid=sid, namespace="/")
+
+    def unregister(self, sid: str):
+        """Take a connection out of its language sub-room (on leave or disconnect)."""
+        with self._lock:
+            room_id, user_id = self._users.pop(sid, (None, None))
+            if user_id is None:
+                return
+            self._forget_sid_locked(user_id, room_id, sid)
+            lang = self._joined.pop(sid, None)
+            if not any(rid == room_id for rid, _ in self._users.values()):
+                self._maps.pop(room_id, None)  # last connection gone: rebuilt on next use
+        if lang is not None:
+            leave_room(language_room(room_id, lang), sid=sid, namespace="/")
+
+    def _forget_sid_locked(self, user_id: int, room_id: int, sid: str):
+        sids = self._sids.get(user_id)
+        if sids is not None:
+            sids.discard((room_id, sid))
+            if not sids:
+                del self._sids[user_id]
+
+    def set_user_language(self, user_id: int, lang: str, publish: bool = True):
+        """Apply a language change to every cached room and move the user's live connections."""
+        moves = []
+        with self._lock:
+            for room_id, langs in self._maps.items():
+                if user_id in langs:
+                    langs[user_id] = lang
+            for room_id, sid in self._sids.get(user_id, ()):
+                if self._joined.get(sid, lang) != lang:
+                    moves.append((room_id, self._joined[sid], sid))
+                    self._joined[sid] = lang
+        for room_id, old, sid in moves:
+            leave_room(language_room(room_id, old), sid=sid, namespace="/")
+            join_room(language_room(room_id, lang), sid=sid, namespace="/")
+        if publish and self._store is not None:
+            self._store.publish(CHANNEL, json.dumps({"user": user_id, "language": lang}))
+
+    def bind(self, store):
+        """Share language changes with other workers through the state store."""
+        self._store = store
+        store.subscribe(CHANNEL, self._on_message)
+
+    def _on_message(self, message: str):
+        change = json.loads(message)
+        self.set_user_language(change["user"], change["language"], publish=False)
+
+    def invalidate(self, room_id: Optional[int] = None):
+        """Drop the cached map (e.g. participants changed); None clears every room."""
+        with self._lock:
+            if room_id is None:
+                self._maps.clear()
+            else:
+                self._maps.pop(room_id, None)
+
+    def close(self, room_id: int):
+        """Forget a closed room: its map and every connection registered in it."""
+        with self._lock:
+            self._maps.pop(room_id, None)
+            for sid, (rid, user_id) in list(self._users.items()):
+                if rid == room_id:
+                    del self._users[sid]
+                    self._joined.pop(sid, None)
+                    self._forget_sid_locked(user_id, room_id, sid)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"rooms": len(self._maps), "connections": len(self._users)}
+
+
+room_languages = RoomLanguageCache()
+
+
+@room_rosters.on_rooms_changed
+def _participants_changed(room_ids):
+    # RoomParticipant commits, on this worker or another, change who is in those rooms
+    for room_id in room_ids:
+        room_languages.invalidate(room_id)
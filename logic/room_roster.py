@@ -0,0 +1,218 @@
+"""
+Cached per-room roster: who plays for which team.
+- The roster of a room (user -> team, team -> members with captain and bot flags, each team's
+  designated captain) is loaded with three queries the first time the room needs it,
+  normally at setup validation, and then served from memory: scoring, validation and stats
+  resolve teams with dictionary lookups instead of a TeamMember join per answer.
+- A player whose team has no RoomParticipant row in the room (rooms set up without them)
+  is resolved from their own TeamMember row, as before the roster existed; a team found
+  that way is remembered in the roster and invalidated with it.
+- Commits that touch TeamMember, Team or RoomParticipant rows drop the affected rooms'
+  rosters (SQLAlchemy flush events, applied once the transaction commits), so the next
+  lookup reloads. The same invalidation is published on the state store's "roster" channel
+  so other workers drop their copies too.
+
+Usage:
+    from logic.room_roster import room_rosters
+    team_id = room_rosters.team_of(room_id, user_id)     # None for players without a team
+    for member in room_rosters.get(room_id).members(team_id): ...
+    room_rosters.invalidate(room_id)                     # when the room closes
+    room_rosters.on_rooms_changed(fn)                    # fn(room_ids) after participant changes
+"""
+
+import json
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import Team, TeamMember, RoomParticipant
+
+CHANNEL = "roster"
+
+
+class Member:
+    __slots__ = ("user_id", "team_id", "role", "captain", "is_bot")
+
+    def __init__(self, user_id: Optional[int], team_id: int, role: Optional[str], is_bot: bool):
+        self.user_id = user_id                  # None for bot seats
+        self.team_id = team_id
+        self.role = role or "member"
+        self.captain = self.role.lower() == "captain"
+        self.is_bot = bool(is_bot)
+
+
+class Roster:
+    __slots__ = ("room_id", "team_ids", "team_of_user", "members_of", "captain_of")
+
+    def __init__(self, room_id: int, team_ids: List[int], members: Iterable[Member],
+                 captains: Dict[int, Optional[int]]):
+        self.room_id = room_id
+        self.team_ids = team_ids
+        self.team_of_user: Dict[int, int] = {}
+        self.members_of: Dict[int, List[Member]] = {tid: [] for tid in team_ids}
+        self.captain_of = captains                # team_id -> Team.captain_id
+        for member in members:
+            self.members_of.setdefault(member.team_id, []).append(member)
+            if member.user_id is not None:
+                self.team_of_user.setdefault(member.user_id, member.team_id)
+
+    def team_of(self, user_id: int) -> Optional[int]:
+        return self.team_of_user.get(user_id)
+
+    def members(self, team_id: int) -> List[Member]:
+        return self.members_of.get(team_id, [])
+
+    def bots(self, team_id: int) -> int:
+        return sum(1 for m in self.members(team_id) if m.is_bot)
+
+    def linked_teams(self) -> Set[int]:
+        """Every team whose changes affect this roster, including teams found by fallback."""
+        return set(self.team_ids) | set(self.team_of_user.values())
+
+
+class RosterCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rosters: Dict[int, Roster] = {}
+        self._rooms_of_team: Dict[int, Set[int]] = {}   # team_id -> cached rooms it plays in
+        self._store = None
+        self._generation = 0                            # bumped by every invalidation
+        self._listeners: List[Callable[[Set[int]], None]] = []
+        self.loads = 0
+
+    def _load(self, room_id: int) -> Roster:
+        team_ids = sorted({rp.team_id for rp in RoomParticipant.query.filter_by(room_id=room_id).all() if rp.team_id})
+        members, captains = [], {}
+        if team_ids:
+            members = [Member(m.user_id, m.team_id, m.role, m.is_bot)
+                       for m in TeamMember.query.filter(TeamMember.team_id.in_(team_ids)).all()]
+            captains = {t.id: t.captain_id for t in Team.query.filter(Team.id.in_(team_ids)).all()}
+        return Roster(room_id, team_ids, members, captains)
+
+    def get(self, room_id: int) -> Roster:
+        """The room's roster (DB hit only on a cold room)."""
+        with self._lock:
+            roster = self._rosters.get(room_id)
+            generation = self._generation
+        if roster is None:
+            roster = self._load(room_id)
+            with self._lock:
+                self.loads += 1
+                if self._generation != generation:
+                    return roster  # invalidated mid-load: serve it once, don't cache it
+                roster = self._rosters.setdefault(room_id, roster)
+                for team_id in roster.linked_teams():
+                    self._rooms_of_team.setdefault(team_id, set()).add(room_id)
+        return roster
+
+    def team_of(self, room_id: int, user_id: int) -> Optional[int]:
+        roster = self.get(room_id)
+        team_id = roster.team_of(user_id)
+        if team_id is not None:
+            return team_id
+        # Not on a team seated in this room: fall back to the player's own team
+        member = (TeamMember.query.filter(TeamMember.user_id == user_id, TeamMember.team_id.isnot(None))
+                  .order_by(TeamMember.id).first())
+        if member is None:
+            return None
+        with self._lock:
+            if self._rosters.get(room_id) is roster:
+                roster.team_of_user[user_id] = member.team_id
+                self._rooms_of_team.setdefault(member.team_id, set()).add(room_id)
+        return member.team_id
+
+    # ---------- Invalidation ----------
+
+    def invalidate(self, room_id: Optional[int] = None):
+        """Drop one room's roster; None clears every room."""
+        with self._lock:
+            self._generation += 1
+            if room_id is None:
+                self._rosters.clear()
+                self._rooms_of_team.clear()
+                return
+            self._drop_locked(room_id)
+
+    def invalidate_teams(self, team_ids: Iterable[int]):
+        """Drop the roster of every cached room one of these teams plays in."""
+        with self._lock:
+            self._generation += 1
+            for team_id in team_ids:
+                for room_id in list(self._rooms_of_team.get(team_id, ())):
+                    self._drop_locked(room_id)
+
+    def _drop_locked(self, room_id: int):
+        roster = self._rosters.pop(room_id, None)
+        if roster is None:
+            return
+        for team_id in roster.linked_teams():
+            rooms = self._rooms_of_team.get(team_id)
+            if rooms is not None:
+                rooms.discard(room_id)
+                if not rooms:
+                    del self._rooms_of_team[team_id]
+
+    def apply_changes(self, team_ids: Set[int], room_ids: Set[int], publish: bool = True):
+        self.invalidate_teams(team_ids)
+        for room_id in room_ids:
+            self.invalidate(room_id)
+        if room_ids:
+            for listener in self._listeners:
+                listener(room_ids)
+        if publish and self._store is not None and (team_ids or room_ids):
+            self._store.publish(CHANNEL, json.dumps({"teams": sorted(team_ids), "rooms": sorted(room_ids)}))
+
+    def on_rooms_changed(self, listener: Callable[[Set[int]], None]):
+        """Call listener(room_ids) whenever rooms' participants change, on any worker."""
+        self._listeners.append(listener)
+        return listener
+
+    def bind(self, store):
+        """Share invalidations with other workers through the state store."""
+        self._store = store
+        store.subscribe(CHANNEL, self._on_message)
+
+    def _on_message(self, message: str):
+        changes = json.loads(message)
+        self.apply_changes(set(changes.get("teams") or ()), set(changes.get("rooms") or ()), publish=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"rooms": len(self._rosters), "loads": self.loads}
+
+
+room_rosters = RosterCache()
+
+
+# ---------- Change tracking ----------
+
+def _pending(session: Session) -> Tuple[Set[int], Set[int]]:
+    return session.info.setdefault("roster_changes", (set(), set()))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, TeamMember):
+            # A member moved between teams invalidates both the old team and the new one
+            history = inspect(obj).attrs.team_id.history
+            _pending(session)[0].update(t for t in [obj.team_id, *history.deleted] if t is not None)
+        elif isinstance(obj, Team) and obj.id is not None:
+            _pending(session)[0].add(obj.id)
+        elif isinstance(obj, RoomParticipant):
+            history = inspect(obj).attrs.room_id.history
+            _pending(session)[1].update(r for r in [obj.room_id, *history.deleted] if r is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session):
+    changes = session.info.pop("roster_changes", None)
+    if changes:
+        room_rosters.apply_changes(*changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop("roster_changes", None)
@@ -0,0 +1,162 @@
+"""
+Room ownership across workers.
+- Every room is run by exactly one worker: the holder of the "room:<code>:owner" lease in
+  the state store. The first worker to see an event for a free room claims it; leases are
+  renewed on the shared scheduler and released when the room empties.
+- A worker that fails to renew a lease stops running the room at once (on_lost callbacks
+  drop its local state), so two workers never append to the same room journal.
+- The owner of a foreign room is cached for one lease TTL, so forwarding an event costs no
+  store round trip. An owner that released the room meanwhile re-routes what it receives.
+- Events for a room owned elsewhere are forwarded to the owner's "worker:<id>" channel and
+  replayed there in arrival order, so one BuzzArbiter sees every buzz for the room.
+- Forwarded envelopes carry the wall-clock send time; the owner treats the hop as transit
+  time, so buzzes arriving through another worker are not penalized for the extra hop.
+- The router also remembers which room each local connection is in, for events that
+  arrive without a room code (and for disconnects).
+
+Usage:
+    from logic.room_router import RoomRouter
+    router = RoomRouter(get_store())
+    router.listen(run_forwarded)                 # run_forwarded(event, data, sid, transit)
+    router.on_lost(lambda code: ...)             # a lease this worker held has expired
+    owner = router.owner("ABCD1234")
+    if owner != router.worker_id:
+        router.forward(owner, "buzz", data, sid)
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from logic.state_store import StateStore
+from logic.scheduler import get_scheduler
+
+ForwardHandler = Callable[[str, Dict[str, Any], str, float], None]
+
+
+def owner_key(code: str) -> str:
+    return f"room:{code}:owner"
+
+
+def worker_channel(worker_id: str) -> str:
+    return f"worker:{worker_id}"
+
+
+class RoomRouter:
+    def __init__(self, store: StateStore, worker_id: Optional[str] = None, ttl: float = 15):
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._owned: Set[str] = set()
+        self._foreign: Dict[str, Tuple[str, float]] = {}  # code -> (owner, cached until)
+        self._lost_listeners: List[Callable[[str], None]] = []
+        self._sid_rooms: Dict[str, str] = {}   # local sid -> room code
+        self._renewal = None
+        self.forwarded = 0
+
+    # ---------- Ownership ----------
+
+    def owner(self, code: str) -> str:
+        """Worker running this room, claiming it for this worker when nobody holds it."""
+        now = time.monotonic()
+        with self._lock:
+            if code in self._owned:
+                return self.worker_id
+            cached = self._foreign.get(code)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+        while True:
+            if self.store.claim(owner_key(code), self.worker_id, self.ttl):
+                with self._lock:
+                    self._owned.add(code)
+                    self._foreign.pop(code, None)
+                    self._start_renewal()
+                return self.worker_id
+            owner = self.store.get(owner_key(code))
+            if owner:
+                with self._lock:
+                    # The lease it holds cannot outlive one TTL without a renewal
+                    self._foreign[code] = (owner, now + self.ttl)
+                    if len(self._foreign) > 1024:
+                        self._foreign = {c: v for c, v in self._foreign.items() if v[1] > now}
+                return owner
+            # Lease expired between claim and get: try again
+
+    def held(self, code: str) -> bool:
+        """Whether any worker holds the room's lease right now (no claim is made)."""
+        with self._lock:
+            if code in self._owned:
+                return True
+        return self.store.get(owner_key(code)) is not None
+
+    def owns(self, code: str) -> bool:
+        with self._lock:
+            return code in self._owned
+
+    def release(self, code: str):
+        with self._lock:
+            self._owned.discard(code)
+        self.store.release(owner_key(code), self.worker_id)
+
+    def _start_renewal(self):
+        if self._renewal is None:
+            self._renewal = get_scheduler().call_every(self.ttl / 3, self.renew)
+
+    def on_lost(self, listener: Callable[[str], None]):
+        """Call listener(code) when this worker loses a room's lease."""
+        self._lost_listeners.append(listener)
+
+    def renew(self):
+        with self._lock:
+            owned = list(self._owned)
+        for code in owned:
+            if not self.store.claim(owner_key(code), self.worker_id, self.ttl):
+                # Lease lost (e.g. the store was unreachable past the TTL): another worker may run
+                # the room now, so this one stops claiming it and drops what it holds locally
+                with self._lock:
+                    self._owned.discard(code)
+                print(f"Lost ownership of room {code}")
+                for listener in self._lost_listeners:
+                    try:
+                        listener(code)
+                    except Exception as e:
+                        print(f"Dropping lost room {code} failed: {e}")
+
+    # ---------- Forwarding ----------
+
+    def forward(self, owner: str, event: str, data: Dict[str, Any], sid: str):
+        envelope = {"event": event, "data": data, "sid": sid, "sent_at": time.time(), "from": self.worker_id}
+        self.store.publish(worker_channel(owner), json.dumps(envelope))
+        self.forwarded += 1
+
+    def listen(self, handler: ForwardHandler):
+        """Deliver events forwarded to this worker as handler(event, data, sid, transit)."""
+        def on_message(raw: str):
+            envelope = json.loads(raw)
+            transit = max(0.0, time.time() - envelope.get("sent_at", time.time()))
+            handler(envelope["event"], envelope["data"], envelope["sid"], transit)
+        self.store.subscribe(worker_channel(self.worker_id), on_message)
+
+    # ---------- Local connections ----------
+
+    def remember(self, sid: str, code: str):
+        with self._lock:
+            self._sid_rooms[sid] = code
+
+    def room_of(self, sid: str) -> Optional[str]:
+        with self._lock:
+            return self._sid_rooms.get(sid)
+
+    def forget(self, sid: str) -> Optional[str]:
+        with self._lock:
+            return self._sid_rooms.pop(sid, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"worker": self.worker_id, "owned_rooms": len(self._owned),
+                    "connections": len(self._sid_rooms), "forwarded": self.forwarded}
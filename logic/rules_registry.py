@@ -0,0 +1,227 @@
+"""
+Process-wide compiled rules registry.
+- Each schemas/<format>_rules_schema.json is read once and compiled into an immutable
+  RulesTable: tossup/power/neg/bonus points, timers, tiebreaker text and capability flags.
+- Lookups are attribute/dict reads on the compiled table; scoring a buzz does no file I/O
+  and no walking of nested schema sections.
+- Loaded schema files are re-stat'ed on a background scheduler tick and recompiled when
+  their mtime/size change; a schema that fails to parse keeps serving the previous table.
+
+Usage:
+    from logic.rules_registry import get_rules
+    rules = get_rules("NAQT")
+    rules.tossup_points, rules.neg_penalty, rules.timer("bonus")
+"""
+
+import os
+import json
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from config import Config
+from logic.scheduler import get_scheduler
+
+SCHEMAS_DIR = os.path.normpath(os.path.join(os.path.abspath(os.path.dirname(__file__)), "..", "schemas"))
+TIMER_EVENTS = ("tossup", "bonus", "sixty_second", "lightning")
+
+
+class RulesTable(NamedTuple):
+    format_name: str
+    tossup_points: int
+    power_points: Optional[int]
+    neg_penalty: int
+    bonus_points: int
+    timers: Mapping[str, int]
+    default_timer: int
+    tiebreaker_message: str
+    has_sixty_second_round: bool
+    supports_power: bool
+    trivia_categories: Mapping[str, int]
+    schema: Mapping[str, Any]             # raw schema, for setup-time validation only
+
+    def timer(self, event: str) -> int:
+        return self.timers.get(event, self.default_timer)
+
+    def points_for_tossup(self, power: bool = False) -> int:
+        if power and self.power_points:
+            return self.power_points
+        return self.tossup_points
+
+    def trivia_category_points(self, category_key: str) -> int:
+        return self.trivia_categories.get(category_key, 1)
+
+
+def _default_timer(fmt: str, event: str) -> int:
+    if fmt == "OSSAA":
+        if event == "sixty_second":
+            return 60
+        if event == "tossup":
+            return 5
+    if fmt in {"NAQT", "FROSHMORE"} and event in ("tossup", "bonus"):
+        return 5
+    if fmt == "TRIVIA" and event == "tossup":
+        return 10
+    return 5
+
+
+def compile_rules(format_name: str, schema: Dict[str, Any]) -> RulesTable:
+    """Flatten a rules schema into a RulesTable, applying the per-format defaults."""
+    fmt = format_name.strip().upper()
+    sections = schema.get("sections", {})
+    gameplay = sections.get("Gameplay", {})
+    questions = sections.get("Questions", {})
+    single = sections.get("Tournaments", {}).get("single_round_mode", {})
+    first_quarter = single.get("quarters", {}).get("first_quarter", {})
+
+    # Tossups: schema regular value, else Froshmore quarter points, else 10
+    points_cfg = gameplay.get("tossup_points", {})
+    if points_cfg.get("regular"):
+        tossup_points = int(points_cfg["regular"])
+    elif first_quarter.get("points_each"):
+        tossup_points = int(first_quarter["points_each"])
+    else:
+        tossup_points = 10
+    power_points = int(points_cfg["power"]) if points_cfg.get("power") else None
+
+    bonus_cfg = gameplay.get("bonus_points", {})
+    fq_bonus = first_quarter.get("bonus", {})
+    if bonus_cfg.get("each"):
+        bonus_points = int(bonus_cfg["each"])
+    elif fq_bonus and fq_bonus.get("points_each"):
+        bonus_points = int(fq_bonus["points_each"])
+    else:
+        bonus_points = 10
+
+    neg = gameplay.get("neg_penalty")
+    if isinstance(neg, int):
+        neg_penalty = neg
+    elif fmt in {"FROSHMORE", "TRIVIA"}:
+        neg_penalty = 0  # no negs in Froshmore or typical pub trivia
+    else:
+        neg_penalty = -5
+
+    timers = {event: _default_timer(fmt, event) for event in TIMER_EVENTS}
+    for event, value in gameplay.get("timers", {}).items():
+        try:
+            timers[event] = int(value)
+        except (TypeError, ValueError):
+            pass
+
+    tb = gameplay.get("tiebreaker_procedure")
+    if isinstance(tb, str) and tb.strip():
+        tiebreaker = tb
+    elif fmt == "OSSAA":
+        tiebreaker = "OSSAA sudden-death tossups until a clear winner."
+    elif fmt == "FROSHMORE":
+        tiebreaker = "Froshmore final tiebreaker: individual tossups until a clear winner."
+    else:
+        tiebreaker = "Sudden-death tossups begin."
+
+    has_sixty = bool(gameplay.get("sixty_second_round")) or \
+        "sixty_second_round" in questions or "lightning_round" in questions
+
+    categories = {k: v for k, v in questions.get("categories", {}).items() if isinstance(v, int)} \
+        if isinstance(questions.get("categories"), dict) else {}
+
+    return RulesTable(
+        format_name=fmt,
+        tossup_points=tossup_points,
+        power_points=power_points,
+        neg_penalty=neg_penalty,
+        bonus_points=bonus_points,
+        timers=MappingProxyType(timers),
+        default_timer=5,
+        tiebreaker_message=tiebreaker,
+        has_sixty_second_round=has_sixty,
+        supports_power=isinstance(points_cfg.get("power"), int),
+        trivia_categories=MappingProxyType(categories),
+        schema=MappingProxyType(schema)
+    )
+
+
+class RulesRegistry:
+    def __init__(self, schemas_dir: str = SCHEMAS_DIR):
+        self.schemas_dir = schemas_dir
+        self._lock = threading.Lock()
+        # FORMAT -> (table, mtime, size); replaced wholesale so readers never need the lock
+        self._tables: Dict[str, Tuple[RulesTable, float, int]] = {}
+        self._reloader = None
+        self.reloads = 0
+
+    def path_for(self, format_name: str) -> str:
+        # Rules schema file name convention: <format>_rules_schema.json
+        return os.path.join(self.schemas_dir, f"{format_name.strip().lower()}_rules_schema.json")
+
+    def _compile(self, fmt: str) -> Tuple[RulesTable, float, int]:
+        path = self.path_for(fmt)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Rules schema not found: {path}")
+        st = os.stat(path)
+        with open(path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+        return compile_rules(fmt, schema), st.st_mtime, st.st_size
+
+    def get(self, format_name: str) -> RulesTable:
+        fmt = format_name.strip().upper()
+        entry = self._tables.get(fmt)
+        if entry is None:
+            with self._lock:
+                entry = self._tables.get(fmt)
+                if entry is None:
+                    entry = self._compile(fmt)
+                    self._tables = dict(self._tables, **{fmt: entry})
+        return entry[0]
+
+    def reload_changed(self) -> Dict[str, str]:
+        """Recompile loaded schemas whose file changed; returns {format: "reloaded" | error}."""
+        results = {}
+        with self._lock:
+            tables = dict(self._tables)
+            for fmt, (_, mtime, size) in self._tables.items():
+                try:
+                    st = os.stat(self.path_for(fmt))
+                except OSError as e:
+                    results[fmt] = f"kept previous rules: {e}"
+                    continue
+                if (st.st_mtime, st.st_size) == (mtime, size):
+                    continue
+                try:
+                    tables[fmt] = self._compile(fmt)
+                    results[fmt] = "reloaded"
+                    self.reloads += 1
+                except Exception as e:
+                    # Keep serving the last good table; retry once the file changes again
+                    old = tables[fmt][0]
+                    tables[fmt] = (old, st.st_mtime, st.st_size)
+                    results[fmt] = f"kept previous rules: {e}"
+                    print(f"Rules schema {fmt} failed to reload: {e}")
+            self._tables = tables
+        return results
+
+    def start(self, interval: float):
+        """Stat loaded schema files every `interval` seconds on the shared scheduler."""
+        if self._reloader is not None or interval <= 0:
+            return
+        self._reloader = get_scheduler().call_every(interval, self.reload_changed)
+
+
+_registries: Dict[str, RulesRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(schemas_dir: Optional[str] = None) -> RulesRegistry:
+    schemas_dir = os.path.normpath(schemas_dir or SCHEMAS_DIR)
+    registry = _registries.get(schemas_dir)
+    if registry is not None:
+        return registry
+    with _registries_lock:
+        registry = _registries.get(schemas_dir)
+        if registry is None:
+            registry = _registries[schemas_dir] = RulesRegistry(schemas_dir)
+            registry.start(Config.RULES_RELOAD_SECONDS)
+        return registry
+
+
+def get_rules(format_name: str, schemas_dir: Optional[str] = None) -> RulesTable:
+    return get_registry(schemas_dir).get(format_name)
@@ -9,25 +9,21 @@ Validates:
 - versus mode compatibility (pvp, pvteam, teamvsteam)
 """
 
-import json
-import os
 from typing import Dict, Any
 
-from models import Room, Team, TeamMember
-from db import db
+from models import Room
+from logic.rules_registry import SCHEMAS_DIR, get_rules
+from logic.room_roster import room_rosters
 
-SCHEMA_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "schemas")
+SCHEMA_DIR = SCHEMAS_DIR
 
 SUPPORTED_FORMATS = {"NAQT", "OSSAA", "FROSHMORE", "TRIVIA"}
 SUPPORTED_MODES = {"pvp", "pvteam", "teamvsteam"}
 SUPPORTED_TOURNAMENTS = {"round_robin", "single_elimination", "double_elimination"}
 
 def _load_schema(name: str) -> Dict[str, Any]:
-    path = os.path.join(SCHEMA_DIR, f"{name.lower()}_rules_schema.json")
-    if not os.path.isfile(path):
-        raise FileNotFoundError(f"Schema not found: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # Served from the compiled rules registry: parsed once per process, reloaded on change
+    return get_rules(name).schema
 
 def validate_room_setup(room_id: int) -> Dict[str, Any]:
     room = Room.query.get(room_id)
@@ -63,11 +59,10 @@ def validate_room_setup(room_id: int) -> Dict[str, Any]:
     roster_limit = team_rules.get("roster_limit")
     captain_required = team_rules.get("captain_required", False)
 
-    # Gather teams in room and validate
-    from models import RoomParticipant
-    team_ids = [rp.team_id for rp in RoomParticipant.query.filter_by(room_id=room_id).all() if rp.team_id]
-    for tid in team_ids:
-        members = TeamMember.query.filter_by(team_id=tid).all()
+    # Gather teams in room and validate (loads the roster that scoring then reuses)
+    roster = room_rosters.get(room_id)
+    for tid in roster.team_ids:
+        members = roster.members(tid)
         active_count = len(members)
         if max_active and active_count > max_active:
             errors.append(f"Team {tid} exceeds max active players ({active_count} > {max_active}).")
@@ -77,7 +72,7 @@ def validate_room_setup(room_id: int) -> Dict[str, Any]:
             warnings.append(f"Team {tid} exceeds roster limit ({active_count} > {roster_limit}).")
         if captain_required:
             # Check if any member is captain
-            has_captain = any((m.role or "").lower() == "captain" for m in members)
+            has_captain = any(m.captain for m in members)
             if not has_captain:
                 errors.append(f"Team {tid} must designate a captain before play.")
 
@@ -0,0 +1,185 @@
+"""
+One timer service for every room.
+- A single dispatcher thread sleeps on a min-heap of deadlines taken from a monotonic clock;
+  due callbacks run on a fixed pool of worker threads, so thousands of concurrent timers
+  cost heap entries, not OS threads.
+- Every call returns a TimerHandle that can be cancelled or rescheduled.
+- Repeating timers are drift-free: tick k fires at start + k * interval, however late the
+  previous tick ran.
+- Cancelled entries are dropped lazily and the heap is compacted once they dominate it.
+
+Usage:
+    from logic.scheduler import get_scheduler
+    scheduler = get_scheduler()
+    handle = scheduler.call_later(0.15, close_window, room)
+    ticks = scheduler.call_every(1.0, tick, count=30)
+    ticks.cancel()
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+
+class TimerHandle:
+    __slots__ = ("_scheduler", "deadline", "callback", "args", "interval", "remaining", "runs",
+                 "_generation", "cancelled")
+
+    def __init__(self, scheduler: "Scheduler", deadline: float, callback: Callable, args: Tuple,
+                 interval: Optional[float] = None, count: Optional[int] = None):
+        self._scheduler = scheduler
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.interval = interval      # None for one-shot timers
+        self.remaining = count        # runs left (1 for one-shots); None repeats until cancelled
+        self.runs = 0
+        self._generation = 0
+        self.cancelled = False
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled and (self.remaining is None or self.remaining > 0)
+
+    def cancel(self) -> bool:
+        return self._scheduler.cancel(self)
+
+    def reschedule(self, delay: float) -> bool:
+        return self._scheduler.reschedule(self, delay)
+
+
+class Scheduler:
+    def __init__(self, workers: int = 4, clock: Callable[[], float] = time.monotonic, name: str = "scheduler"):
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, int, TimerHandle]] = []
+        self._seq = itertools.count()
+        self._stale = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-worker")
+        self._stopped = False
+        self.fired = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ---------- Scheduling ----------
+
+    def _push_locked(self, handle: TimerHandle):
+        heapq.heappush(self._heap, (handle.deadline, next(self._seq), handle._generation, handle))
+        if self._heap[0][3] is handle:
+            self._cond.notify()
+
+    def call_at(self, deadline: float, fn: Callable, *args) -> TimerHandle:
+        """Run fn(*args) once the monotonic clock reaches deadline."""
+        with self._cond:
+            handle = TimerHandle(self, deadline, fn, args, count=1)
+            self._push_locked(handle)
+            return handle
+
+    def call_later(self, delay: float, fn: Callable, *args) -> TimerHandle:
+        return self.call_at(self._clock() + max(0.0, delay), fn, *args)
+
+    def call_every(self, interval: float, fn: Callable, *args, count: Optional[int] = None,
+                   first: Optional[float] = None) -> TimerHandle:
+        """Run fn(*args) every interval seconds (count times, or until cancelled).
+        The first run is after `first` seconds (default: one interval)."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        with self._cond:
+            deadline = self._clock() + (interval if first is None else max(0.0, first))
+            handle = TimerHandle(self, deadline, fn, args, interval, count)
+            if handle.active:
+                self._push_locked(handle)
+            return handle
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        with self._cond:
+            if not handle.active:
+                return False
+            handle.cancelled = True
+            self._mark_stale_locked()
+            return True
+
+    def reschedule(self, handle: TimerHandle, delay: float) -> bool:
+        """Move a pending timer to now + delay (a repeating timer restarts its cadence there)."""
+        with self._cond:
+            if not handle.active:
+                return False
+            handle._generation += 1
+            handle.deadline = self._clock() + max(0.0, delay)
+            self._mark_stale_locked()
+            self._push_locked(handle)
+            return True
+
+    def _mark_stale_locked(self):
+        self._stale += 1
+        # Lazy deletion; rebuild once dead entries outnumber live ones
+        if self._stale > 64 and self._stale * 2 > len(self._heap):
+            self._heap = [e for e in self._heap if not e[3].cancelled and e[2] == e[3]._generation]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    # ---------- Dispatch ----------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, _, generation, handle = self._heap[0]
+                    if handle.cancelled or generation != handle._generation:
+                        heapq.heappop(self._heap)
+                        self._stale = max(0, self._stale - 1)
+                        continue
+                    delay = deadline - self._clock()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    break
+                handle.runs += 1
+                if handle.remaining is not None:
+                    handle.remaining -= 1
+                if handle.interval is not None and handle.active:
+                    # Drift-free: next tick is relative to this tick's deadline, not to now
+                    handle.deadline = deadline + handle.interval
+                    self._push_locked(handle)
+                self.fired += 1
+            self._executor.submit(self._invoke, handle)
+
+    @staticmethod
+    def _invoke(handle: TimerHandle):
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            print(f"Scheduled callback {getattr(handle.callback, '__name__', handle.callback)} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"pending": max(0, len(self._heap) - self._stale), "fired": self.fired}
+
+    def shutdown(self, wait: bool = False):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._executor.shutdown(wait=wait)
+
+
+_scheduler: Optional[Scheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(workers=Config.SCHEDULER_WORKERS)
+        return _scheduler
@@ -0,0 +1,137 @@
+"""
+Versioned, delta-based scoreboard channel for one room.
+- Every flush bumps a monotonically increasing version and emits only the entries that
+  changed since the previous version ("score_delta"), never the whole table.
+- Changes made within a short coalescing window go out as a single delta, so a burst of
+  answers in a big room costs one message per client instead of one per answer.
+- A client that sees a delta whose base is not the version it holds (it missed one, or just
+  joined) asks for "score_sync" and receives a full "score_snapshot".
+- The last few deltas are kept, so a reconnecting client can be sent one merged delta
+  covering exactly what it missed instead of the whole table.
+
+Wire format:
+    score_delta    {"version": 7, "base": 6, "changes": {"alice": 30}, "removed": ["bob"]}
+    score_snapshot {"version": 7, "scores": {"alice": 30, "carol": 10}}
+
+Usage:
+    from logic.scoreboard import Scoreboard
+    board = Scoreboard(emit=lambda event, payload: socketio.emit(event, payload, to=room))
+    board.add("alice", 10)          # coalesced; flushed after `window` seconds
+    board.snapshot()                # {"version": ..., "scores": {...}}
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from logic.scheduler import TimerHandle, get_scheduler
+
+# Marks a player removed in the pending change set
+_REMOVED = object()
+
+
+class Scoreboard:
+    def __init__(self, emit: Callable[[str, Dict[str, Any]], None], window: float = 0.05, history: int = 64):
+        self._emit = emit
+        self.window = window
+        self._lock = threading.Lock()
+        self._scores: Dict[str, int] = {}
+        self._pending: Dict[str, Any] = {}
+        self._flush_timer: Optional[TimerHandle] = None
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.version = 0
+
+    # ---------- Updates ----------
+
+    def add(self, player: str, points: int) -> int:
+        with self._lock:
+            score = self._scores.get(player, 0) + points
+            self._scores[player] = score
+            self._pending[player] = score
+            self._schedule_locked()
+            return score
+
+    def ensure(self, player: str):
+        """Add player with 0 points unless already on the board."""
+        with self._lock:
+            if player in self._scores:
+                return
+            self._scores[player] = 0
+            self._pending[player] = 0
+            self._schedule_locked()
+
+    def remove(self, player: str):
+        with self._lock:
+            if self._scores.pop(player, None) is None:
+                return
+            self._pending[player] = _REMOVED
+            self._schedule_locked()
+
+    def _schedule_locked(self):
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = get_scheduler().call_later(self.window, self.flush)
+
+    # ---------- Publishing ----------
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Emit pending changes as one delta; returns it (None when nothing changed)."""
+        with self._lock:
+            self._flush_timer = None
+            if not self._pending:
+                return None
+            pending, self._pending = self._pending, {}
+            self.version += 1
+            delta = {
+                "version": self.version,
+                "base": self.version - 1,
+                "changes": {p: s for p, s in pending.items() if s is not _REMOVED},
+                "removed": [p for p, s in pending.items() if s is _REMOVED]
+            }
+            self._history.append(delta)
+            # Emit under the lock so deltas leave in version order
+            self._emit("score_delta", delta)
+        return delta
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full table at the current version. It may already include unflushed changes; deltas
+        carry absolute scores, so applying the next one on top is harmless."""
+        with self._lock:
+            return {"version": self.version, "scores": dict(self._scores)}
+
+    def load(self, scores: Dict[str, int], version: int):
+        """Reset to a recovered table without publishing anything."""
+        with self._lock:
+            self._scores = dict(scores)
+            self._pending = {}
+            self._history.clear()
+            self.version = version
+
+    def catch_up(self, version: Optional[int]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(event, payload) bringing a client at `version` up to date: None when it is current,
+        one merged score_delta while the history covers the gap, else a score_snapshot."""
+        with self._lock:
+            if version == self.version:
+                return None
+            missed = [d for d in self._history if version is not None and d["version"] > version]
+            if not missed or missed[0]["base"] != version:
+                return "score_snapshot", {"version": self.version, "scores": dict(self._scores)}
+            changes: Dict[str, int] = {}
+            removed = set()
+            for delta in missed:
+                for player, score in delta["changes"].items():
+                    changes[player] = score
+                    removed.discard(player)
+                for player in delta["removed"]:
+                    changes.pop(player, None)
+                    removed.add(player)
+            return "score_delta", {"version": self.version, "base": version,
+                                   "changes": changes, "removed": sorted(removed)}
+
+    def get(self, player: str, default: int = 0) -> int:
+        with self._lock:
+            return self._scores.get(player, default)
+
+    def scores(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._scores)
@@ -0,0 +1,129 @@
+"""
+Per-room player sessions with a reconnect grace period.
+- Two-way index: sid -> Session and username -> Session, both O(1), so a disconnect finds
+  its player without scanning the room.
+- A dropped connection only marks the session away; its score, team and moderator role are
+  kept for `grace` seconds (a scheduler timer) and only then is the player removed.
+- Every session has a random token, handed to the client on join. "resume" with
+  (username, token) on a new connection takes the session back and cancels the expiry.
+
+Usage:
+    from logic.session_index import SessionIndex
+    sessions = SessionIndex(grace=30)
+    session = sessions.attach("alice", sid, role="moderator")
+    sessions.detach(sid, on_expire=drop_player)     # on disconnect
+    sessions.resume("alice", token, new_sid)        # on reconnect, within the grace period
+"""
+
+import time
+import secrets
+from typing import Callable, Dict, List, Optional
+
+from logic.scheduler import TimerHandle, get_scheduler
+
+
+class Session:
+    __slots__ = ("username", "sid", "token", "role", "team", "away_since", "expiry")
+
+    def __init__(self, username: str, sid: Optional[str], role: str = "player", team: Optional[str] = None):
+        self.username = username
+        self.sid: Optional[str] = sid
+        self.token = secrets.token_urlsafe(16)
+        self.role = role
+        self.team = team
+        self.away_since: Optional[float] = None
+        self.expiry: Optional[TimerHandle] = None
+
+    @property
+    def away(self) -> bool:
+        return self.sid is None
+
+
+class SessionIndex:
+    """Not thread-safe on its own: callers hold the owning GameState's lock."""
+
+    def __init__(self, grace: float = 30):
+        self.grace = grace
+        self._by_sid: Dict[str, Session] = {}
+        self._by_user: Dict[str, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_user)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._by_user
+
+    # ---------- Lookups ----------
+
+    def get(self, username: str) -> Optional[Session]:
+        return self._by_user.get(username)
+
+    def for_sid(self, sid: str) -> Optional[Session]:
+        return self._by_sid.get(sid)
+
+    def sid_of(self, username: str) -> Optional[str]:
+        session = self._by_user.get(username)
+        return session.sid if session else None
+
+    def usernames(self) -> List[str]:
+        return list(self._by_user)
+
+    def away(self) -> List[str]:
+        return [u for u, s in self._by_user.items() if s.away]
+
+    # ---------- Lifecycle ----------
+
+    def attach(self, username: str, sid: str, role: str = "player", team: Optional[str] = None) -> Session:
+        """New session for username (callers check the name is free, or resume instead)."""
+        session = Session(username, sid, role, team)
+        self._by_user[username] = session
+        self._by_sid[sid] = session
+        return session
+
+    def resume(self, username: str, token: str, sid: str) -> Optional[Session]:
+        """Move username's session to a new connection; None unless the token matches."""
+        session = self._by_user.get(username)
+        if session is None or not token or not secrets.compare_digest(session.token, token):
+            return None
+        if session.sid is not None:
+            # Reconnected before the old connection was noticed as gone
+            self._by_sid.pop(session.sid, None)
+        if session.expiry is not None:
+            session.expiry.cancel()
+            session.expiry = None
+        session.sid = sid
+        session.away_since = None
+        self._by_sid[sid] = session
+        return session
+
+    def detach(self, sid: str, on_expire: Callable[[Session], None]) -> Optional[Session]:
+        """Mark the connection's session away; on_expire(session) runs on a scheduler thread
+        if it is not resumed within the grace period."""
+        session = self._by_sid.pop(sid, None)
+        if session is None:
+            return None
+        session.sid = None
+        session.away_since = time.monotonic()
+        session.expiry = get_scheduler().call_later(self.grace, on_expire, session)
+        return session
+
+    def restore(self, username: str, token: str, role: str, team: Optional[str],
+                on_expire: Callable[[Session], None]) -> Session:
+        """Recreate a session after a restart; it starts away, with a fresh grace period."""
+        session = Session(username, None, role, team)
+        session.token = token
+        session.away_since = time.monotonic()
+        session.expiry = get_scheduler().call_later(self.grace, on_expire, session)
+        self._by_user[username] = session
+        return session
+
+    def remove(self, username: str) -> Optional[Session]:
+        session = self._by_user.pop(username, None)
+        if session is None:
+            return None
+        if session.sid is not None:
+            self._by_sid.pop(session.sid, None)
+        if session.expiry is not None:
+            session.expiry.cancel()
+            session.expiry = None
+        return session
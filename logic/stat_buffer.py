@@ -0,0 +1,230 @@
+"""
+Write-behind buffer for gameplay stats.
+- Scoring never touches the database: add() folds the award into in-memory deltas keyed by
+  (scope, user, format, round), and (scope, team, ...) for the player's team, with
+  per-category counters, and returns.
+- Deltas are sealed into a batch at the end of each tossup/bonus cycle (flush()), every
+  STAT_FLUSH_SECONDS on the shared scheduler, or as soon as STAT_BUFFER_MAX_KEYS keys are
+  pending. The buffer's own writer thread applies each batch as a single bulk upsert
+  (stats_manager.apply_stat_deltas); the shared scheduler only wakes it, so a slow or
+  locked database never holds the workers that close buzz windows.
+- At most STAT_BUFFER_MAX_BATCHES sealed batches wait for the writer. Only when those are all
+  queued and the open batch is full too (the database has fallen that far behind) does add()
+  block, for up to STAT_BUFFER_BLOCK_SECONDS, before accepting the award anyway. After such a
+  stall nothing blocks again until the writer makes progress: a full open batch is appended
+  to the dead-letter file instead, so memory stays bounded.
+- A batch that fails to write stays at the head of the queue and is retried on the next tick,
+  up to STAT_BATCH_MAX_RETRIES times; then it is logged, appended to STAT_DEAD_LETTER_PATH and
+  dropped, so one bad batch (a foreign key violation, say) cannot hold up the ones behind it.
+
+Usage:
+    from logic.stat_buffer import get_stat_buffer
+    stats = get_stat_buffer()                      # inside an app context; binds the app
+    stats.add(scope_id, user_id, "NAQT", 1, 15, {"History": 15}, team_id=7)
+    stats.flush()                                  # end of the tossup/bonus cycle
+"""
+
+import json
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+from flask import current_app
+
+from config import Config
+from logic.scheduler import get_scheduler
+from stats_manager import StatKey, apply_stat_deltas, merge_delta, stat_delta
+
+Batch = Dict[StatKey, Dict[str, int]]
+
+
+class StatBuffer:
+    def __init__(self, app, apply: Callable[[Batch], None] = apply_stat_deltas, flush_seconds: float = 2.0,
+                 max_keys: int = 500, max_batches: int = 4, block_seconds: float = 1.0,
+                 max_retries: int = 5, dead_letter_path: Optional[str] = None):
+        self.app = app
+        self.apply = apply
+        self.max_keys = max_keys
+        self.max_batches = max_batches
+        self.block_seconds = block_seconds
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path
+        self._cond = threading.Condition()
+        self._pending: Batch = {}
+        self._batches: Deque[Batch] = deque()
+        self._writing = False
+        self._head_failures = 0     # failed writes of the batch at the head of the queue
+        self._stalled = False       # an add() timed out waiting; don't block again until a batch leaves
+        self.awards = 0
+        self.written = 0
+        self.failures = 0
+        self.stalls = 0
+        self.dead_lettered = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="stat-writer", daemon=True)
+        self._writer.start()
+        self._ticker = get_scheduler().call_every(flush_seconds, self.flush) if flush_seconds > 0 else None
+
+    # ---------- Producers ----------
+
+    def add(self, scope_id: int, user_id: int, format_name: str, round_number: Optional[int], points: int,
+            categories: Optional[Dict[str, int]] = None, team_id: Optional[int] = None):
+        """Buffer one award for the player and, when given, the player's team."""
+        keys = [("individual", scope_id, user_id, format_name, round_number)]
+        if team_id is not None:
+            keys.append(("team", scope_id, team_id, format_name, round_number))
+        delta = stat_delta(points, categories)
+        start = False
+        spill = None
+        with self._cond:
+            if len(self._pending) >= self.max_keys and any(k not in self._pending for k in keys):
+                if not self._stalled:
+                    start = self._wait_for_room_locked()
+                elif not self._seal_locked():
+                    # Still stalled: park the open batch on disk rather than grow it without bound
+                    spill, self._pending = self._pending, {}
+            for key in keys:
+                merge_delta(self._pending.setdefault(key, {}), delta)
+            self.awards += 1
+            if len(self._pending) >= self.max_keys:
+                start = self._seal_locked() or start
+        if spill is not None:
+            self._dead_letter(spill, "stat buffer full while the writer is stalled")
+        if start:
+            self._wake.set()
+
+    def _wait_for_room_locked(self) -> bool:
+        """Backpressure: seal the full open batch, waiting for queue space if the writer is behind."""
+        if not self._cond.wait_for(lambda: len(self._batches) < self.max_batches, self.block_seconds):
+            self.stalls += 1
+            self._stalled = True
+            return False
+        return self._seal_locked()
+
+    def _seal_locked(self) -> bool:
+        """Queue the open batch for the writer; True if it was sealed."""
+        if not self._pending or len(self._batches) >= self.max_batches:
+            return False
+        self._batches.append(self._pending)
+        self._pending = {}
+        return True
+
+    def flush(self):
+        """Hand everything buffered so far to the writer; returns without waiting for it."""
+        with self._cond:
+            self._seal_locked()
+            if not self._batches:
+                return
+        self._wake.set()
+
+    # ---------- Writer ----------
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            self._drain()
+
+    def _drain(self):
+        with self._cond:
+            if self._writing:
+                return
+            self._writing = True
+        try:
+            while True:
+                with self._cond:
+                    if not self._batches:
+                        return
+                    batch = self._batches[0]
+                try:
+                    with self.app.app_context():
+                        self.apply(batch)
+                except Exception as e:
+                    with self._cond:
+                        self.failures += 1
+                        self._head_failures += 1
+                        give_up = self._head_failures >= self.max_retries
+                        if give_up:
+                            self._pop_head_locked()
+                    if not give_up:
+                        print(f"Stat flush failed ({len(batch)} keys kept for retry): {e}")
+                        return
+                    self._dead_letter(batch, f"{self.max_retries} failed writes, last: {e}")
+                    continue
+                with self._cond:
+                    self._pop_head_locked()
+                    self.written += len(batch)
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _pop_head_locked(self):
+        self._batches.popleft()
+        self._head_failures = 0
+        self._stalled = False
+        self._cond.notify_all()
+
+    def _dead_letter(self, batch: Batch, reason: str):
+        """Log a batch that will not be written and append it to the dead-letter file."""
+        with self._cond:
+            self.dead_lettered += len(batch)
+        print(f"Stat batch dropped ({len(batch)} keys): {reason}")
+        if not self.dead_letter_path:
+            return
+        record = {"time": datetime.now().isoformat(timespec="seconds"), "reason": reason,
+                  "deltas": [[*key, delta] for key, delta in batch.items()]}
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"Writing stat dead letters to {self.dead_letter_path} failed: {e}")
+
+    def close(self, timeout: float = 10.0):
+        """Stop the ticker and write out everything buffered (used at shutdown)."""
+        if self._ticker is not None:
+            self._ticker.cancel()
+        self._closed = True
+        self._wake.set()
+        with self._cond:
+            self._cond.wait_for(lambda: not self._writing, timeout)
+            if self._pending:
+                # Past the queue bound on purpose: nothing may be left behind at exit
+                self._batches.append(self._pending)
+                self._pending = {}
+        self._drain()
+        with self._cond:
+            left, self._batches = list(self._batches), deque()
+        for batch in left:
+            self._dead_letter(batch, "not written by shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"pending_keys": len(self._pending), "queued_batches": len(self._batches),
+                    "awards": self.awards, "written_keys": self.written, "failures": self.failures,
+                    "stalls": self.stalls, "dead_lettered_keys": self.dead_lettered}
+
+
+_buffer: Optional[StatBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_stat_buffer(app=None) -> StatBuffer:
+    """Process-wide buffer; the first call binds the app whose context the writer runs in."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = StatBuffer(app or current_app._get_current_object(),
+                                 flush_seconds=Config.STAT_FLUSH_SECONDS,
+                                 max_keys=Config.STAT_BUFFER_MAX_KEYS,
+                                 max_batches=Config.STAT_BUFFER_MAX_BATCHES,
+                                 block_seconds=Config.STAT_BUFFER_BLOCK_SECONDS,
+                                 max_retries=Config.STAT_BATCH_MAX_RETRIES,
+                                 dead_letter_path=Config.STAT_DEAD_LETTER_PATH)
+            atexit.register(_buffer.close)
+        return _buffer
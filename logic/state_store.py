@@ -0,0 +1,253 @@
+"""
+Shared state and pub/sub for running several workers.
+- StateStore is the small surface the app needs across processes: string keys with TTLs
+  (room ownership leases) and fire-and-forget publish/subscribe (event forwarding and
+  Socket.IO broadcasts).
+- MemoryStore keeps everything in this process: the dev/single-worker default.
+- RedisStore talks to any Redis-compatible server (the optional `redis` package);
+  utils/fake_resp_server.py is a local stand-in for trying multi-worker setups.
+- StoreClientManager plugs a store into python-socketio, so an emit from any worker reaches
+  sockets connected to every other worker.
+
+Usage:
+    from logic.state_store import get_store
+    store = get_store()                          # from Config.STATE_STORE_URL
+    store.claim("room:ABCD1234:owner", worker_id, ttl=15)
+    store.subscribe("worker:w1", on_message)
+    store.publish("worker:w1", json.dumps(envelope))
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from socketio import PubSubManager
+
+from config import Config
+
+MessageCallback = Callable[[str], None]
+
+
+class StateStore:
+    """Backend interface; values and messages are plain strings."""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def expire(self, key: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def publish(self, channel: str, message: str):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str, callback: MessageCallback):
+        """callback(message) runs on the store's listener thread, in publish order."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    # ---------- Leases ----------
+
+    def claim(self, key: str, owner: str, ttl: float) -> bool:
+        """Take or renew a lease on key; True while owner holds it. Backends implement the
+        renewal as one compare-and-set, so a lease that expired and was taken by another
+        owner in between is never extended on their behalf."""
+        raise NotImplementedError
+
+    def release(self, key: str, owner: str):
+        """Drop the lease only if owner still holds it (one compare-and-delete)."""
+        raise NotImplementedError
+
+    def client_manager(self, channel: str = "socketio") -> Optional[PubSubManager]:
+        """Socket.IO client manager for cross-worker emits; None when one process is all there is."""
+        return StoreClientManager(self, channel)
+
+
+class MemoryStore(StateStore):
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[str, Optional[float]]] = {}   # key -> (value, expires_at)
+        self._subscribers: Dict[str, List[MessageCallback]] = {}
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= self._clock():
+            del self._values[key]
+            return None
+        return entry[0]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        with self._lock:
+            if only_if_absent and self._live(key) is not None:
+                return False
+            self._values[key] = (value, self._clock() + ttl if ttl else None)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def expire(self, key: str, ttl: float) -> bool:
+        with self._lock:
+            value = self._live(key)
+            if value is None:
+                return False
+            self._values[key] = (value, self._clock() + ttl)
+            return True
+
+    def claim(self, key: str, owner: str, ttl: float) -> bool:
+        with self._lock:
+            holder = self._live(key)
+            if holder is not None and holder != owner:
+                return False
+            self._values[key] = (owner, self._clock() + ttl)
+            return True
+
+    def release(self, key: str, owner: str):
+        with self._lock:
+            if self._live(key) == owner:
+                del self._values[key]
+
+    def publish(self, channel: str, message: str):
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, channel: str, callback: MessageCallback):
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def client_manager(self, channel: str = "socketio") -> Optional[PubSubManager]:
+        return None
+
+
+class RedisStore(StateStore):
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STATE_STORE_URL points at a Redis server but the 'redis' package is not installed.")
+        self.url = url
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._lock = threading.Lock()
+        self._pubsub = None
+        self._listener = None
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, only_if_absent: bool = False) -> bool:
+        px = int(ttl * 1000) if ttl else None
+        return bool(self._client.set(key, value, px=px, nx=only_if_absent))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+    def expire(self, key: str, ttl: float) -> bool:
+        return bool(self._client.pexpire(key, int(ttl * 1000)))
+
+    def claim(self, key: str, owner: str, ttl: float) -> bool:
+        px = int(ttl * 1000)
+        if self._client.set(key, owner, px=px, nx=True):
+            return True
+        # Renew with WATCH/MULTI: EXEC fails if the lease changed hands after the GET
+        return bool(self._compare_and(key, owner, lambda pipe: pipe.pexpire(key, px)))
+
+    def release(self, key: str, owner: str):
+        self._compare_and(key, owner, lambda pipe: pipe.delete(key))
+
+    def _compare_and(self, key: str, owner: str, command) -> bool:
+        """Run command(pipe) in a transaction only while key still holds owner."""
+        from redis.exceptions import WatchError
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.get(key) != owner:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                command(pipe)
+                return bool(pipe.execute()[0])
+            except WatchError:
+                return False
+
+    def publish(self, channel: str, message: str):
+        self._client.publish(channel, message)
+
+    def subscribe(self, channel: str, callback: MessageCallback):
+        with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{channel: lambda message: callback(message["data"])})
+            if self._listener is None:
+                # One listener thread per process delivers every subscribed channel in order
+                self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def close(self):
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener.join(timeout=2)
+                self._listener = None
+            if self._pubsub is not None:
+                self._pubsub.close()
+                self._pubsub = None
+        self._client.close()
+
+
+class StoreClientManager(PubSubManager):
+    """python-socketio pub/sub manager carried over a StateStore channel."""
+    name = "state-store"
+
+    def __init__(self, store: StateStore, channel: str = "socketio", write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.store = store
+        self._inbox: "queue.Queue[str]" = queue.Queue()
+        if not write_only:
+            store.subscribe(channel, self._inbox.put)
+
+    def _publish(self, data):
+        self.store.publish(self.channel, json.dumps(data))
+
+    def _listen(self):
+        while True:
+            yield self._inbox.get()
+
+
+def open_store(url: str) -> StateStore:
+    """memory:// for a single process; redis://host:port/db (or rediss://) for shared state."""
+    scheme = url.split("://", 1)[0].lower()
+    if scheme == "memory":
+        return MemoryStore()
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported STATE_STORE_URL scheme: {scheme}")
+
+
+_store: Optional[StateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> StateStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = open_store(Config.STATE_STORE_URL)
+        return _store
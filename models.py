@@ -55,12 +55,16 @@ class Match(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class StatScope(db.Model):
+    __tablename__ = "statscope"  # the name the stat tables' foreign keys use
     id = db.Column(db.Integer, primary_key=True)
-    scope_type = db.Column(db.String(20), nullable=False)  # single_round / tournament / hall_of_fame
+    scope_type = db.Column(db.String(20), nullable=False, index=True)  # single_round / tournament / hall_of_fame
     room_id = db.Column(db.Integer, db.ForeignKey("room.id"), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class TeamStat(db.Model):
+    # One row per (scope, format, team, round): concurrent writers add to it instead of duplicating it.
+    # Its index also serves the stat writer's and the aggregate rebuild's lookups by (scope, format, team)
+    __table_args__ = (db.UniqueConstraint("scope_id", "format", "team_id", "round_number", name="uq_team_stat"),)
     id = db.Column(db.Integer, primary_key=True)
     scope_id = db.Column(db.Integer, db.ForeignKey("statscope.id"), nullable=False)
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
@@ -92,6 +96,7 @@ class TeamStat(db.Model):
     miscellaneous = db.Column(db.Integer, default=0)
 
 class IndividualStat(db.Model):
+    __table_args__ = (db.UniqueConstraint("scope_id", "format", "user_id", "round_number", name="uq_individual_stat"),)
     id = db.Column(db.Integer, primary_key=True)
     scope_id = db.Column(db.Integer, db.ForeignKey("statscope.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
@@ -120,4 +125,37 @@ class IndividualStat(db.Model):
     business = db.Column(db.Integer, default=0)
     language = db.Column(db.Integer, default=0)
     television = db.Column(db.Integer, default=0)
-    miscellaneous = db.Column(db.Integer, default=0)
\ No newline at end of file
+    miscellaneous = db.Column(db.Integer, default=0)
+
+
+# Running leaderboard totals per (scope_type, format, owner), kept in step with the stat rows by
+# stats_manager.apply_stat_deltas; format "ALL" spans every format. Rebuild from the raw stats
+# with python -m utils.rebuild_aggregates.
+class TeamAggregate(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("scope_type", "format", "team_id", name="uq_team_aggregate"),
+        # Leaderboard order (total, team_id) within a board: keyset pages are index range scans
+        db.Index("ix_team_aggregate_rank", "scope_type", "format", "total", "team_id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    scope_type = db.Column(db.String(20), nullable=False)
+    format = db.Column(db.String(50), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
+    total = db.Column(db.Integer, default=0, nullable=False)      # SUM(tournament_total)
+    ppg_sum = db.Column(db.Float, default=0.0, nullable=False)    # AVG(ppg) = ppg_sum / stat_rows
+    ppc_sum = db.Column(db.Float, default=0.0, nullable=False)
+    stat_rows = db.Column(db.Integer, default=0, nullable=False)
+
+class IndividualAggregate(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("scope_type", "format", "user_id", name="uq_individual_aggregate"),
+        db.Index("ix_individual_aggregate_rank", "scope_type", "format", "total", "user_id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    scope_type = db.Column(db.String(20), nullable=False)
+    format = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    total = db.Column(db.Integer, default=0, nullable=False)
+    ppg_sum = db.Column(db.Float, default=0.0, nullable=False)
+    ppc_sum = db.Column(db.Float, default=0.0, nullable=False)
+    stat_rows = db.Column(db.Integer, default=0, nullable=False)
@@ -28,10 +28,3 @@ def load_packets(format_type):
                 print(f"Error loading {filename}: {e}")
 
     return packets
-    elif ext == ".csv":
-        return load_csv_packet(path)
-    elif ext == ".docx":
-        return load_docx_packet(path)
-    elif ext == ".pdf":
-        return load_pdf_packet(path)
-    return []
@@ -3,6 +3,7 @@
 
 from packet_loader import load_packets
 from stats_manager import StatsManager
+from logic.question_model import questions_from_packet, Tossup, Bonus, SixtySecond
 
 def play_game(format_type):
     stats = StatsManager()
@@ -15,40 +16,39 @@ def play_game(format_type):
 
     # Iterate through packets/questions
     for packet in packets:
-        for q in packet["questions"]:
-            if q["type"] == "tossup":
+        for q in questions_from_packet(packet, format_type):
+            if isinstance(q, Tossup):
                 print("\nTOSSUP:")
-                print(f"Hard: {q['difficulty']['hard']}")
-                print(f"Medium: {q['difficulty']['medium']}")
-                print(f"Easy: {q['difficulty']['easy']}")
+                for level, clue in zip(("Hard", "Medium", "Easy"), q.clues):
+                    print(f"{level}: {clue}")
 
                 # Simulate buzz + answer
                 stats.buzz_in("Player1")
                 given_answer = input("Your answer: ")
-                correct_answer = q["answer"]
+                correct_answer = q.answer
 
                 if stats.check_answer("Player1", given_answer, correct_answer):
                     print("✅ Correct! +1 point")
                 else:
                     print(f"❌ Incorrect. Correct answer was: {correct_answer}")
 
-            elif q["type"] == "bonus":
+            elif isinstance(q, Bonus):
                 print("\nBONUS:")
-                for part in q["parts"]:
-                    print(f"Q: {part['text']}")
+                for part in q.parts:
+                    print(f"Q: {part.text}")
                     given_answer = input("Your answer: ")
-                    correct_answer = part["answer"]
+                    correct_answer = part.answer
 
                     if stats.check_answer("Player1", given_answer, correct_answer):
                         print("✅ Correct! +1 point")
                     else:
                         print(f"❌ Incorrect. Correct answer was: {correct_answer}")
 
-            elif q["type"] == "sixty_second":
-                print("\n60-SECOND ROUND:")
-                print(f"Q: {q['text']}")
+            elif isinstance(q, SixtySecond):
+                print("\n60-SECOND ROUND:" if q.kind == "sixty_second" else "\nTRIVIA:")
+                print(f"Q: {q.text}")
                 given_answer = input("Your answer: ")
-                correct_answer = q["answer"]
+                correct_answer = q.answer
 
                 if stats.check_answer("Player1", given_answer, correct_answer):
                     print("✅ Correct! +1 point")
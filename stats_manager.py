@@ -1,5 +1,38 @@
 # stats_manager.py
-# Handles player scores and automatic scoring logic for Quizbowl Challenge
+# Handles player scores and automatic scoring logic for Quizbowl Challenge,
+# plus the persistent TeamStat / IndividualStat writes behind the leaderboards.
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import db
+from sqlalchemy import func, literal, select
+from sqlalchemy.exc import IntegrityError
+
+from models import StatScope, TeamStat, IndividualStat, TeamAggregate, IndividualAggregate
+from logic.answer_matcher import matcher_for_answer, CORRECT
+
+# Per-category point columns shared by TeamStat and IndividualStat
+CATEGORY_COLUMNS = (
+    "general_knowledge", "history", "geography", "science", "pop_culture", "sports", "movies",
+    "music", "literature", "food_and_drink", "current_events", "technology", "art", "politics",
+    "nature", "mythology", "business", "language", "television", "miscellaneous",
+)
+
+# (kind, scope_id, team_id or user_id, format, round_number); kind is "team" or "individual"
+StatKey = Tuple[str, int, int, str, Optional[int]]
+
+# Stat table, its aggregate table and the owner column they share, per kind
+STAT_TABLES = {
+    "team": (TeamStat, TeamAggregate, "team_id"),
+    "individual": (IndividualStat, IndividualAggregate, "user_id"),
+}
+ALL_FORMATS = "ALL"
+
+# Bumped after every committed stat write; readers that cache derived views compare against it
+_generation = 0
+_generation_lock = threading.Lock()
+_listeners: List[Callable[[int], None]] = []
 
 class Player:
     def __init__(self, name):
@@ -38,7 +71,7 @@ class StatsManager:
 
     def check_answer(self, name, given_answer, correct_answer):
         """
-        Compare player's answer to correct answer.
+        Judge player's answer against the answer line (accept alternates, small typos).
         Award +1 point for correct, no penalty for incorrect.
         """
         if name not in self.players:
@@ -47,7 +80,9 @@ class StatsManager:
         player = self.players[name]
         player.reset_buzz()
 
-        if given_answer.strip().lower() == correct_answer.strip().lower():
+        if not (given_answer or "").strip():
+            return False  # an empty answer is never correct, whatever the answer line
+        if matcher_for_answer(correct_answer).judge(given_answer) == CORRECT:
             player.score += 1
             return True
         else:
@@ -62,3 +97,178 @@ class StatsManager:
     def get_all_scores(self):
         """Return dictionary of all player scores."""
         return {name: player.score for name, player in self.players.items()}
+
+
+# ---------- Persistent stats ----------
+
+def stats_generation() -> int:
+    return _generation
+
+
+def on_stats_changed(callback: Callable[[int], None]):
+    """callback(generation) runs after every committed stat write, on the writing thread."""
+    _listeners.append(callback)
+
+
+def _stats_changed():
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        generation = _generation
+    for callback in list(_listeners):
+        try:
+            callback(generation)
+        except Exception as e:
+            print(f"Stats change listener failed: {e}")
+
+
+def category_column(name: str) -> str:
+    """Stat column for a category label ("Pop Culture" -> pop_culture); unknown labels count as miscellaneous."""
+    column = "_".join(str(name).lower().replace("&", " and ").split())
+    return column if column in CATEGORY_COLUMNS else "miscellaneous"
+
+
+def stat_delta(points: int, categories: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Column increments for one award: round/tournament totals plus per-category points."""
+    delta = {"points": points}
+    for name, value in (categories or {}).items():
+        column = category_column(name)
+        delta[column] = delta.get(column, 0) + value
+    return delta
+
+
+def merge_delta(into: Dict[str, int], delta: Dict[str, int]):
+    for column, value in delta.items():
+        into[column] = into.get(column, 0) + value
+
+
+def _increment(model, key: Dict[str, Any], increments: Dict[str, int], defaults: Dict[str, Any]) -> bool:
+    """
+    Add increments to the row at key with UPDATE ... SET col = col + :delta, so concurrent
+    writers on other workers never overwrite each other's totals; insert the row when absent.
+    True when this call inserted it. An insert that loses the race for the table's unique key
+    rolls back to a savepoint and adds to the winner's row instead.
+    """
+    where = [getattr(model, c).is_(None) if v is None else getattr(model, c) == v for c, v in key.items()]
+    values = {getattr(model, c): func.coalesce(getattr(model, c), 0) + v for c, v in increments.items()}
+
+    def update() -> bool:
+        return bool(db.session.query(model).filter(*where).update(values, synchronize_session=False))
+
+    if update():
+        return False
+    row = {**defaults, **key}
+    for column, value in increments.items():
+        row[column] = row.get(column, 0) + value
+    try:
+        with db.session.begin_nested():
+            db.session.execute(model.__table__.insert().values(**row))
+        return True
+    except IntegrityError:
+        if update():
+            return False
+        raise  # not a lost race (bad scope or owner id)
+
+
+def _stat_order(key: StatKey):
+    # A fixed row order across writers, so concurrent batches lock rows without deadlocking
+    return key[0], key[1], key[2], key[3], -1 if key[4] is None else key[4]
+
+
+def _apply_kind(model, owner_column, deltas: Dict[StatKey, Dict[str, int]]) -> List[Tuple[int, int, str, int, int]]:
+    """Upsert one stat table; returns (scope_id, owner_id, format, points, new rows) per key."""
+    defaults = {"tournament_total": 0, "round_total": 0, "ppg": 0.0, "ppc": 0.0,
+                **{column: 0 for column in CATEGORY_COLUMNS}}
+    changes = []
+    for key in sorted(deltas, key=_stat_order):
+        _, scope_id, owner_id, format_name, round_number = key
+        delta = deltas[key]
+        points = delta.get("points", 0)
+        increments = {"tournament_total": points, "round_total": points}
+        for column, value in delta.items():
+            if column != "points":
+                increments[column] = increments.get(column, 0) + value
+        created = _increment(model, {"scope_id": scope_id, owner_column: owner_id, "format": format_name,
+                                     "round_number": round_number}, increments, defaults)
+        changes.append((scope_id, owner_id, format_name, points, int(created)))
+    return changes
+
+
+def _apply_aggregates(model, owner_column, changes, scope_types: Dict[int, str]):
+    """Fold stat row changes into the (scope_type, format, owner) and (scope_type, ALL, owner) totals."""
+    totals: Dict[Tuple[str, str, int], List[int]] = {}
+    for scope_id, owner_id, format_name, points, created in changes:
+        scope_type = scope_types.get(scope_id)
+        if scope_type is None:
+            continue
+        for fmt in (format_name, ALL_FORMATS):
+            entry = totals.setdefault((scope_type, fmt, owner_id), [0, 0])
+            entry[0] += points
+            entry[1] += created
+    # Same atomic increments as the stat rows; the aggregates' unique key settles insert races
+    defaults = {"total": 0, "ppg_sum": 0.0, "ppc_sum": 0.0, "stat_rows": 0}
+    for scope_type, fmt, owner_id in sorted(totals):
+        points, created = totals[(scope_type, fmt, owner_id)]
+        # New stat rows start at ppg = ppc = 0, so only the row count moves the averages
+        _increment(model, {"scope_type": scope_type, "format": fmt, owner_column: owner_id},
+                   {"total": points, "stat_rows": created}, defaults)
+
+
+def apply_stat_deltas(deltas: Dict[StatKey, Dict[str, int]]):
+    """
+    Add a batch of point deltas to TeamStat / IndividualStat as one upsert transaction:
+    an atomic in-database increment per key (insert for new keys), and the matching
+    TeamAggregate / IndividualAggregate updates, all under a single commit.
+    """
+    if not deltas:
+        return
+    try:
+        scope_ids = {key[1] for key in deltas}
+        scope_types = dict(db.session.query(StatScope.id, StatScope.scope_type).filter(StatScope.id.in_(scope_ids)).all())
+        for kind, (model, aggregate, owner_column) in STAT_TABLES.items():
+            changes = _apply_kind(model, owner_column, {k: d for k, d in deltas.items() if k[0] == kind})
+            _apply_aggregates(aggregate, owner_column, changes, scope_types)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    _stats_changed()
+
+
+def rebuild_aggregates() -> Dict[str, int]:
+    """Regenerate both aggregate tables from the raw stat rows (INSERT ... SELECT, one transaction)."""
+    counts = {}
+    try:
+        for kind, (model, aggregate, owner_column) in STAT_TABLES.items():
+            db.session.query(aggregate).delete(synchronize_session=False)
+            owner = getattr(model, owner_column)
+            columns = ["scope_type", "format", owner_column, "total", "ppg_sum", "ppc_sum", "stat_rows"]
+            sums = (func.coalesce(func.sum(model.tournament_total), 0), func.coalesce(func.sum(model.ppg), 0.0),
+                    func.coalesce(func.sum(model.ppc), 0.0), func.count(model.id))
+            per_format = (select(StatScope.scope_type, model.format, owner, *sums)
+                          .join(StatScope, StatScope.id == model.scope_id)
+                          .group_by(StatScope.scope_type, model.format, owner))
+            all_formats = (select(StatScope.scope_type, literal(ALL_FORMATS), owner, *sums)
+                           .join(StatScope, StatScope.id == model.scope_id)
+                           .group_by(StatScope.scope_type, owner))
+            for query in (per_format, all_formats):
+                db.session.execute(aggregate.__table__.insert().from_select(columns, query))
+            counts[kind] = db.session.query(func.count(aggregate.id)).scalar()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    _stats_changed()
+    return counts
+
+
+def record_individual_points(scope_id: int, user_id: int, format_name: str, round_number: Optional[int],
+                             points: int, categories: Optional[Dict[str, int]] = None):
+    """Write one player's award immediately (gameplay goes through logic/stat_buffer.py instead)."""
+    apply_stat_deltas({("individual", scope_id, user_id, format_name, round_number): stat_delta(points, categories)})
+
+
+def record_team_points(scope_id: int, team_id: int, format_name: str, round_number: Optional[int],
+                       points: int, categories: Optional[Dict[str, int]] = None):
+    """Write one team's award immediately (gameplay goes through logic/stat_buffer.py instead)."""
+    apply_stat_deltas({("team", scope_id, team_id, format_name, round_number): stat_delta(points, categories)})
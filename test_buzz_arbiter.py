@@ -0,0 +1,87 @@
+from logic.buzz_arbiter import BuzzArbiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_arbiter(**kwargs):
+    clock = FakeClock()
+    return BuzzArbiter(clock=clock, **kwargs), clock
+
+
+def test_first_buzz_opens_window_and_later_ones_queue():
+    arbiter, _ = make_arbiter(window=0.15)
+    assert arbiter.buzz("alice", "s1") == {"status": "opened", "closes_in": 0.15, "window": 1}
+    assert arbiter.buzz("bob", "s2") == {"status": "queued"}
+    assert arbiter.buzz("alice", "s1") == {"status": "queued"}
+    assert arbiter.resolve(1)["winner"] == "alice"
+
+
+def test_rtt_compensation_can_overtake_earlier_arrival():
+    arbiter, clock = make_arbiter(window=0.15)
+    arbiter.record_rtt("fast", 0.010)
+    arbiter.record_rtt("slow", 0.200)
+    arbiter.buzz("alice", "fast")
+    clock.now += 0.05
+    # Arrived 50ms later but spent 100ms in transit: pressed first
+    arbiter.buzz("bob", "slow")
+    decision = arbiter.resolve(1)
+    assert decision["winner"] == "bob"
+    assert [c["player"] for c in decision["candidates"]] == ["alice", "bob"]
+
+
+def test_compensation_is_capped_at_the_window():
+    arbiter, clock = make_arbiter(window=0.1)
+    arbiter.record_rtt("laggy", 10.0)
+    arbiter.buzz("alice", "s1")
+    clock.now += 0.12
+    arbiter.buzz("bob", "laggy")
+    # 5s one-way would put bob far ahead; capped at 0.1 he still lands after alice
+    assert arbiter.resolve(1)["winner"] == "alice"
+
+
+def test_ties_go_to_first_arrival():
+    arbiter, _ = make_arbiter()
+    arbiter.buzz("alice", "s1")
+    arbiter.buzz("bob", "s2")
+    assert arbiter.resolve()["winner"] == "alice"
+
+
+def test_lockout_after_resolve_until_clear():
+    arbiter, clock = make_arbiter(lockout=5)
+    arbiter.buzz("alice", "s1")
+    arbiter.resolve(1)
+    clock.now += 1
+    outcome = arbiter.buzz("bob", "s2")
+    assert outcome["status"] == "locked"
+    assert outcome["remaining"] == 4
+    arbiter.clear()
+    assert arbiter.buzz("bob", "s2")["status"] == "opened"
+
+
+def test_windows_are_numbered_and_stale_resolve_is_ignored():
+    arbiter, _ = make_arbiter()
+    assert arbiter.buzz("alice", "s1")["window"] == 1
+    arbiter.clear()  # question changed before the window closed
+    assert arbiter.buzz("bob", "s2")["window"] == 2
+    # The timer left over from window 1 must not close window 2
+    assert arbiter.resolve(1) is None
+    assert arbiter.holder() is None
+    assert arbiter.resolve(2)["winner"] == "bob"
+    assert arbiter.resolve(2) is None
+
+
+def test_decisions_are_audited_in_order():
+    arbiter, _ = make_arbiter(audit_size=2)
+    for player in ("alice", "bob", "carol"):
+        arbiter.buzz(player, player)
+        arbiter.resolve()
+        arbiter.clear()
+    log = arbiter.audit_log()
+    assert [d["decision"] for d in log] == [2, 3]
+    assert [d["winner"] for d in log] == ["bob", "carol"]
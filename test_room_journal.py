@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from logic.room_journal import RoomJournal, encode_record, read_records
+
+
+def write_journal(directory, code, events):
+    journal = RoomJournal(str(directory), code)
+    for kind, payload in events:
+        journal.append(kind, payload)
+    journal.close()
+    return journal.path
+
+
+EVENTS = [
+    ("join", {"username": "alice", "token": "t1", "moderator": True}),
+    ("join", {"username": "bob", "token": "t2"}),
+    ("answer", {"username": "bob", "correct": True, "points": 10}),
+]
+
+
+def test_reopen_replays_every_record(tmp_path):
+    write_journal(tmp_path, "ROOM1", EVENTS)
+    journal = RoomJournal(str(tmp_path), "ROOM1")
+    assert journal.recovered
+    assert journal.image["moderator"] == "alice"
+    assert set(journal.image["players"]) == {"alice", "bob"}
+    assert journal.image["stats"]["bob"]["points"] == 10
+    journal.close()
+
+
+def test_truncated_last_record_is_dropped_and_appends_continue(tmp_path):
+    path = write_journal(tmp_path, "ROOM1", EVENTS)
+    good_size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        # Crash mid-write: only part of the next record reached the disk
+        f.write(encode_record("answer", {"username": "alice", "correct": True, "points": 10})[:-3])
+
+    journal = RoomJournal(str(tmp_path), "ROOM1")
+    assert os.path.getsize(path) == good_size  # torn tail cut off
+    assert "alice" not in journal.image["scores"]
+    assert journal.image["stats"]["alice"]["points"] == 0
+    assert journal.image["stats"]["bob"]["points"] == 10
+    journal.append("answer", {"username": "alice", "correct": False, "points": -5})
+    journal.close()
+
+    kinds = [kind for _, _, kind, _ in read_records(path)]
+    assert kinds == ["join", "join", "answer", "answer"]
+    assert RoomJournal(str(tmp_path), "ROOM1").image["stats"]["alice"]["points"] == -5
+
+
+def test_corrupt_record_stops_replay(tmp_path):
+    path = write_journal(tmp_path, "ROOM1", EVENTS)
+    first = len(encode_record(*EVENTS[0], ts=0))
+    with open(path, "r+b") as f:
+        f.seek(first + 20)  # inside the second record's payload
+        byte = f.read(1)
+        f.seek(first + 20)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    journal = RoomJournal(str(tmp_path), "ROOM1")
+    assert list(journal.image["players"]) == ["alice"]
+    assert os.path.getsize(path) == first
+    journal.close()
+
+
+def test_snapshot_plus_tail_recovers_the_same_image(tmp_path):
+    journal = RoomJournal(str(tmp_path), "ROOM1", snapshot_every=2)
+    for kind, payload in EVENTS[:2]:
+        journal.append(kind, payload)
+    journal.sync()  # writes the snapshot covering the two joins
+    journal.append(*EVENTS[2])
+    journal.close()
+    assert os.path.isfile(journal.snapshot_path)
+
+    recovered = RoomJournal(str(tmp_path), "ROOM1")
+    assert recovered.image["stats"]["bob"]["points"] == 10
+    assert set(recovered.image["players"]) == {"alice", "bob"}
+    recovered.close()
+
+
+def test_code_outside_the_directory_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        RoomJournal(str(tmp_path), "../escape")
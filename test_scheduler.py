@@ -0,0 +1,95 @@
+import time
+import threading
+
+import pytest
+
+from logic.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    s = Scheduler(workers=2, name="test-scheduler")
+    yield s
+    s.shutdown()
+
+
+def test_call_later_runs_once_with_args(scheduler):
+    done = threading.Event()
+    seen = []
+    handle = scheduler.call_later(0.01, lambda a, b: (seen.append((a, b)), done.set()), 1, 2)
+    assert done.wait(1)
+    assert seen == [(1, 2)]
+    assert handle.runs == 1
+    assert not handle.active
+
+
+def test_cancel_before_deadline_never_runs(scheduler):
+    fired = threading.Event()
+    handle = scheduler.call_later(0.05, fired.set)
+    assert handle.cancel()
+    assert not handle.active
+    assert not handle.cancel()
+    assert not fired.wait(0.15)
+    assert handle.runs == 0
+
+
+def test_reschedule_moves_the_deadline(scheduler):
+    fired = threading.Event()
+    handle = scheduler.call_later(0.02, fired.set)
+    assert handle.reschedule(0.2)
+    assert not fired.wait(0.1)  # the original deadline passed without firing
+    assert fired.wait(1)
+    assert handle.runs == 1
+
+
+def test_reschedule_can_bring_a_timer_forward(scheduler):
+    fired = threading.Event()
+    started = time.monotonic()
+    handle = scheduler.call_later(5, fired.set)
+    handle.reschedule(0.01)
+    assert fired.wait(1)
+    assert time.monotonic() - started < 1
+
+
+def test_reschedule_after_run_or_cancel_is_refused(scheduler):
+    done = threading.Event()
+    handle = scheduler.call_later(0, done.set)
+    assert done.wait(1)
+    assert not handle.reschedule(0.1)
+    cancelled = scheduler.call_later(1, done.set)
+    cancelled.cancel()
+    assert not cancelled.reschedule(0.1)
+
+
+def test_call_every_stops_after_count(scheduler):
+    done = threading.Event()
+    ticks = []
+
+    def tick():
+        ticks.append(1)
+        if len(ticks) == 3:
+            done.set()
+
+    handle = scheduler.call_every(0.01, tick, count=3, first=0)
+    assert done.wait(1)
+    time.sleep(0.05)
+    assert len(ticks) == 3
+    assert handle.runs == 3
+    assert not handle.active
+
+
+def test_cancelling_a_repeating_timer_stops_further_ticks(scheduler):
+    ticked = threading.Event()
+    ticks = []
+    handle = scheduler.call_every(0.01, lambda: (ticks.append(1), ticked.set()))
+    assert ticked.wait(1)
+    handle.cancel()
+    time.sleep(0.03)  # a tick already handed to a worker may still land
+    count = len(ticks)
+    time.sleep(0.05)
+    assert len(ticks) == count
+
+
+def test_call_every_rejects_non_positive_interval(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.call_every(0, lambda: None)
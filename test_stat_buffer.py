@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+from flask import Flask
+
+from logic.stat_buffer import StatBuffer
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def app():
+    return Flask("test_stat_buffer")
+
+
+def test_batches_are_written_by_the_writer_thread(app):
+    written = []
+    buffer = StatBuffer(app, apply=written.append, flush_seconds=0)
+    buffer.add(1, 10, "NAQT", 1, 15, {"History": 15}, team_id=7)
+    buffer.add(1, 10, "NAQT", 1, 10, {"History": 10}, team_id=7)
+    buffer.flush()
+    assert wait_until(lambda: buffer.stats()["written_keys"] == 2)
+    assert len(written) == 1
+    assert set(written[0]) == {("individual", 1, 10, "NAQT", 1), ("team", 1, 7, "NAQT", 1)}
+    buffer.close()
+
+
+def test_failing_batch_is_retried_then_dead_lettered(app, tmp_path):
+    dead_letters = tmp_path / "dead.jsonl"
+    attempts = []
+
+    def apply(batch):
+        attempts.append(batch)
+        raise RuntimeError("foreign key violation")
+
+    buffer = StatBuffer(app, apply=apply, flush_seconds=0, max_retries=3, dead_letter_path=str(dead_letters))
+    buffer.add(1, 10, "NAQT", 1, 15, {"History": 15})
+    for n in range(1, 4):
+        buffer.flush()
+        assert wait_until(lambda: buffer.stats()["failures"] == n)
+
+    assert wait_until(lambda: buffer.stats()["dead_lettered_keys"] == 1)
+    stats = buffer.stats()
+    assert stats["queued_batches"] == 0
+    assert stats["written_keys"] == 0
+    assert len(attempts) == 3
+
+    records = [json.loads(line) for line in dead_letters.read_text().splitlines()]
+    assert len(records) == 1
+    assert "3 failed writes" in records[0]["reason"]
+    kind, scope, owner, fmt, round_number, delta = records[0]["deltas"][0]
+    assert (kind, scope, owner, fmt, round_number) == ("individual", 1, 10, "NAQT", 1)
+    assert delta["points"] == 15
+    buffer.close()
+
+
+def test_dead_lettered_batch_does_not_block_the_next(app, tmp_path):
+    written = []
+
+    def apply(batch):
+        if ("individual", 1, 99, "NAQT", 1) in batch:
+            raise RuntimeError("bad row")
+        written.append(batch)
+
+    buffer = StatBuffer(app, apply=apply, flush_seconds=0, max_retries=1,
+                        dead_letter_path=str(tmp_path / "dead.jsonl"))
+    buffer.add(1, 99, "NAQT", 1, 10)
+    buffer.flush()
+    assert wait_until(lambda: buffer.stats()["dead_lettered_keys"] == 1)
+    buffer.add(1, 10, "NAQT", 1, 10)
+    buffer.flush()
+    assert wait_until(lambda: buffer.stats()["written_keys"] == 1)
+    assert list(written[0]) == [("individual", 1, 10, "NAQT", 1)]
+    buffer.close()
+
+
+def test_close_dead_letters_what_it_cannot_write(app, tmp_path):
+    dead_letters = tmp_path / "dead.jsonl"
+
+    def apply(batch):
+        raise RuntimeError("database down")
+
+    buffer = StatBuffer(app, apply=apply, flush_seconds=0, max_retries=10, dead_letter_path=str(dead_letters))
+    buffer.add(1, 10, "NAQT", 1, 10)
+    buffer.close(timeout=1)
+    records = [json.loads(line) for line in dead_letters.read_text().splitlines()]
+    assert [r["reason"] for r in records] == ["not written by shutdown"]
@@ -0,0 +1,42 @@
+"""
+Admin routes for Quizbowl Challenge
+- Packet catalog: per-format counts, failing validations and an on-demand incremental reindex.
+- Buzz audit: recent arbitration decisions for a room (candidates, RTTs, compensated times).
+- Requests must carry the X-Admin-Token header matching Config.ADMIN_TOKEN.
+"""
+
+import hmac
+from flask import Blueprint, current_app, jsonify, request
+from config import Config
+
+admin_bp = Blueprint("admin_bp", __name__)
+
+def _authorized() -> bool:
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(Config.ADMIN_TOKEN) and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+@admin_bp.route("/admin/packets")
+def packet_catalog_status():
+    if not _authorized():
+        return jsonify({"ok": False, "error": "forbidden"}), 403
+    catalog = current_app.extensions["packet_catalog"]
+    return jsonify({"ok": True, "counts": catalog.counts(), "last_scan": catalog.last_scan,
+                    "failing": catalog.validation_report()})
+
+@admin_bp.route("/admin/packets/reindex", methods=["POST"])
+def packet_catalog_reindex():
+    if not _authorized():
+        return jsonify({"ok": False, "error": "forbidden"}), 403
+    catalog = current_app.extensions["packet_catalog"]
+    summary = catalog.rescan()
+    return jsonify({"ok": True, "scan": summary, "counts": catalog.counts()})
+
+@admin_bp.route("/admin/rooms/<code>/buzz-audit")
+def room_buzz_audit(code):
+    if not _authorized():
+        return jsonify({"ok": False, "error": "forbidden"}), 403
+    state = current_app.extensions["room_registry"].get(code.upper())
+    if state is None:
+        return jsonify({"ok": False, "error": "unknown room"}), 404
+    limit = request.args.get("limit", type=int)
+    return jsonify({"ok": True, "room": state.code, "decisions": state.arbiter.audit_log(limit)})
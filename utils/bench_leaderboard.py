@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from typing import Callable, Dict, List
+
+from sqlalchemy import func
+
+from db import db, standalone_app
+from models import User, Team, StatScope, TeamStat, IndividualStat
+from stats_manager import rebuild_aggregates
+
+# Seed a throwaway database with a large stat history and time the leaderboard API on it:
+# top-N, a deep keyset page, rank-around-me, and the old full GROUP BY for comparison.
+# Run from the repo root (default: 1M IndividualStat rows plus 1/4 as many TeamStat rows in a
+# temporary SQLite file; pass --database-url for an empty Postgres database instead):
+#   python -m utils.bench_leaderboard
+#   python -m utils.bench_leaderboard --rows 200000 --repeat 50
+
+FORMATS = ["NAQT", "OSSAA", "FROSHMORE", "TRIVIA"]
+SCOPE_TYPES = ["single_round", "tournament", "hall_of_fame"]
+
+
+def _insert(model, rows: List[Dict], batch: int = 20000):
+    for start in range(0, len(rows), batch):
+        db.session.execute(model.__table__.insert(), rows[start:start + batch])
+
+
+def seed(rows: int, users: int, teams: int, scopes: int, seed_value: int = 7):
+    rng = random.Random(seed_value)
+    _insert(User, [{"email": f"bench{i}@bench.local", "password_hash": "!", "display_name": f"Player {i}",
+                    "is_bot": False, "language": "en"} for i in range(1, users + 1)])
+    _insert(Team, [{"name": f"Team {i}"} for i in range(1, teams + 1)])
+    _insert(StatScope, [{"scope_type": SCOPE_TYPES[i % len(SCOPE_TYPES)]} for i in range(1, scopes + 1)])
+    db.session.commit()
+
+    def stat_rows(count: int, owner_column: str, owners: int):
+        seen = set()  # one row per (scope, owner, format, round), as the unique key requires
+        while len(seen) < count:
+            key = (rng.randint(1, scopes), rng.randint(1, owners), rng.choice(FORMATS), rng.randint(1, 12))
+            if key in seen:
+                continue
+            seen.add(key)
+            points = rng.randint(-20, 120)
+            yield {"scope_id": key[0], owner_column: key[1], "format": key[2], "round_number": key[3],
+                   "tournament_total": points, "round_total": points,
+                   "ppg": round(rng.uniform(0, 60), 2), "ppc": round(rng.uniform(0, 20), 2)}
+
+    for model, owner_column, owners, count in ((IndividualStat, "user_id", users, rows),
+                                               (TeamStat, "team_id", teams, rows // 4)):
+        chunk: List[Dict] = []
+        for row in stat_rows(count, owner_column, owners):
+            chunk.append(row)
+            if len(chunk) == 50000:
+                _insert(model, chunk)
+                chunk = []
+        _insert(model, chunk)
+        db.session.commit()
+
+
+def timed(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"median_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)], 2)}
+
+
+def group_by_baseline(scope_type: str, format_name: str):
+    """The pre-aggregate query shape: SUM/AVG GROUP BY over every matching raw row."""
+    return (db.session.query(User.id, func.sum(IndividualStat.tournament_total), func.avg(IndividualStat.ppg))
+            .join(IndividualStat, User.id == IndividualStat.user_id)
+            .join(StatScope, StatScope.id == IndividualStat.scope_id)
+            .filter(StatScope.scope_type == scope_type, IndividualStat.format == format_name)
+            .group_by(User.id).order_by(func.sum(IndividualStat.tournament_total).desc()).all())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the leaderboard API on a seeded stats database.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="IndividualStat rows to seed")
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--teams", type=int, default=5_000)
+    parser.add_argument("--scopes", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--database-url", help="empty database to seed (default: a temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmp_path = None
+    url = args.database_url
+    if not url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db", prefix="bench_leaderboard_")
+        os.close(fd)
+        url = f"sqlite:///{tmp_path}"
+
+    from ui.leaderboard_routes import leaderboard_bp
+    app = standalone_app(url)
+    app.register_blueprint(leaderboard_bp)
+    try:
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            seed(args.rows, args.users, args.teams, args.scopes)
+            print(f"Seeded {args.rows} individual + {args.rows // 4} team stat rows "
+                  f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            start = time.perf_counter()
+            counts = rebuild_aggregates()
+            print(f"Rebuilt aggregates ({counts['individual']} individual, {counts['team']} team rows) "
+                  f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+            client = app.test_client()
+            base = "/api/leaderboard/individual?scope=tournament&format=NAQT"
+            deep = client.get(f"{base}&limit=500").get_json()
+            for _ in range(9):  # walk ten pages down for a deep cursor
+                deep = client.get(f"{base}&limit=500&cursor={deep['next_cursor']}").get_json()
+            middle = deep["rows"][0]["user_id"]
+
+            results = {
+                "top 100": timed(lambda: client.get(base), args.repeat),
+                "page 11 (cursor)": timed(lambda: client.get(f"{base}&limit=500&cursor={deep['next_cursor']}"), args.repeat),
+                "around me (rank ~4500)": timed(lambda: client.get(f"{base}&around={middle}&limit=21"), args.repeat),
+                "team top 100, ALL formats": timed(lambda: client.get("/api/leaderboard/team?scope=tournament&format=ALL"), args.repeat),
+                "hall of fame": timed(lambda: client.get("/api/leaderboard/hof?format=NAQT&limit=25"), args.repeat),
+                "old GROUP BY (raw rows)": timed(lambda: group_by_baseline("tournament", "NAQT"), max(1, args.repeat // 10)),
+            }
+        for name, result in results.items():
+            print(f"{name:28s} median {result['median_ms']:9.2f} ms   p95 {result['p95_ms']:9.2f} ms")
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
@@ -0,0 +1,12 @@
+import sys
+
+from logic.corpus import build_corpus, CORPUS_PATH, PACKETS_ROOT
+
+# Compile every packet under packets/ into the memory-mapped corpus.
+# Run from the repo root: python -m utils.build_corpus [out_path]
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else CORPUS_PATH
+    counts = build_corpus(PACKETS_ROOT, out_path)
+    for fmt, count in counts.items():
+        print(f"{fmt}: {count} questions")
+    print(f"Wrote {out_path}")
@@ -1,18 +1,71 @@
 import os
 import csv
+import sys
 import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import docx
 import pdfplumber
 
+from logic.question_model import Tossup, Bonus, BonusPart, SixtySecond
+
+MANIFEST_NAME = ".convert_manifest.json"
+
 def save_json(output_path, packet_type, questions):
-    packet = {
-        "format": "Quizbowl",
-        "round": os.path.basename(output_path).replace(".json", ""),
-        "type": packet_type,
-        "questions": questions
-    }
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(packet, f, indent=2, ensure_ascii=False)
+    with PacketWriter(output_path, packet_type) as writer:
+        for q in questions:
+            writer.write(q)
+
+# Streams questions into the same layout save_json produces, one question at a time.
+# The file is only created when the first question arrives, so empty sections leave no output.
+# Questions go to <out>.tmp, renamed over <out> on close, so a killed or failed conversion never
+# leaves a truncated packet behind.
+class PacketWriter:
+    def __init__(self, output_path, packet_type):
+        self.output_path = output_path
+        self.packet_type = packet_type
+        self.count = 0
+        self._tmp_path = output_path + ".tmp"
+        self._f = None
+
+    def write(self, question):
+        if self._f is None:
+            header = json.dumps({
+                "format": "Quizbowl",
+                "round": os.path.basename(self.output_path).replace(".json", ""),
+                "type": self.packet_type
+            }, indent=2, ensure_ascii=False)
+            self._f = open(self._tmp_path, "w", encoding="utf-8")
+            self._f.write(header[:-2] + ',\n  "questions": [\n')
+        else:
+            self._f.write(",\n")
+        body = json.dumps(question.to_packet_dict(), indent=2, ensure_ascii=False)
+        self._f.write("\n".join("    " + ln for ln in body.split("\n")))
+        self.count += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.write("\n  ]\n}")
+            self._f.close()
+            self._f = None
+            os.replace(self._tmp_path, self.output_path)
+
+    def discard(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
 
 # Helper: pad missing parts with "MISSING"
 def safe_split(line, expected_parts):
@@ -22,143 +75,266 @@ def safe_split(line, expected_parts):
     return parts[:expected_parts]
 
 # Tossup (pyramidal: hard → medium → easy)
-def convert_tossup(lines, output_path, report):
-    questions = []
-    for i, line in enumerate(lines, start=1):
-        hard, medium, easy, answer = safe_split(line, 4)
-        questions.append({
-            "id": f"q{i}",
-            "type": "tossup",
-            "difficulty": {
-                "hard": hard,
-                "medium": medium,
-                "easy": easy
-            },
-            "answer": answer
-        })
-        report["tossups"] += 1
-        report["placeholders"] += sum(1 for p in [hard, medium, easy, answer] if p == "MISSING")
-    if questions:
-        save_json(output_path, "tossup", questions)
+def tossup_record(i, line, report):
+    hard, medium, easy, answer = safe_split(line, 4)
+    report["tossups"] += 1
+    report["placeholders"] += sum(1 for p in [hard, medium, easy, answer] if p == "MISSING")
+    return Tossup(f"q{i}", (hard, medium, easy), answer)
 
 # NAQT Bonus (3 parts, non-pyramidal)
-def convert_naqt_bonus(lines, output_path, report):
-    questions = []
-    for i in range(0, len(lines), 3):
-        parts = []
-        for j in range(3):
-            if i+j < len(lines):
-                q, a = safe_split(lines[i+j], 2)
-                parts.append({"text": q, "answer": a})
-                report["bonuses"] += 1
-                report["placeholders"] += sum(1 for p in [q, a] if p == "MISSING")
-        if parts:
-            questions.append({"id": f"b{i//3+1}", "type": "bonus", "parts": parts})
-    if questions:
-        save_json(output_path, "bonus", questions)
-
-# OSSAA 60-second round (10 questions, non-pyramidal)
-def convert_ossaa_sixty(lines, output_path, report):
-    questions = []
-    for i, line in enumerate(lines, start=1):
+def naqt_bonus_record(i, lines, report):
+    parts = []
+    for line in lines:
         q, a = safe_split(line, 2)
-        questions.append({"text": q, "answer": a})
-        report["sixty"] += 1
+        parts.append(BonusPart(q, a))
+        report["bonuses"] += 1
         report["placeholders"] += sum(1 for p in [q, a] if p == "MISSING")
-    if questions:
-        save_json(output_path, "sixty_second", questions)
+    return Bonus(f"b{i}", parts)
+
+# OSSAA 60-second round (10 questions, non-pyramidal)
+def sixty_record(line, report):
+    q, a = safe_split(line, 2)
+    report["sixty"] += 1
+    report["placeholders"] += sum(1 for p in [q, a] if p == "MISSING")
+    return SixtySecond("", q, a)
 
 # Froshmore Bonus (1 bonus tied to tossup)
-def convert_froshmore_bonus(lines, output_path, report):
-    questions = []
-    for i, line in enumerate(lines, start=1):
-        q, a = safe_split(line, 2)
-        questions.append({
-            "id": f"f{i}",
-            "type": "bonus",
-            "parts": [{"text": q, "answer": a}]
-        })
-        report["bonuses"] += 1
-        report["placeholders"] += sum(1 for p in [q, a] if p == "MISSING")
-    if questions:
-        save_json(output_path, "bonus", questions)
+def froshmore_bonus_record(i, line, report):
+    q, a = safe_split(line, 2)
+    report["bonuses"] += 1
+    report["placeholders"] += sum(1 for p in [q, a] if p == "MISSING")
+    return Bonus(f"f{i}", [BonusPart(q, a)])
 
-# Auto-split processor
-def process_packet(file_path, output_folder, format_type):
-    name, ext = os.path.splitext(os.path.basename(file_path))
-    tossup_output = os.path.join(output_folder, f"{name}_tossups.json")
-    bonus_output = os.path.join(output_folder, f"{name}_bonuses.json")
-    sixty_output = os.path.join(output_folder, f"{name}_sixty.json")
+def convert_tossup(lines, output_path, report):
+    save_json(output_path, "tossup", (tossup_record(i, ln, report) for i, ln in enumerate(lines, start=1)))
 
-    # Report dictionary
-    report = {"tossups": 0, "bonuses": 0, "sixty": 0, "placeholders": 0}
+def convert_naqt_bonus(lines, output_path, report):
+    groups = (lines[i:i+3] for i in range(0, len(lines), 3))
+    save_json(output_path, "bonus", (naqt_bonus_record(i, g, report) for i, g in enumerate(groups, start=1)))
 
-    # Read lines
-    lines = []
-    if ext.lower() == ".csv":
+def convert_ossaa_sixty(lines, output_path, report):
+    save_json(output_path, "sixty_second", (sixty_record(ln, report) for ln in lines))
+
+def convert_froshmore_bonus(lines, output_path, report):
+    save_json(output_path, "bonus", (froshmore_bonus_record(i, ln, report) for i, ln in enumerate(lines, start=1)))
+
+# Source readers: yield raw lines without materializing the whole document
+def iter_source_lines(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".csv":
         with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            lines = ["|".join(row) for row in reader]
-    elif ext.lower() == ".docx":
+            for row in csv.reader(csvfile):
+                yield "|".join(row)
+    elif ext == ".docx":
         doc = docx.Document(file_path)
-        lines = [p.text for p in doc.paragraphs if p.text.strip()]
-    elif ext.lower() == ".pdf":
+        for p in doc.paragraphs:
+            if p.text.strip():
+                yield p.text
+    elif ext == ".pdf":
         with pdfplumber.open(file_path) as pdf:
             for page in pdf.pages:
                 text = page.extract_text()
+                page.flush_cache()
                 if text:
-                    lines.extend(text.split("\n"))
+                    yield from text.split("\n")
 
-    # Split by markers
-    tossup_lines, bonus_lines, sixty_lines = [], [], []
+# Marker state machine: TOSSUP:/BONUS:/SIXTY: switch the section for the lines that follow
+def iter_marked_lines(lines):
     mode = None
     for line in lines:
-        if line.strip().upper().startswith("TOSSUP:"):
+        marker = line.strip().upper()
+        if marker.startswith("TOSSUP:"):
             mode = "tossup"
-            continue
-        elif line.strip().upper().startswith("BONUS:"):
+        elif marker.startswith("BONUS:"):
             mode = "bonus"
-            continue
-        elif line.strip().upper().startswith("SIXTY:"):
+        elif marker.startswith("SIXTY:"):
             mode = "sixty"
-            continue
+        elif mode:
+            yield mode, line
 
+# Turn marked lines into question records, yielding each one as soon as it is complete.
+# NAQT bonus parts are grouped in threes across the whole packet, as convert_naqt_bonus does.
+def iter_packet_records(marked_lines, format_type, report):
+    counters = {"tossup": 0, "bonus": 0}
+    naqt_parts = []
+    for mode, line in marked_lines:
         if mode == "tossup":
-            tossup_lines.append(line)
-        elif mode == "bonus":
-            bonus_lines.append(line)
-        elif mode == "sixty":
-            sixty_lines.append(line)
-
-    # Convert based on format type
-    if tossup_lines:
-        convert_tossup(tossup_lines, tossup_output, report)
-
-    if format_type == "NAQT" and bonus_lines:
-        convert_naqt_bonus(bonus_lines, bonus_output, report)
-    elif format_type == "OSSAA" and sixty_lines:
-        convert_ossaa_sixty(sixty_lines, sixty_output, report)
-    elif format_type == "Froshmore" and bonus_lines:
-        convert_froshmore_bonus(bonus_lines, bonus_output, report)
+            counters["tossup"] += 1
+            yield "tossup", tossup_record(counters["tossup"], line, report)
+        elif mode == "bonus" and format_type == "NAQT":
+            naqt_parts.append(line)
+            if len(naqt_parts) == 3:
+                counters["bonus"] += 1
+                yield "bonus", naqt_bonus_record(counters["bonus"], naqt_parts, report)
+                naqt_parts = []
+        elif mode == "bonus" and format_type == "Froshmore":
+            counters["bonus"] += 1
+            yield "bonus", froshmore_bonus_record(counters["bonus"], line, report)
+        elif mode == "sixty" and format_type == "OSSAA":
+            yield "sixty", sixty_record(line, report)
+    if naqt_parts:
+        counters["bonus"] += 1
+        yield "bonus", naqt_bonus_record(counters["bonus"], naqt_parts, report)
+
+# Auto-split processor
+def process_packet(file_path, output_folder, format_type):
+    name, ext = os.path.splitext(os.path.basename(file_path))
+    tossup_output = os.path.join(output_folder, f"{name}_tossups.json")
+    bonus_output = os.path.join(output_folder, f"{name}_bonuses.json")
+    sixty_output = os.path.join(output_folder, f"{name}_sixty.json")
+
+    # Report dictionary
+    report = {"tossups": 0, "bonuses": 0, "sixty": 0, "placeholders": 0}
+
+    # pages -> lines -> markers -> records -> per-section writers
+    writers = {
+        "tossup": PacketWriter(tossup_output, "tossup"),
+        "bonus": PacketWriter(bonus_output, "bonus"),
+        "sixty": PacketWriter(sixty_output, "sixty_second")
+    }
+    try:
+        records = iter_packet_records(iter_marked_lines(iter_source_lines(file_path)), format_type, report)
+        for section, record in records:
+            writers[section].write(record)
+    except BaseException:
+        for writer in writers.values():
+            writer.discard()
+        raise
+    for writer in writers.values():
+        writer.close()
 
     # Print summary report
-    print(f"Processed {file_path} → {output_folder}")
+    print(f"Processed {file_path} → {output_folder}", file=sys.stderr)
     print(f"Summary: {report['tossups']} tossups, {report['bonuses']} bonuses, "
-          f"{report['sixty']} sixty-second questions, {report['placeholders']} placeholders")
+          f"{report['sixty']} sixty-second questions, {report['placeholders']} placeholders", file=sys.stderr)
+
+    report["outputs"] = [w.output_path for w in writers.values() if w.count]
+    return report
+
+# Content hash used by the manifest to detect unchanged sources
+def file_sha256(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest(output_folder):
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(output_folder, manifest):
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+# Deletes outputs a previous conversion wrote that the current one no longer produces
+def remove_stale_outputs(old_outputs, new_outputs=()):
+    removed = []
+    for path in set(old_outputs) - set(new_outputs):
+        try:
+            os.remove(path)
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+    return removed
 
-# Batch processor
-def batch_convert(input_folder, output_folder, format_type):
+# Worker entry point (module-level so the process pool can pickle it)
+def convert_one(file_path, output_folder, format_type, sha256):
+    started = time.perf_counter()
+    try:
+        report = process_packet(file_path, output_folder, format_type)
+        status, error = "converted", None
+    except Exception as e:
+        report, status, error = {}, "failed", str(e)
+    return {
+        "file": os.path.basename(file_path),
+        "sha256": sha256,
+        "status": status,
+        "error": error,
+        "seconds": round(time.perf_counter() - started, 4),
+        "report": report
+    }
+
+# Batch processor: skips sources whose hash matches the last run's manifest
+def batch_convert(input_folder, output_folder, format_type, workers=1, force=False):
     if not os.path.exists(input_folder):
         os.makedirs(input_folder)
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    for filename in os.listdir(input_folder):
+    started = time.perf_counter()
+    manifest = load_manifest(output_folder)
+    results, pending = [], []
+    for filename in sorted(os.listdir(input_folder)):
         file_path = os.path.join(input_folder, filename)
-        process_packet(file_path, output_folder, format_type)
+        if not os.path.isfile(file_path):
+            continue
+        t0 = time.perf_counter()
+        sha256 = file_sha256(file_path)
+        entry = manifest.get(filename)
+        if (not force and entry and entry.get("sha256") == sha256
+                and all(os.path.exists(p) for p in entry.get("outputs", []))):
+            results.append({"file": filename, "sha256": sha256, "status": "skipped", "error": None,
+                            "seconds": round(time.perf_counter() - t0, 4), "report": entry.get("report", {})})
+        else:
+            pending.append((file_path, sha256))
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(convert_one, fp, output_folder, format_type, sha) for fp, sha in pending]
+            results.extend(f.result() for f in futures)
+    else:
+        results.extend(convert_one(fp, output_folder, format_type, sha) for fp, sha in pending)
 
-# Example usage
+    for r in results:
+        if r["status"] == "converted":
+            outputs = r["report"].get("outputs", [])
+            # A section that vanished from the re-converted source must not keep serving old JSON
+            previous = manifest.get(r["file"], {}).get("outputs", [])
+            r["removed"] = remove_stale_outputs(previous, outputs)
+            manifest[r["file"]] = {"sha256": r["sha256"], "outputs": outputs, "report": r["report"]}
+    present = set(os.listdir(input_folder))
+    for name, entry in manifest.items():
+        if name not in present:
+            remove_stale_outputs(entry.get("outputs", []))
+    manifest = {k: v for k, v in manifest.items() if k in present}
+    save_manifest(output_folder, manifest)
+
+    results.sort(key=lambda r: r["file"])
+    return {
+        "format": format_type,
+        "input_folder": input_folder,
+        "output_folder": output_folder,
+        "workers": workers,
+        "converted": sum(1 for r in results if r["status"] == "converted"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "seconds": round(time.perf_counter() - started, 4),
+        "files": results
+    }
+
+# Example usage:
+#   python -m utils.convert_to_json --workers 4
+#   python -m utils.convert_to_json --format Froshmore --force
 if __name__ == "__main__":
-    batch_convert("input_packets/NAQT", "packets/NAQT", "NAQT")
-    batch_convert("input_packets/OSSAA", "packets/OSSAA", "OSSAA")
-    batch_convert("input_packets/Froshmore", "packets/Froshmore", "Froshmore")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert input packets to JSON.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="process pool size (1 converts serially)")
+    parser.add_argument("--format", action="append", dest="formats",
+                        help="format to convert (repeatable); defaults to NAQT, OSSAA and Froshmore")
+    parser.add_argument("--force", action="store_true", help="reconvert even when the manifest hash matches")
+    args = parser.parse_args()
+
+    summaries = [
+        batch_convert(f"input_packets/{fmt}", f"packets/{fmt}", fmt, workers=args.workers, force=args.force)
+        for fmt in (args.formats or ["NAQT", "OSSAA", "Froshmore"])
+    ]
+    print(json.dumps({"runs": summaries}, indent=2, ensure_ascii=False))
\ No newline at end of file
@@ -0,0 +1,255 @@
+import sys
+import time
+import threading
+import socketserver
+from typing import Dict, List, Optional, Set, Tuple
+
+# Minimal in-memory Redis-compatible (RESP2) server for local multi-worker runs and tests.
+# Implements what logic/state_store.py uses: PING, GET, SET [PX|EX] [NX|XX], DEL, PEXPIRE,
+# WATCH/UNWATCH/MULTI/EXEC/DISCARD (the lease compare-and-set), PUBLISH, SUBSCRIBE/UNSUBSCRIBE,
+# plus the handshake commands redis-py sends on connect.
+# Run from the repo root: python -m utils.fake_resp_server [port]
+# then start workers with STATE_STORE_URL=redis://127.0.0.1:<port>/0
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "FakeRespServer"
+
+    def setup(self):
+        super().setup()
+        self.channels: Set[str] = set()
+        self.write_lock = threading.Lock()
+        self.watched: Dict[str, int] = {}         # key -> version when WATCHed
+        self.queued: Optional[List[List[str]]] = None  # commands inside MULTI
+
+    def handle(self):
+        try:
+            while True:
+                command = self._read_command()
+                if command is None:
+                    break
+                self._dispatch(command)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.server.unsubscribe_all(self)
+
+    # ---------- Wire format ----------
+
+    def _read_command(self) -> Optional[List[str]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.decode().split()  # inline command (e.g. from telnet)
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2].decode())
+        return args
+
+    def send(self, *items):
+        with self.write_lock:
+            self.wfile.write(b"".join(_encode(item) for item in items))
+
+    # ---------- Commands ----------
+
+    def _dispatch(self, command: List[str]):
+        name, args = command[0].upper(), command[1:]
+        srv = self.server
+        if self.queued is not None and name not in ("EXEC", "DISCARD", "MULTI", "WATCH"):
+            self.queued.append(command)
+            self.send(_Simple("QUEUED"))
+        elif name == "WATCH":
+            self.watched.update((key, srv.version(key)) for key in args)
+            self.send(_Simple("OK"))
+        elif name == "UNWATCH":
+            self.watched = {}
+            self.send(_Simple("OK"))
+        elif name == "MULTI":
+            self.queued = []
+            self.send(_Simple("OK"))
+        elif name == "DISCARD":
+            self.queued, self.watched = None, {}
+            self.send(_Simple("OK"))
+        elif name == "EXEC":
+            queued, watched, self.queued, self.watched = self.queued or [], self.watched, None, {}
+            with srv.lock:
+                # Aborted (nil reply) when a watched key changed or expired since WATCH
+                if any(srv.version(key) != version for key, version in watched.items()):
+                    self.send(_NilArray())
+                    return
+                self.send([self._reply(c[0].upper(), c[1:]) for c in queued])
+        elif name == "SUBSCRIBE":
+            for channel in args:
+                self.channels.add(channel)
+                srv.subscribe(channel, self)
+                self.send(["subscribe", channel, len(self.channels)])
+        elif name == "UNSUBSCRIBE":
+            for channel in args or list(self.channels):
+                self.channels.discard(channel)
+                srv.unsubscribe(channel, self)
+                self.send(["unsubscribe", channel, len(self.channels)])
+        else:
+            self.send(self._reply(name, args))
+
+    def _reply(self, name: str, args: List[str]):
+        srv = self.server
+        if name == "PING":
+            return _Simple("PONG") if not args else args[0]
+        if name in ("CLIENT", "SELECT", "READONLY"):
+            return _Simple("OK")
+        if name == "GET":
+            return srv.get(args[0])
+        if name == "SET":
+            return _Simple("OK") if srv.set(args[0], args[1], args[2:]) else None
+        if name == "DEL":
+            return sum(srv.delete(key) for key in args)
+        if name == "PEXPIRE":
+            return int(srv.expire(args[0], int(args[1]) / 1000))
+        if name == "PUBLISH":
+            return srv.publish(args[0], args[1])
+        return _Error(f"ERR unknown command '{name}'")
+
+
+class _Simple(str):
+    pass
+
+
+class _Error(str):
+    pass
+
+
+class _NilArray:
+    pass
+
+
+def _encode(item) -> bytes:
+    if item is None:
+        return b"$-1\r\n"
+    if isinstance(item, _NilArray):
+        return b"*-1\r\n"
+    if isinstance(item, _Simple):
+        return b"+" + item.encode() + b"\r\n"
+    if isinstance(item, _Error):
+        return b"-" + item.encode() + b"\r\n"
+    if isinstance(item, int):
+        return b":%d\r\n" % item
+    if isinstance(item, list):
+        return b"*%d\r\n" % len(item) + b"".join(_encode(i) for i in item)
+    data = str(item).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class FakeRespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.lock = threading.RLock()  # EXEC holds it across its queued commands
+        self._values: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._versions: Dict[str, int] = {}  # bumped on every change to a key, for WATCH
+        self._subscribers: Dict[str, Set[_Handler]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRespServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-resp", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._values.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._values[key]
+            self._touch(key)
+            entry = None
+        return entry[0] if entry else None
+
+    def _touch(self, key: str):
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def version(self, key: str) -> int:
+        with self.lock:
+            self._live(key)
+            return self._versions.get(key, 0)
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, options: List[str]) -> bool:
+        options = [o.upper() if not o.isdigit() else o for o in options]
+        ttl = None
+        if "PX" in options:
+            ttl = int(options[options.index("PX") + 1]) / 1000
+        elif "EX" in options:
+            ttl = int(options[options.index("EX") + 1])
+        with self.lock:
+            exists = self._live(key) is not None
+            if ("NX" in options and exists) or ("XX" in options and not exists):
+                return False
+            self._values[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._touch(key)
+            return True
+
+    def delete(self, key: str) -> int:
+        with self.lock:
+            if self._live(key) is None:
+                return 0
+            del self._values[key]
+            self._touch(key)
+            return 1
+
+    def expire(self, key: str, ttl: float) -> bool:
+        with self.lock:
+            value = self._live(key)
+            if value is None:
+                return False
+            self._values[key] = (value, time.monotonic() + ttl)
+            self._touch(key)
+            return True
+
+    def publish(self, channel: str, message: str) -> int:
+        with self.lock:
+            receivers = list(self._subscribers.get(channel, ()))
+        for handler in receivers:
+            try:
+                handler.send(["message", channel, message])
+            except OSError:
+                pass
+        return len(receivers)
+
+    def subscribe(self, channel: str, handler: _Handler):
+        with self.lock:
+            self._subscribers.setdefault(channel, set()).add(handler)
+
+    def unsubscribe(self, channel: str, handler: _Handler):
+        with self.lock:
+            self._subscribers.get(channel, set()).discard(handler)
+
+    def unsubscribe_all(self, handler: _Handler):
+        with self.lock:
+            for handlers in self._subscribers.values():
+                handlers.discard(handler)
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 6379
+    server = FakeRespServer("127.0.0.1", port)
+    print(f"Fake RESP server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
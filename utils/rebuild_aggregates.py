@@ -0,0 +1,28 @@
+import sys
+import time
+import argparse
+
+from db import db, standalone_app
+from stats_manager import rebuild_aggregates
+
+# Regenerate the leaderboard aggregate tables (TeamAggregate / IndividualAggregate) from the raw
+# TeamStat / IndividualStat rows: after a bulk import, a manual stats fix, or if they ever drift.
+# Live stat writes keep them current on their own; run this while no matches are being scored.
+# Run from the repo root:
+#   python -m utils.rebuild_aggregates
+#   python -m utils.rebuild_aggregates --database-url postgresql://.../quizbowl
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild leaderboard aggregates from raw stat rows.")
+    parser.add_argument("--database-url", help="database to rebuild (default: Config.SQLALCHEMY_DATABASE_URI)")
+    args = parser.parse_args()
+
+    app = standalone_app(args.database_url)
+    with app.app_context():
+        db.create_all()  # creates the aggregate tables on databases that predate them
+        start = time.perf_counter()
+        counts = rebuild_aggregates()
+        elapsed = time.perf_counter() - start
+    print(f"Rebuilt {counts['team']} team and {counts['individual']} individual aggregate rows "
+          f"in {elapsed:.2f}s", file=sys.stderr)
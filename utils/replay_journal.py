@@ -0,0 +1,83 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from config import Config
+from logic.room_journal import read_records, apply_event, new_image
+
+# Re-derive per-player stats from room journals (live ones and journals/archive/), as fast as
+# the CPU allows: no timers, no sockets, one process per journal.
+# Run from the repo root:
+#   python -m utils.replay_journal                        (every journal under Config.JOURNAL_DIR)
+#   python -m utils.replay_journal journals/archive/*.journal --json stats.json
+
+
+def replay_file(path: str) -> Dict[str, Any]:
+    """Fold a whole journal (ignoring snapshots) into a room image plus replay counters."""
+    code = os.path.basename(path).split(".")[0].split("-")[0]
+    image = new_image(code)
+    records, first, last = 0, None, None
+    for _, ts, kind, payload in read_records(path):
+        apply_event(image, kind, payload)
+        records += 1
+        first = ts if first is None else first
+        last = ts
+    return {"file": path, "room": code, "records": records, "bytes": os.path.getsize(path),
+            "started": first, "ended": last, "format": image["setup"].get("format"),
+            "questions": len(image["questions"]), "scores": image["scores"], "stats": image["stats"]}
+
+
+def journal_paths(directory: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, "*.journal")) +
+                  glob.glob(os.path.join(directory, "archive", "*.journal")))
+
+
+def replay_all(paths: List[str], workers: int = None) -> Dict[str, Any]:
+    start = time.perf_counter()
+    if len(paths) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rooms = list(pool.map(replay_file, paths, chunksize=4))
+    else:
+        rooms = [replay_file(p) for p in paths]
+    elapsed = time.perf_counter() - start
+
+    totals: Dict[str, Dict[str, int]] = {}
+    for room in rooms:
+        for player, stats in room["stats"].items():
+            agg = totals.setdefault(player, {"buzzes": 0, "correct": 0, "incorrect": 0, "points": 0})
+            for key, value in stats.items():
+                agg[key] += value
+    records = sum(r["records"] for r in rooms)
+    return {"rooms": rooms, "players": totals, "records": records, "seconds": round(elapsed, 3),
+            "records_per_second": round(records / elapsed) if elapsed else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay room journals and re-derive player stats.")
+    parser.add_argument("paths", nargs="*", help="journal files (default: every journal in JOURNAL_DIR)")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--json", dest="json_path", help="write the full result to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    paths = args.paths or journal_paths(Config.JOURNAL_DIR)
+    if not paths:
+        print("No journals found.", file=sys.stderr)
+        sys.exit(1)
+    result = replay_all(paths, workers=args.workers)
+
+    if args.json_path == "-":
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"Replayed {result['records']} records from {len(paths)} journals in {result['seconds']}s "
+          f"({result['records_per_second']} records/s)", file=sys.stderr)
+    if args.json_path != "-":
+        for player, stats in sorted(result["players"].items(), key=lambda kv: -kv[1]["points"]):
+            print(f"{player}: {stats['points']} pts, {stats['correct']} correct, "
+                  f"{stats['incorrect']} incorrect, {stats['buzzes']} buzzes")
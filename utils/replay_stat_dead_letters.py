@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import argparse
+from typing import Any, Dict, List
+
+from config import Config
+from db import standalone_app
+from stats_manager import apply_stat_deltas
+
+# Re-apply stat batches the write-behind buffer set aside (logic/stat_buffer.py) once whatever made
+# them fail is fixed. Each line is one batch, applied as one transaction; lines that fail again
+# stay in the file, the rest are removed.
+# Run from the repo root:
+#   python -m utils.replay_stat_dead_letters
+#   python -m utils.replay_stat_dead_letters stat_dead_letter.jsonl --database-url postgresql://.../quizbowl
+
+
+def batch_of(record: Dict[str, Any]) -> Dict[tuple, Dict[str, int]]:
+    return {tuple(entry[:5]): entry[5] for entry in record["deltas"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay dead-lettered stat batches into the database.")
+    parser.add_argument("path", nargs="?", default=Config.STAT_DEAD_LETTER_PATH)
+    parser.add_argument("--database-url", help="database to write (default: Config.SQLALCHEMY_DATABASE_URI)")
+    args = parser.parse_args()
+
+    if not args.path or not os.path.isfile(args.path):
+        print(f"No dead letters at {args.path}", file=sys.stderr)
+        sys.exit(0)
+    with open(args.path, encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+
+    kept: List[str] = []
+    applied = 0
+    app = standalone_app(args.database_url)
+    with app.app_context():
+        for line in lines:
+            try:
+                apply_stat_deltas(batch_of(json.loads(line)))
+                applied += 1
+            except Exception as e:
+                print(f"Still failing: {e}", file=sys.stderr)
+                kept.append(line)
+
+    tmp = args.path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(kept)
+    os.replace(tmp, args.path)
+    print(f"Applied {applied} batch(es); {len(kept)} left in {args.path}", file=sys.stderr)
@@ -1,5 +1,20 @@
 import os
+import sys
 import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+if __name__ == "__main__":
+    # Run as a script (python utils/validate_packets.py): make the repo's packages importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic.corpus import find_format_dir
+
+# Bump when validation rules change so cached PASS/FAIL results are recomputed
+VALIDATOR_VERSION = 1
+CACHE_NAME = ".validate_cache.json"
+FORMATS = ["NAQT", "OSSAA", "Froshmore"]
 
 def check_clue_order(tossup):
     """Ensure hard → medium → easy clue order is present and not missing."""
@@ -13,11 +28,14 @@ def check_clue_order(tossup):
         errors.append("Missing easy clue")
     return errors
 
-def validate_naqt(packet_path):
+def load_packet(packet_path):
     with open(packet_path, encoding="utf-8") as f:
-        data = json.load(f)
-    tossups = [q for q in data["questions"] if q["type"] == "tossup"]
-    bonuses = [q for q in data["questions"] if q["type"] == "bonus"]
+        return json.load(f)
+
+def validate_naqt(packet_path, data=None):
+    data = data if data is not None else load_packet(packet_path)
+    tossups = [q for q in data["questions"] if q.get("type") == "tossup"]
+    bonuses = [q for q in data["questions"] if q.get("type") == "bonus"]
 
     errors = []
     if len(tossups) != 20:
@@ -32,10 +50,9 @@ def validate_naqt(packet_path):
 
     return errors
 
-def validate_ossaa(packet_path, quarter):
-    with open(packet_path, encoding="utf-8") as f:
-        data = json.load(f)
-    tossups = [q for q in data["questions"] if q["type"] == "tossup"]
+def validate_ossaa(packet_path, quarter, data=None):
+    data = data if data is not None else load_packet(packet_path)
+    tossups = [q for q in data["questions"] if q.get("type") == "tossup"]
     sixty = [q for q in data["questions"] if data["type"] == "sixty_second"]
 
     errors = []
@@ -52,11 +69,10 @@ def validate_ossaa(packet_path, quarter):
 
     return errors
 
-def validate_froshmore(packet_path):
-    with open(packet_path, encoding="utf-8") as f:
-        data = json.load(f)
-    tossups = [q for q in data["questions"] if q["type"] == "tossup"]
-    bonuses = [q for q in data["questions"] if q["type"] == "bonus"]
+def validate_froshmore(packet_path, data=None):
+    data = data if data is not None else load_packet(packet_path)
+    tossups = [q for q in data["questions"] if q.get("type") == "tossup"]
+    bonuses = [q for q in data["questions"] if q.get("type") == "bonus"]
 
     errors = []
     if len(tossups) != 24:
@@ -75,50 +91,177 @@ def validate_froshmore(packet_path):
 
     return errors
 
-def run_validation():
-    base = "packets"
+def detect_quarter(filename):
+    # Infer OSSAA quarter from filename
+    for quarter in (1, 2, 3, 4):
+        if f"Q{quarter}" in filename or f"Quarter{quarter}" in filename:
+            return quarter
+    return None
 
-    print("Validating NAQT...")
-    for filename in os.listdir(os.path.join(base, "NAQT")):
-        if filename.endswith(".json"):
-            errors = validate_naqt(os.path.join(base, "NAQT", filename))
-            if errors:
-                print(f"{filename}: FAIL → {errors}")
-            else:
-                print(f"{filename}: PASS")
-
-    print("\nValidating OSSAA...")
-    for filename in os.listdir(os.path.join(base, "OSSAA")):
-        if filename.endswith(".json"):
-            # Infer quarter from filename
-            if "Q1" in filename or "Quarter1" in filename:
-                quarter = 1
-            elif "Q2" in filename or "Quarter2" in filename:
-                quarter = 2
-            elif "Q3" in filename or "Quarter3" in filename:
-                quarter = 3
-            elif "Q4" in filename or "Quarter4" in filename:
-                quarter = 4
-            else:
-                quarter = None
+def count_questions(data):
+    questions = data.get("questions", [])
+    sixty_file = data.get("type") == "sixty_second"
+    return {
+        "tossups": sum(1 for q in questions if q.get("type") == "tossup"),
+        "bonuses": sum(1 for q in questions if q.get("type") == "bonus"),
+        "sixty": sum(1 for q in questions if sixty_file or q.get("type") == "sixty_second")
+    }
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-            if quarter:
-                errors = validate_ossaa(os.path.join(base, "OSSAA", filename), quarter)
-                if errors:
-                    print(f"{filename}: FAIL → {errors}")
+def validate_file(path, format_type):
+    """Validate one packet file and return a structured result (safe to run in a worker process)."""
+    started = time.perf_counter()
+    result = {"file": path, "format": format_type, "status": "PASS", "errors": [],
+              "counts": {"tossups": 0, "bonuses": 0, "sixty": 0}}
+    try:
+        if not path.lower().endswith(".json"):
+            result["status"] = "SKIPPED"
+            result["errors"] = ["not a converted JSON packet"]
+        else:
+            data = load_packet(path)
+            result["counts"] = count_questions(data)
+            if format_type == "NAQT":
+                errors = validate_naqt(path, data)
+            elif format_type == "OSSAA":
+                quarter = detect_quarter(os.path.basename(path))
+                if quarter:
+                    errors = validate_ossaa(path, quarter, data)
                 else:
-                    print(f"{filename}: PASS")
+                    errors = None
+                    result["status"] = "SKIPPED"
+                    result["errors"] = ["quarter not detected"]
+            elif format_type == "Froshmore":
+                errors = validate_froshmore(path, data)
             else:
-                print(f"{filename}: Skipped (quarter not detected)")
-
-    print("\nValidating Froshmore...")
-    for filename in os.listdir(os.path.join(base, "Froshmore")):
-        if filename.endswith(".json"):
-            errors = validate_froshmore(os.path.join(base, "Froshmore", filename))
+                errors = None
+                result["status"] = "SKIPPED"
+                result["errors"] = [f"no validator for format {format_type}"]
             if errors:
-                print(f"{filename}: FAIL → {errors}")
+                result["status"] = "FAIL"
+                result["errors"] = errors
+    except Exception as e:
+        result["status"] = "ERROR"
+        result["errors"] = [f"{type(e).__name__}: {e}"]
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+def load_cache(base):
+    path = os.path.join(base, CACHE_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if cache.get("version") == VALIDATOR_VERSION else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(base, results):
+    path = os.path.join(base, CACHE_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": VALIDATOR_VERSION, "results": results}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def validate_all(base="packets", formats=None, workers=None, use_cache=True):
+    """
+    Validate every JSON packet under base/<format>, fanning files out over a process pool.
+    Format folders are found like the corpus builder finds them (case-insensitive, at any
+    depth, e.g. packets/froshmore). Results are cached by content hash, so unchanged files
+    are not re-validated. Returns a JSON-serializable report; a format with no folder is a
+    warning, and a run that found no packets at all is not ok.
+    """
+    started = time.perf_counter()
+    cached = load_cache(base).get("results", {}) if use_cache else {}
+    jobs, results, cache_hits, warnings = [], [], 0, []
+    for format_type in formats or FORMATS:
+        folder = find_format_dir(base, format_type)
+        if folder is None:
+            warnings.append(f"No {format_type} packet folder under {base}")
+            continue
+        for filename in sorted(os.listdir(folder)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(folder, filename)
+            # Filename is part of the key because OSSAA validation depends on the quarter in the name
+            key = f"{file_sha256(path)}:{format_type}:{filename}"
+            hit = cached.get(key)
+            if hit:
+                results.append((key, dict(hit, file=path, cached=True)))
+                cache_hits += 1
             else:
-                print(f"{filename}: PASS")
+                jobs.append((key, path, format_type))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(key, pool.submit(validate_file, path, fmt)) for key, path, fmt in jobs]
+            results.extend((key, dict(f.result(), cached=False)) for key, f in futures)
+    else:
+        results.extend((key, dict(validate_file(path, fmt), cached=False)) for key, path, fmt in jobs)
 
+    if use_cache:
+        save_cache(base, {key: {k: v for k, v in r.items() if k != "cached"} for key, r in results})
+
+    files = sorted((r for _, r in results), key=lambda r: (r["format"], r["file"]))
+    statuses = [r["status"] for r in files]
+    return {
+        "ok": bool(files) and not any(s in ("FAIL", "ERROR") for s in statuses),
+        "warnings": warnings,
+        "files": files,
+        "summary": {
+            "total": len(files),
+            "pass": statuses.count("PASS"),
+            "fail": statuses.count("FAIL"),
+            "error": statuses.count("ERROR"),
+            "skipped": statuses.count("SKIPPED"),
+            "cache_hits": cache_hits,
+            "tossups": sum(r["counts"]["tossups"] for r in files),
+            "bonuses": sum(r["counts"]["bonuses"] for r in files),
+            "sixty": sum(r["counts"]["sixty"] for r in files),
+            "workers": workers,
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+    }
+
+def run_validation(base="packets", workers=None, use_cache=True):
+    report = validate_all(base, workers=workers, use_cache=use_cache)
+    current = None
+    for r in report["files"]:
+        if r["format"] != current:
+            current = r["format"]
+            print(f"\nValidating {current}...", file=sys.stderr)
+        filename = os.path.basename(r["file"])
+        if r["status"] == "PASS":
+            print(f"{filename}: PASS", file=sys.stderr)
+        elif r["status"] == "SKIPPED":
+            print(f"{filename}: Skipped ({'; '.join(r['errors'])})", file=sys.stderr)
+        else:
+            print(f"{filename}: {r['status']} → {r['errors']}", file=sys.stderr)
+    for warning in report["warnings"]:
+        print(f"Warning: {warning}", file=sys.stderr)
+    if not report["files"]:
+        print(f"No packets found under {base}", file=sys.stderr)
+    return report
+
+# Example usage:
+#   python utils/validate_packets.py --json report.json
+#   python utils/validate_packets.py --workers 8 --json -   (report on stdout)
 if __name__ == "__main__":
-    run_validation()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Validate converted JSON packets.")
+    parser.add_argument("--base", default="packets")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--json", dest="json_path", help="write the JSON report to this path ('-' for stdout)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the result cache")
+    args = parser.parse_args()
+
+    report = run_validation(args.base, workers=args.workers, use_cache=not args.no_cache)
+    if args.json_path == "-":
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    sys.exit(0 if report["ok"] else 1)